@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import json
+import wave
+from pathlib import Path
+from types import SimpleNamespace
+from typing import List, Sequence, Union
+
+import numpy as np
+
+PathLike = Union[str, Path]
+
+SAMPLE_RATE = 24000
+
+WORDS = (
+    "every challenge is a chance to grow stronger than you were yesterday "
+    "success rarely arrives in a straight line it is built one stubborn step "
+    "at a time when the road gets hard remember why you started"
+).split()
+
+
+# ==================== MEDIA ====================
+def make_images(folder: PathLike, count: int, size=(1600, 1200), seed: int = 0) -> List[Path]:
+    """Noisy gradient JPEGs (noise keeps the encoder honest)."""
+    from PIL import Image
+
+    folder = Path(folder)
+    folder.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    w, h = size
+    yy, xx = np.mgrid[0:h, 0:w].astype(np.float32)
+    paths = []
+    for i in range(count):
+        base = np.stack(
+            [
+                (xx / w) * 255,
+                (yy / h) * 255,
+                ((xx + yy) / (w + h) * 255 + i * 40) % 255,
+            ],
+            axis=-1,
+        )
+        img = np.clip(base + rng.normal(0, 12, base.shape), 0, 255).astype(np.uint8)
+        path = folder / f"{i + 1}.jpg"
+        Image.fromarray(img).save(path, quality=90)
+        paths.append(path)
+    return paths
+
+
+def tone(seconds: float, freq: float = 180.0, sample_rate: int = SAMPLE_RATE, seed: int = 0) -> np.ndarray:
+    """Speech-ish float32 signal: a wobbling tone with syllable-rate envelope."""
+    t = np.arange(int(seconds * sample_rate), dtype=np.float32) / sample_rate
+    env = 0.5 + 0.5 * np.sin(2 * np.pi * 4.0 * t) ** 2
+    noise = np.random.default_rng(seed).normal(0, 0.02, t.size).astype(np.float32)
+    return (0.4 * env * np.sin(2 * np.pi * freq * (1 + 0.05 * np.sin(2 * np.pi * 3 * t)) * t) + noise).astype(np.float32)
+
+
+def make_wav(path: PathLike, seconds: float, sample_rate: int = SAMPLE_RATE) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    pcm = (np.clip(tone(seconds, sample_rate=sample_rate), -1, 1) * 32767).astype("<i2")
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(sample_rate)
+        w.writeframes(pcm.tobytes())
+    return path
+
+
+def make_sentences(seconds: float, words_per_second: float = 2.5, words_per_sentence: int = 12) -> List[str]:
+    """Enough text to fill `seconds` of speech, cut into sentences."""
+    n = max(1, int(seconds * words_per_second))
+    words = [WORDS[i % len(WORDS)] for i in range(n)]
+    return [
+        " ".join(words[i:i + words_per_sentence]).capitalize() + "."
+        for i in range(0, n, words_per_sentence)
+    ]
+
+
+def make_timings(sentences: Sequence[str], seconds: float) -> List[dict]:
+    """A timing manifest's "sentences" list, spreading sentences evenly."""
+    per = seconds / max(1, len(sentences))
+    return [
+        {"index": i, "text": s, "start": i * per, "end": (i + 1) * per - 0.05}
+        for i, s in enumerate(sentences)
+    ]
+
+
+def make_model_dir(folder: PathLike) -> Path:
+    """Fake XTTS folder: only config.json matters (it feeds the cache key)."""
+    folder = Path(folder)
+    folder.mkdir(parents=True, exist_ok=True)
+    (folder / "config.json").write_text(json.dumps({"model": "stub"}), encoding="utf-8")
+    return folder
+
+
+# ==================== STUB MODELS ====================
+class StubXtts:
+    """Stands in for tts.synthesizer.tts_model: ~0.4s of audio per word."""
+
+    config = SimpleNamespace(
+        temperature=0.75, length_penalty=1.0, repetition_penalty=10.0, top_k=50, top_p=0.85
+    )
+
+    def inference(self, text, language, gpt_cond_latent, speaker_embedding, **kwargs):
+        return {"wav": tone(0.4 * max(1, len(text.split())), seed=len(text))}
+
+
+def stub_tts():
+    return SimpleNamespace(synthesizer=SimpleNamespace(tts_model=StubXtts()))
+
+
+class StubLatentCache:
+    def get(self, model, speaker_wav):
+        return (None, None)
+
+    def report(self):
+        pass
+
+
+class StubAligner:
+    """Aligner.align() lookalike that spreads each segment's words evenly."""
+
+    def align(self, segments: List[dict], audio_path) -> dict:
+        out = []
+        for seg in segments:
+            words = seg["text"].split()
+            per = (seg["end"] - seg["start"]) / max(1, len(words))
+            out.append(
+                {
+                    **seg,
+                    "words": [
+                        {
+                            "word": w,
+                            "start": seg["start"] + k * per,
+                            "end": seg["start"] + (k + 1) * per,
+                        }
+                        for k, w in enumerate(words)
+                    ],
+                }
+            )
+        return {"segments": out}
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+# Usage:
+#   python -m benchmarks.profiles                        # every profile, 540x960 @ 30 fps
+#   python -m benchmarks.profiles --res 1080x1920 --seconds 15 --out profiles.json
+#
+# Renders a Ken Burns fixture once to a lossless reference, re-encodes it
+# with each encode profile and reports encode fps, file size, and PSNR/SSIM
+# against the reference.
+
+_SSIM = re.compile(r"SSIM .*All:([\d.]+)")
+_PSNR = re.compile(r"PSNR .*average:([\d.]+|inf)")
+
+
+def make_reference(folder: Path, res, fps: int, seconds: float, images: int) -> Path:
+    """Lossless (x264 qp 0, yuv420p) slideshow from synthetic fixture images."""
+    from benchmarks.fixtures import make_images, make_wav
+    from moviepy.editor import AudioFileClip
+
+    from scripts.build_video import SlideshowParams, build_video
+    from scripts.ffmpeg_pipe import FrameWriter, iter_video_frames
+
+    paths = make_images(folder / "images", images)
+    wav = make_wav(folder / "audio.wav", seconds)
+    p = SlideshowParams(fps=fps, target_w=res[0], target_h=res[1], cache_images=False)
+    ref = folder / "reference.mkv"
+    with AudioFileClip(str(wav)) as audio:
+        video = build_video(paths, audio, p)
+        lossless = ["-c:v", "libx264", "-preset", "ultrafast", "-qp", "0", "-pix_fmt", "yuv420p"]
+        with FrameWriter(ref, res, fps, output_args=lossless) as writer:
+            for frame in iter_video_frames(video, fps):
+                writer.write(frame)
+    return ref
+
+
+def quality(encoded: Path, reference: Path) -> Dict[str, Optional[float]]:
+    """PSNR (dB) and SSIM of `encoded` against `reference`, from ffmpeg's filters."""
+    from scripts.ffmpeg_pipe import FFMPEG_BIN
+
+    graph = "[0:v]split[a0][a1];[1:v]split[b0][b1];[a0][b0]ssim;[a1][b1]psnr"
+    proc = subprocess.run(
+        [FFMPEG_BIN, "-hide_banner", "-i", str(encoded), "-i", str(reference),
+         "-lavfi", graph, "-f", "null", "-"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    ssim, psnr = _SSIM.search(proc.stderr), _PSNR.search(proc.stderr)
+    return {
+        "ssim": float(ssim.group(1)) if ssim else None,
+        "psnr": float(psnr.group(1)) if psnr else None,
+    }
+
+
+def measure_profile(name: str, reference: Path, out_dir: Path, fps: int, frames: int) -> Dict[str, Any]:
+    from scripts.encoding import get_profile
+    from scripts.ffmpeg_pipe import FFMPEG_BIN
+
+    enc = get_profile(name)
+    out = out_dir / f"{name}.mp4"
+    cmd = [FFMPEG_BIN, "-y", "-loglevel", "error", "-i", str(reference), *enc.video_args(fps), "-an", str(out)]
+    start = time.perf_counter()
+    subprocess.run(cmd, check=True)
+    secs = time.perf_counter() - start
+    return {
+        "profile": name,
+        "preset": enc.preset,
+        "tune": enc.tune,
+        "rate": f"crf {enc.crf}" if enc.crf is not None else enc.bitrate,
+        "keyint_s": enc.keyint_s,
+        "seconds": secs,
+        "fps": frames / secs,
+        "bytes": out.stat().st_size,
+        "kbps": out.stat().st_size * 8 / 1000 / (frames / fps),
+        **quality(out, reference),
+    }
+
+
+def run(
+    profiles: Sequence[str],
+    res=(540, 960),
+    fps: int = 30,
+    seconds: float = 10.0,
+    images: int = 4,
+) -> Dict[str, Any]:
+    from scripts.ffmpeg_pipe import frame_count
+
+    with tempfile.TemporaryDirectory(prefix="profiles-") as tmp:
+        tmp = Path(tmp)
+        print(f"⏳ Rendering lossless reference ({res[0]}x{res[1]}, {fps} fps, {seconds}s)")
+        reference = make_reference(tmp, res, fps, seconds, images)
+        frames = frame_count(seconds, fps)
+        results: List[Dict[str, Any]] = []
+        for name in profiles:
+            print(f"▶️  {name}")
+            results.append(measure_profile(name, reference, tmp, fps, frames))
+    return {
+        "fixture": {"res": list(res), "fps": fps, "seconds": seconds, "images": images},
+        "cpu_count": os.cpu_count(),
+        "profiles": results,
+    }
+
+
+def main(argv=None) -> int:
+    from scripts.encoding import PROFILES
+
+    ap = argparse.ArgumentParser(description="Compare encode profiles: speed, size, PSNR/SSIM.")
+    ap.add_argument("--profile", action="append", choices=sorted(PROFILES), help="default: all")
+    ap.add_argument("--res", default="540x960", help="WxH of the fixture video")
+    ap.add_argument("--fps", type=int, default=30)
+    ap.add_argument("--seconds", type=float, default=10.0)
+    ap.add_argument("--out", help="write the JSON report here")
+    args = ap.parse_args(argv)
+
+    w, h = (int(x) for x in args.res.lower().split("x"))
+    report = run(args.profile or list(PROFILES), res=(w, h), fps=args.fps, seconds=args.seconds)
+    print(f"\n{'profile':<12}{'fps':>8}{'kbps':>10}{'PSNR dB':>10}{'SSIM':>9}")
+    for r in report["profiles"]:
+        psnr = f"{r['psnr']:.2f}" if r["psnr"] is not None else "-"
+        ssim = f"{r['ssim']:.4f}" if r["ssim"] is not None else "-"
+        print(f"{r['profile']:<12}{r['fps']:>8.1f}{r['kbps']:>10.0f}{psnr:>10}{ssim:>9}")
+    if args.out:
+        Path(args.out).write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"\n🗂️  Results: {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,394 @@
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+# Usage:
+#   python -m benchmarks.run                       # quick grid -> benchmarks/results/<commit>.json
+#   python -m benchmarks.run --grid full --only render,burn
+#   python -m benchmarks.run --compare benchmarks/results/<old>.json
+#
+# Every case runs in a fresh process inside a scratch directory, so peak RSS
+# and the on-disk caches (cache/images, ...) are per case and always cold.
+
+
+# ==================== BENCHES ====================
+def bench_frames(fps, res, images, seconds) -> Dict[str, Any]:
+    """Frame generation only (build_video + iter_frames), no encoding."""
+    from moviepy.editor import AudioFileClip
+
+    from benchmarks.fixtures import make_images, make_wav
+    from scripts.build_video import SlideshowParams, build_video
+
+    paths = make_images("images", images)
+    audio = AudioFileClip(str(make_wav("audio.wav", seconds)))
+    p = SlideshowParams(fps=fps, target_w=res[0], target_h=res[1])
+    start = time.perf_counter()
+    video = build_video(paths, audio, p)
+    frames = sum(1 for _ in video.iter_frames(fps=fps, dtype="uint8"))
+    secs = time.perf_counter() - start
+    audio.close()
+    return {"frames": frames, "seconds": secs, "fps": frames / secs}
+
+
+def bench_render(fps, res, images, seconds) -> Dict[str, Any]:
+    """render_to_file end to end: frames, x264 encode and audio mux."""
+    from benchmarks.fixtures import make_images, make_wav
+    from scripts.build_video import SlideshowParams, render_to_file
+    from scripts.ffmpeg_pipe import frame_count
+
+    paths = make_images("images", images)
+    wav = make_wav("audio.wav", seconds)
+    p = SlideshowParams(fps=fps, target_w=res[0], target_h=res[1])
+    start = time.perf_counter()
+    render_to_file(paths, wav, "out.mp4", p)
+    secs = time.perf_counter() - start
+    frames = frame_count(seconds, fps)
+    return {
+        "frames": frames,
+        "seconds": secs,
+        "fps": frames / secs,
+        "bytes": os.path.getsize("out.mp4"),
+    }
+
+
+def bench_render_targets(fps, res, images, seconds, targets) -> Dict[str, Any]:
+    """render_to_file to several targets at once (master, 2/3 scale, square)."""
+    from benchmarks.fixtures import make_images, make_wav
+    from scripts.build_video import RenderTarget, SlideshowParams, render_to_file
+    from scripts.ffmpeg_pipe import frame_count
+
+    paths = make_images("images", images)
+    wav = make_wav("audio.wav", seconds)
+    w, h = res
+    variants = [
+        RenderTarget("master.mp4", w, h),
+        RenderTarget("scaled.mp4", w * 2 // 3 // 2 * 2, h * 2 // 3 // 2 * 2),
+        RenderTarget("square.mp4", w, w),
+    ][:targets]
+    p = SlideshowParams(fps=fps, target_w=w, target_h=h)
+    start = time.perf_counter()
+    render_to_file(paths, wav, variants, p)
+    secs = time.perf_counter() - start
+    frames = frame_count(seconds, fps)
+    return {
+        "frames": frames,
+        "seconds": secs,
+        "fps": frames / secs,
+        "bytes": sum(os.path.getsize(t.path) for t in variants),
+    }
+
+
+def bench_assembly(seconds, sentences) -> Dict[str, Any]:
+    """assemble_waveforms + write_wav on pre-made sentence waveforms."""
+    from benchmarks.fixtures import SAMPLE_RATE, tone
+    from scripts.audio_assembly import assemble_waveforms, write_wav
+
+    wavs = [tone(seconds / sentences, seed=i) for i in range(sentences)]
+    start = time.perf_counter()
+    audio, _ = assemble_waveforms(wavs, sample_rate=SAMPLE_RATE, silence_s=0.4, tail_s=0.4)
+    write_wav("out.wav", audio, SAMPLE_RATE)
+    secs = time.perf_counter() - start
+    return {"seconds": secs, "x_realtime": (audio.size / SAMPLE_RATE) / secs}
+
+
+def bench_tts_stub(seconds) -> Dict[str, Any]:
+    """generate_audio() with a stub model: everything but the neural net."""
+    from benchmarks.fixtures import (
+        StubLatentCache,
+        make_model_dir,
+        make_sentences,
+        make_wav,
+        stub_tts,
+    )
+    from scripts.text_to_speech import generate_audio
+
+    sentences = make_sentences(seconds)
+    speaker = make_wav("speaker.wav", 3)
+    start = time.perf_counter()
+    manifest = generate_audio(
+        stub_tts(),
+        sentences,
+        speaker,
+        output_dir="tts",
+        output_file="tts/output.wav",
+        latent_cache=StubLatentCache(),
+        use_cache=False,
+        model_path=make_model_dir("model"),
+    )
+    secs = time.perf_counter() - start
+    return {
+        "sentences": len(sentences),
+        "seconds": secs,
+        "x_realtime": manifest["duration"] / secs,
+    }
+
+
+def bench_ass(seconds, word_level) -> Dict[str, Any]:
+    """generate_subtitles() from a timing manifest with a stub aligner."""
+    from benchmarks.fixtures import StubAligner, make_sentences, make_timings, make_wav
+    from scripts.subtitles import generate_subtitles
+
+    sentences = make_sentences(seconds)
+    wav = make_wav("audio.wav", seconds)
+    start = time.perf_counter()
+    generate_subtitles(
+        wav,
+        "out.ass",
+        timings=make_timings(sentences, seconds),
+        word_level=word_level,
+        aligner=StubAligner(),
+    )
+    secs = time.perf_counter() - start
+    return {
+        "words": sum(len(s.split()) for s in sentences),
+        "seconds": secs,
+        "bytes": os.path.getsize("out.ass"),
+    }
+
+
+def bench_burn(res, seconds, fps=30) -> Dict[str, Any]:
+    """burn_subtitles() on an ffmpeg test-pattern video."""
+    from benchmarks.fixtures import StubAligner, make_sentences, make_timings, make_wav
+    from scripts.burner import burn_subtitles
+    from scripts.ffmpeg_pipe import FFMPEG_BIN, frame_count
+    from scripts.subtitles import generate_subtitles
+
+    subprocess.run(
+        [
+            FFMPEG_BIN, "-y", "-loglevel", "error",
+            "-f", "lavfi", "-i", f"testsrc2=size={res[0]}x{res[1]}:rate={fps}",
+            "-f", "lavfi", "-i", "sine=frequency=220",
+            "-t", str(seconds), "-c:v", "libx264", "-preset", "ultrafast",
+            "-pix_fmt", "yuv420p", "-c:a", "aac", "in.mp4",
+        ],
+        check=True,
+    )
+    sentences = make_sentences(seconds)
+    generate_subtitles(
+        make_wav("audio.wav", seconds),
+        "subs.ass",
+        timings=make_timings(sentences, seconds),
+        aligner=StubAligner(),
+        playres_w=res[0],
+        playres_h=res[1],
+    )
+    start = time.perf_counter()
+    burn_subtitles("in.mp4", "subs.ass", "out.mp4")
+    secs = time.perf_counter() - start
+    frames = frame_count(seconds, fps)
+    return {"frames": frames, "seconds": secs, "fps": frames / secs}
+
+
+BENCHES: Dict[str, Callable[..., Dict[str, Any]]] = {
+    "frames": bench_frames,
+    "render": bench_render,
+    "render_targets": bench_render_targets,
+    "assembly": bench_assembly,
+    "tts_stub": bench_tts_stub,
+    "ass": bench_ass,
+    "burn": bench_burn,
+}
+
+# Headline metric per bench and whether bigger is better
+PRIMARY = {
+    "frames": ("fps", True),
+    "render": ("fps", True),
+    "render_targets": ("fps", True),
+    "assembly": ("x_realtime", True),
+    "tts_stub": ("x_realtime", True),
+    "ass": ("seconds", False),
+    "burn": ("fps", True),
+}
+
+HD = (1080, 1920)
+SD = (540, 960)
+
+GRIDS: Dict[str, Dict[str, Dict[str, list]]] = {
+    "quick": {
+        "frames": {"fps": [10], "res": [SD], "images": [3], "seconds": [6]},
+        "render": {"fps": [10], "res": [SD], "images": [3], "seconds": [6]},
+        "render_targets": {"fps": [10], "res": [SD], "images": [3], "seconds": [6], "targets": [1, 3]},
+        "assembly": {"seconds": [60], "sentences": [20]},
+        "tts_stub": {"seconds": [60]},
+        "ass": {"seconds": [60], "word_level": [True, False]},
+        "burn": {"res": [SD], "seconds": [6]},
+    },
+    "full": {
+        "frames": {"fps": [10, 30], "res": [SD, HD], "images": [5, 20], "seconds": [15, 60]},
+        "render": {"fps": [10, 30], "res": [SD, HD], "images": [5, 20], "seconds": [15, 60]},
+        "render_targets": {"fps": [30], "res": [HD], "images": [5], "seconds": [15, 60], "targets": [1, 3]},
+        "assembly": {"seconds": [60, 600], "sentences": [20, 200]},
+        "tts_stub": {"seconds": [60, 600]},
+        "ass": {"seconds": [60, 600], "word_level": [True, False]},
+        "burn": {"res": [SD, HD], "seconds": [15, 60]},
+    },
+}
+
+
+# ==================== RUNNER ====================
+class ChildRssSampler:
+    """
+    Polls the RSS of this process's descendants on a background thread;
+    `peak_mb` is the largest single process seen (None without /proc).
+    Processes shorter than `interval` may be missed.
+    """
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.peak_mb: Optional[float] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def sample(self) -> None:
+        from scripts.metrics import descendant_rss_mb
+
+        rss = descendant_rss_mb()
+        if rss is not None:
+            self.peak_mb = max([self.peak_mb or 0.0, *rss.values()])
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def __enter__(self) -> "ChildRssSampler":
+        from scripts.metrics import descendant_rss_mb
+
+        if descendant_rss_mb() is not None:
+            self.peak_mb = 0.0
+            self._thread = threading.Thread(target=self._loop, name="child-rss", daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+
+
+def _run_case(bench: str, params: Dict[str, Any], root: str) -> Dict[str, Any]:
+    """Child-process entry: run one case in a scratch dir, add CPU time and peak RSS."""
+    if root not in sys.path:
+        sys.path.insert(0, root)
+    from scripts.metrics import peak_rss_mb
+
+    with tempfile.TemporaryDirectory(prefix=f"bench-{bench}-") as tmp, ChildRssSampler() as children:
+        os.chdir(tmp)
+        metrics = BENCHES[bench](**params)
+
+    metrics["cpu_seconds"] = time.process_time()
+    metrics["peak_rss_mb"] = peak_rss_mb()
+    # Largest subprocess (ffmpeg encoders) seen by the sampler
+    metrics["peak_child_rss_mb"] = children.peak_mb
+    return metrics
+
+
+def expand(grid: Dict[str, list]) -> List[Dict[str, Any]]:
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+
+def _git(*args: str) -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", *args], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(grid: str = "quick", only: Optional[List[str]] = None) -> Dict[str, Any]:
+    root = str(Path(__file__).resolve().parent.parent)
+    results = []
+    ctx = get_context("spawn")
+    for bench, bench_grid in GRIDS[grid].items():
+        if only and bench not in only:
+            continue
+        for params in expand(bench_grid):
+            label = ", ".join(f"{k}={v}" for k, v in params.items())
+            print(f"▶️  {bench} ({label})")
+            entry: Dict[str, Any] = {"bench": bench, "params": params}
+            # One fresh process per case: independent peak RSS, no warm caches
+            with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+                try:
+                    entry["metrics"] = pool.submit(_run_case, bench, params, root).result()
+                    key, _ = PRIMARY[bench]
+                    rss = entry["metrics"]["peak_rss_mb"]
+                    print(f"   ✅ {key}={entry['metrics'][key]:.3f} | peak RSS {rss if rss is None else round(rss)} MB")
+                except Exception as e:
+                    entry["error"] = f"{type(e).__name__}: {e}"
+                    print(f"   ❌ {entry['error']}")
+            results.append(entry)
+
+    return {
+        "meta": {
+            "commit": _git("rev-parse", "HEAD"),
+            "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+            "timestamp": time.time(),
+            "grid": grid,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "results": results,
+    }
+
+
+def _case_key(entry: Dict[str, Any]) -> str:
+    return json.dumps([entry["bench"], entry["params"]], sort_keys=True)
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float = 0.10) -> int:
+    """Print each case's headline metric vs. a baseline; returns #regressions."""
+    base = {_case_key(e): e for e in baseline["results"] if "metrics" in e}
+    regressions = 0
+    print(f"\n📊 vs {str(baseline['meta'].get('commit'))[:10]}")
+    for entry in current["results"]:
+        old = base.get(_case_key(entry))
+        if old is None or "metrics" not in entry:
+            continue
+        key, higher_is_better = PRIMARY[entry["bench"]]
+        a, b = old["metrics"][key], entry["metrics"][key]
+        change = (b - a) / a if a else 0.0
+        worse = change < -threshold if higher_is_better else change > threshold
+        regressions += worse
+        params = ", ".join(f"{k}={v}" for k, v in entry["params"].items())
+        print(f"  {'❌' if worse else '  '} {entry['bench']:<9} {key:<10} {a:9.3f} → {b:9.3f} ({change:+.1%})  {params}")
+    return regressions
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Offline benchmark suite for the video pipeline.")
+    ap.add_argument("--grid", choices=sorted(GRIDS), default="quick")
+    ap.add_argument("--only", help="comma-separated benches: " + ",".join(BENCHES))
+    ap.add_argument("--out", help="JSON output (default: benchmarks/results/<commit>.json)")
+    ap.add_argument("--compare", help="baseline JSON to compare against")
+    ap.add_argument("--threshold", type=float, default=0.10, help="regression threshold")
+    args = ap.parse_args(argv)
+
+    report = run_suite(args.grid, args.only.split(",") if args.only else None)
+    out = Path(args.out or Path(__file__).parent / "results" / f"{(report['meta']['commit'] or 'local')[:12]}.json")
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"\n🗂️  Results: {out}")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        return 1 if compare(baseline, report, args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
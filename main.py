@@ -1,117 +1,189 @@
 # ALL IMPORTS
-import re
+# Keep this list light: heavy libraries (torch/TTS, moviepy, openai, whisperx)
+# are imported by each stage when it runs, so `fetch` never loads torch.
+import argparse
 import os
-import stat
-from typing import Union
+import subprocess
+import sys
 from pathlib import Path
-from scripts.build_video import render_to_file, SlideshowParams
-from pathlib import Path
-from scripts.get_images import download_images
-from scripts.text_to_speech import load_tts, generate_audio
-from scripts.get_speach import get_speach
-from pathlib import Path
-from scripts.subtitles import generate_subtitles
-from scripts.burner import burn_subtitles
-
-
-# HELPER FOR DELETING FILES
-def delete_files_only(folder_path: Union[str, os.PathLike]) -> int:
-    folder_path = os.fspath(folder_path)
-    if not os.path.exists(folder_path):
-        raise FileNotFoundError(f"{folder_path!r} does not exist")
-    if not os.path.isdir(folder_path):
-        raise NotADirectoryError(f"{folder_path!r} is not a directory")
-    deleted = 0
-    for root, dirs, files in os.walk(folder_path):
-        for name in files:
-            fp = os.path.join(root, name)
-            try:
-                try:
-                    st_mode = os.stat(fp).st_mode
-                    os.chmod(fp, st_mode | stat.S_IWUSR)
-                except Exception:
-                    pass
-
-                os.remove(fp)
-                deleted += 1
-            except FileNotFoundError:
-                continue
-    return deleted
-
-
-# DOWNLOAD AND SAVE IMAGES
-delete_files_only("assets/images")
-download_images("tech", per_page=10)
-
-
-# MOTIVATIONAL SCRIPTS
-speech_text = get_speach("Overcoming challenges and achieving success")
-
-with open("assets/text/speech.txt", "w", encoding="utf-8") as f:
-    f.write(speech_text)
-
-with open("assets/text/speech.txt", "r", encoding="utf-8") as f:
-    speech = f.read()
-
-sentences = re.split(r"(?<=[.!?]) +", speech)
-
-
-# TEXT TO SPEACH
-delete_files_only("assets/audio/generated")
-speaker_wav = "assets/audio/reference/Brain.wav"
-tts = load_tts()
-generate_audio(
-    tts,
-    sentences,
-    speaker_wav,
-    output_dir="assets/audio/generated",
-    output_file="assets/audio/generated/output.wav",
-)
-delete_files_only("assets/audio/generated/chunks")
-
-
-# BUILD VIDEO
-delete_files_only("assets/video")
-
-
-def get_images_from_folder(folder: str | Path):
-    folder = Path(folder)
-    if not folder.exists():
-        raise FileNotFoundError(f"Image folder not found: {folder}")
-    image_paths = sorted(
-        [p for p in folder.iterdir() if p.suffix.lower() in {".jpg", ".jpeg", ".png"}],
-        key=lambda p: (
-            p.stem.isdigit(),
-            int(p.stem) if p.stem.isdigit() else p.stem.lower(),
-            p.name.lower(),
-        ),
+
+from scripts.encoding import DEFAULT_PROFILE, OUTPUT_PROFILES
+from scripts.metrics import default_recorder
+from scripts.video_job import JobConfig, build_pipeline
+
+# Subcommand -> pipeline targets (their upstream stages run too when dirty)
+COMMANDS = {
+    "fetch": ["images", "speech"],
+    "speak": ["tts"],
+    "subtitle": ["subtitles"],
+    "render": ["render"],
+    "burn": ["burn"],
+    "all": None,
+}
+
+# Modules each stage imports when it runs; what --profile-startup measures
+STAGE_IMPORTS = {
+    "images": ["scripts.get_images"],
+    "speech": ["scripts.get_speach"],
+    "load_tts": ["scripts.text_to_speech", "TTS.api"],
+    "tts": ["scripts.text_to_speech", "TTS.api"],
+    "load_aligner": ["scripts.subtitles", "whisperx"],
+    "subtitles": ["scripts.subtitles", "whisperx"],
+    "render": ["scripts.build_video", "moviepy.editor"],
+    "burn": ["scripts.burner"],
+}
+
+# Run by `python -X importtime`: import each "label=mod,mod" group in turn,
+# printing a marker between groups so the timings can be attributed.
+_PROFILE_CHILD = """
+import importlib, sys
+for arg in sys.argv[1:]:
+    label, _, mods = arg.partition("=")
+    print("@@group " + label, file=sys.stderr, flush=True)
+    for mod in mods.split(","):
+        try:
+            importlib.import_module(mod)
+        except Exception as e:
+            print(f"@@missing {mod}: {type(e).__name__}: {e}", file=sys.stderr, flush=True)
+"""
+
+
+def make_config(args) -> JobConfig:
+    return JobConfig(
+        topic="Overcoming challenges and achieving success",
+        image_query="tech",
+        images_per_page=10,
+        speaker_wav="assets/audio/reference/Brain.wav",
+        tts_workers=args.tts_workers,
+        tts_precision=args.tts_precision,
+        render_workers=args.render_workers,
+        encode_profile=args.encode_profile,
+    )
+
+
+def targets_for(command: str, cfg: JobConfig):
+    targets = COMMANDS[command]
+    if targets == ["burn"] and cfg.single_pass:
+        return ["render"]           # single-pass renders the burned video directly
+    return targets
+
+
+# ==================== STARTUP PROFILE ====================
+def profile_startup(stages) -> int:
+    """
+    Import main.py and then each stage's modules in a fresh interpreter under
+    `-X importtime`, and print where the time goes. Nothing is run.
+    """
+    groups = ["startup=main"]
+    for name in stages:
+        if name in STAGE_IMPORTS:
+            groups.append(f"{name}={','.join(STAGE_IMPORTS[name])}")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROFILE_CHILD, *groups],
+        cwd=Path(__file__).resolve().parent,
+        capture_output=True,
+        text=True,
+    )
+
+    report = {}       # label -> {"us": total, "top": [(us, module)], "missing": [...]}
+    current = None
+    for line in proc.stderr.splitlines():
+        if line.startswith("@@group "):
+            current = report.setdefault(line[8:], {"us": 0, "top": [], "missing": []})
+        elif line.startswith("@@missing ") and current is not None:
+            current["missing"].append(line[10:])
+        elif line.startswith("import time:") and current is not None:
+            fields = line[len("import time:"):].split("|")
+            if len(fields) != 3 or not fields[1].strip().isdigit():
+                continue            # the header line
+            name = fields[2]
+            # Top-level imports have the least indentation ("|" + two spaces)
+            if len(name) - len(name.lstrip()) <= 1:
+                us = int(fields[1])
+                current["us"] += us
+                current["top"].append((us, name.strip()))
+
+    print("⏱️  Import time per stage (first import only; modules shared with an")
+    print("    earlier row are already loaded and cost nothing there):")
+    for label, r in report.items():
+        heaviest = ", ".join(f"{m} {us / 1e3:.0f}ms" for us, m in sorted(r["top"], reverse=True)[:4])
+        print(f"   {label:<13}{r['us'] / 1e3:>9.1f} ms   {heaviest}")
+        for miss in r["missing"]:
+            print(f"   {'':<13}❌ {miss}")
+    total = sum(r["us"] for r in report.values())
+    print(f"   {'total':<13}{total / 1e3:>9.1f} ms")
+    return proc.returncode
+
+
+# ==================== CLI ====================
+def build_parser() -> argparse.ArgumentParser:
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument(
+        "--force", action="append", default=[], metavar="STAGE",
+        help="re-run this stage even if it is up to date (repeatable)",
+    )
+    common.add_argument("--workers", type=int, default=int(os.getenv("STAGE_WORKERS", "4")),
+                        help="independent stages run concurrently on this many threads")
+    common.add_argument("--tts-workers", type=int, default=int(os.getenv("TTS_WORKERS", "1")))
+    common.add_argument("--tts-precision", choices=["int8", "bf16", "auto"],
+                        default=os.getenv("TTS_PRECISION") or None)
+    common.add_argument("--render-workers", type=int, default=int(os.getenv("RENDER_WORKERS", "1")))
+    common.add_argument("--encode-profile", choices=OUTPUT_PROFILES,
+                        default=os.getenv("ENCODE_PROFILE", DEFAULT_PROFILE),
+                        help="x264 settings for the final video: the burn, or the render "
+                        "in single-pass mode (see scripts/encoding.py)")
+    common.add_argument("--metrics", default=os.getenv("METRICS_DIR"), metavar="DIR",
+                        help="write metrics.json + a Chrome trace of the run here")
+    common.add_argument("--profile-startup", action="store_true",
+                        help="report import time of this command's modules and exit")
+
+    ap = argparse.ArgumentParser(
+        description="Generate a narrated, subtitled slideshow short. Each command "
+        "runs its stage plus any upstream stage whose inputs changed."
     )
-    if not image_paths:
-        raise FileNotFoundError(f"No images found in {folder}")
-    return image_paths
-
-
-images = get_images_from_folder("assets/images")
-params = SlideshowParams(fps=10, target_w=1080, target_h=1920)
-render_to_file(
-    image_paths=images,
-    audio="assets/audio/generated/output.wav",
-    out_path="assets/video/output.mp4",
-    params=params,
-)
-
-
-# GENERATE SUBTITLE
-audio_file = "assets/audio/generated/output.wav"
-ass_output = "assets/subtitles/output.ass"
-generate_subtitles(
-    audio_path=audio_file,
-    ass_out_path=ass_output,
-    text_to_align=speech,
-)
-
-burn_subtitles(
-    video_in="assets/video/output.mp4",
-    ass_path="assets/subtitles/output.ass",
-    out_path="assets/video/output_subtitled.mp4",
-)
+    sub = ap.add_subparsers(dest="command", metavar="COMMAND")
+    helps = {
+        "fetch": "download images and generate the speech text",
+        "speak": "synthesize the speech audio (XTTS)",
+        "subtitle": "align the audio and write the ASS subtitles",
+        "render": "render the slideshow video",
+        "burn": "burn the subtitles into the video",
+        "all": "run the whole pipeline (default)",
+    }
+    for name in COMMANDS:
+        sub.add_parser(name, parents=[common], help=helps[name])
+    return ap
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if not argv or (argv[0].startswith("-") and argv[0] not in ("-h", "--help")):
+        argv = ["all", *argv]
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    cfg = make_config(args)
+    pipeline = build_pipeline(cfg)
+    unknown = [name for name in args.force if name not in pipeline.order]
+    if unknown:
+        parser.error(
+            f"--force: unknown stage {', '.join(unknown)} (choose from {', '.join(pipeline.order)})"
+        )
+    targets = targets_for(args.command, cfg)
+
+    if args.profile_startup:
+        scope = pipeline.ancestors(targets) if targets else set(pipeline.order)
+        return profile_startup([n for n in pipeline.order if n in scope])
+
+    if args.metrics:
+        default_recorder.enable()
+    try:
+        pipeline.run(targets, force=args.force, max_workers=args.workers)
+    finally:
+        if args.metrics:
+            default_recorder.export(args.metrics)
+    return 0
+
+
+# Guarded so SynthesisPool's spawned workers can re-import this module safely.
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+import json
+import struct
+import wave
+from pathlib import Path
+from typing import BinaryIO, List, Sequence, Tuple, Union
+
+import numpy as np
+
+PathLike = Union[str, Path]
+
+
+# ==================== HELPERS ====================
+def peak_gain(wav: np.ndarray) -> float:
+    """The gain peak_normalize() applies to wav."""
+    peak = float(np.max(np.abs(wav))) if wav.size else 0.0
+    return 1.0 / max(0.01, peak)
+
+
+def peak_normalize(wav: np.ndarray) -> np.ndarray:
+    """Scale to peak 1.0 the same way Synthesizer.save_wav does (floor 0.01)."""
+    return wav * peak_gain(wav)
+
+
+def to_pcm16(wav: np.ndarray) -> bytes:
+    """Float [-1, 1] -> little-endian 16-bit PCM bytes."""
+    pcm = np.clip(wav, -1.0, 1.0) * 32767
+    return pcm.astype("<i2").tobytes()
+
+
+# ==================== ASSEMBLY ====================
+def assemble_waveforms(
+    wavs: Sequence[np.ndarray],
+    *,
+    sample_rate: int,
+    silence_s: float = 0.0,
+    crossfade_s: float = 0.0,
+    tail_s: float = 0.0,
+    normalize: bool = True,
+) -> Tuple[np.ndarray, List[Tuple[int, int]]]:
+    """
+    Lay out sentence waveforms in one preallocated float32 buffer.
+
+    Adjacent sentences are separated by `silence_s` of silence, or overlapped
+    by `crossfade_s` with an equal-power fade (not both). Returns the buffer
+    and each sentence's (start, end) sample span in it.
+    """
+    if silence_s > 0 and crossfade_s > 0:
+        raise ValueError("Use either silence_s or crossfade_s, not both.")
+
+    gap = int(round(silence_s * sample_rate))
+    tail = int(round(tail_s * sample_rate))
+    lengths = [int(np.asarray(w).size) for w in wavs]
+    # Never overlap more than half of the shorter neighbour.
+    overlaps = [
+        min(int(round(crossfade_s * sample_rate)), a // 2, b // 2)
+        for a, b in zip(lengths[:-1], lengths[1:])
+    ]
+
+    total = sum(lengths) + gap * max(0, len(wavs) - 1) - sum(overlaps) + tail
+    out = np.zeros(max(0, total), dtype=np.float32)
+    spans: List[Tuple[int, int]] = []
+
+    pos = 0
+    for i, w in enumerate(wavs):
+        w = np.asarray(w, dtype=np.float32).reshape(-1)
+        if normalize:
+            w = peak_normalize(w)
+        ov = overlaps[i - 1] if i > 0 else 0
+        start = pos - ov
+        if ov:
+            t = np.linspace(0.0, np.pi / 2, ov, dtype=np.float32)
+            out[start:pos] *= np.cos(t)
+            out[start:pos] += w[:ov] * np.sin(t)
+            out[pos:start + w.size] = w[ov:]
+        else:
+            out[start:start + w.size] = w
+        spans.append((start, start + w.size))
+        pos = start + w.size + (gap if i < len(wavs) - 1 else 0)
+
+    return out, spans
+
+
+# ==================== WAV WRITER ====================
+class WavWriter:
+    """
+    Incremental 16-bit mono WAV writer.
+
+    Accepts a path or an open binary stream; `wave` patches the header sizes
+    on close when the target is seekable.
+    """
+
+    def __init__(self, target: Union[PathLike, BinaryIO], sample_rate: int):
+        if isinstance(target, (str, Path)):
+            Path(target).parent.mkdir(parents=True, exist_ok=True)
+            target = str(target)
+        self._wav = wave.open(target, "wb")
+        self._wav.setnchannels(1)
+        self._wav.setsampwidth(2)
+        self._wav.setframerate(sample_rate)
+        self.sample_rate = sample_rate
+        self.frames_written = 0
+
+    def write(self, wav: np.ndarray) -> None:
+        self._wav.writeframes(to_pcm16(np.asarray(wav, dtype=np.float32)))
+        self.frames_written += int(np.asarray(wav).size)
+
+    def close(self) -> None:
+        self._wav.close()
+
+    def __enter__(self) -> "WavWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class StreamingWavWriter:
+    """
+    16-bit mono PCM stream that is playable while it is still growing.
+
+    Seekable targets get their header sizes patched after every write, so
+    the file is a valid WAV at any moment. Pipes get an "unknown length"
+    header (sizes 0xFFFFFFFF), which ffmpeg/ffplay/sox stream happily.
+    With raw=True only the s16le samples are written, no header.
+    """
+
+    _UNKNOWN = 0xFFFFFFFF
+
+    def __init__(self, target: Union[PathLike, BinaryIO], sample_rate: int, raw: bool = False):
+        self._own = isinstance(target, (str, Path))
+        if self._own:
+            Path(target).parent.mkdir(parents=True, exist_ok=True)
+            target = open(target, "wb")
+        self._f: BinaryIO = target
+        try:
+            self._seekable = self._f.seekable()
+        except (AttributeError, OSError):
+            self._seekable = False
+        self.sample_rate = sample_rate
+        self.raw = raw
+        self.frames_written = 0
+        if not raw:
+            self._f.write(self._header(None if not self._seekable else 0))
+
+    def _header(self, data_bytes) -> bytes:
+        data_size = self._UNKNOWN if data_bytes is None else data_bytes
+        riff_size = self._UNKNOWN if data_bytes is None else 36 + data_bytes
+        return struct.pack(
+            "<4sI4s4sIHHIIHH4sI",
+            b"RIFF", riff_size, b"WAVE",
+            b"fmt ", 16, 1, 1, self.sample_rate, self.sample_rate * 2, 2, 16,
+            b"data", data_size,
+        )
+
+    def write(self, wav: np.ndarray) -> None:
+        wav = np.asarray(wav, dtype=np.float32).reshape(-1)
+        self._f.write(to_pcm16(wav))
+        self.frames_written += wav.size
+        if self._seekable and not self.raw:
+            end = self._f.tell()
+            self._f.seek(0)
+            self._f.write(self._header(self.frames_written * 2))
+            self._f.seek(end)
+        self._f.flush()
+
+    def close(self) -> None:
+        if self._own:
+            self._f.close()
+        else:
+            self._f.flush()
+
+    def __enter__(self) -> "StreamingWavWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def write_wav(path: PathLike, wav: np.ndarray, sample_rate: int) -> None:
+    with WavWriter(path, sample_rate) as w:
+        w.write(wav)
+
+
+# ==================== TIMING MANIFEST ====================
+def timings_path_for(audio_path: PathLike) -> Path:
+    """`output.wav` -> `output.timings.json`."""
+    audio_path = Path(audio_path)
+    return audio_path.with_name(f"{audio_path.stem}.timings.json")
+
+
+def write_timings(
+    path: PathLike,
+    sentences: Sequence[str],
+    spans: Sequence[Tuple[int, int]],
+    sample_rate: int,
+    total_samples: int,
+) -> dict:
+    """Write where each sentence starts/ends (seconds) in the merged audio."""
+    manifest = {
+        "sample_rate": sample_rate,
+        "duration": total_samples / sample_rate,
+        "sentences": [
+            {
+                "index": i,
+                "text": text,
+                "start": start / sample_rate,
+                "end": end / sample_rate,
+            }
+            for i, (text, (start, end)) in enumerate(zip(sentences, spans))
+        ],
+    }
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    return manifest
+
+
+def read_timings(path: PathLike) -> dict:
+    return json.loads(Path(path).read_text(encoding="utf-8"))
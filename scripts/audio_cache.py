@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import os
+import re
+import time
+import unicodedata
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+
+import numpy as np
+
+from scripts.hashing import file_sha256, json_sha256
+
+PathLike = Union[str, Path]
+
+AUDIO_CACHE_DIR = "cache/tts_chunks"
+DEFAULT_MAX_BYTES = 2 * 1024**3  # 2 GiB of float32 waveforms
+
+
+def normalize_sentence(text: str) -> str:
+    """Canonical form used for cache keys (unicode, whitespace, quotes)."""
+    text = unicodedata.normalize("NFKC", text)
+    text = text.replace("’", "'").replace("‘", "'")
+    text = text.replace("“", '"').replace("”", '"')
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def model_config_hash(model_path: PathLike) -> str:
+    """Hash of the model's config.json; changes whenever the model does."""
+    return file_sha256(os.path.join(model_path, "config.json"))
+
+
+def chunk_key(sentence: str, speaker_hash: str, language: str, config_hash: str) -> str:
+    return json_sha256([normalize_sentence(sentence), speaker_hash, language, config_hash])
+
+
+class AudioChunkCache:
+    """
+    Size-bounded, content-addressed LRU cache of synthesized sentences.
+
+    Each entry is a float32 .npy waveform named by its key. Recency is the
+    file's mtime (touched on every hit), so the LRU order survives restarts.
+    """
+
+    def __init__(self, cache_dir: PathLike = AUDIO_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = int(max_bytes)
+        self.hits = 0
+        self.misses = 0
+        self._index: Dict[str, Tuple[float, int]] = {}  # key -> (last_used, size)
+        self._total = 0
+        self._scan()
+
+    def _scan(self) -> None:
+        if not self.cache_dir.exists():
+            return
+        for p in self.cache_dir.glob("*.npy"):
+            if ".tmp" in p.name:
+                continue
+            st = p.stat()
+            self._index[p.stem] = (st.st_mtime, st.st_size)
+            self._total += st.st_size
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.npy"
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        path = self._path(key)
+        if key not in self._index or not path.exists():
+            self._forget(key)
+            self.misses += 1
+            return None
+        wav = np.load(path)
+        now = time.time()
+        os.utime(path, (now, now))
+        self._index[key] = (now, self._index[key][1])
+        self.hits += 1
+        return wav
+
+    def put(self, key: str, wav: np.ndarray) -> None:
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self._path(key)
+        tmp_path = path.with_name(f"{key}.{os.getpid()}.tmp.npy")
+        np.save(tmp_path, np.asarray(wav, dtype=np.float32))
+        os.replace(tmp_path, path)
+        self._forget(key)
+        size = path.stat().st_size
+        self._index[key] = (time.time(), size)
+        self._total += size
+        self._evict()
+
+    def _forget(self, key: str) -> None:
+        entry = self._index.pop(key, None)
+        if entry is not None:
+            self._total -= entry[1]
+
+    def _evict(self) -> None:
+        if self._total <= self.max_bytes:
+            return
+        for key, _ in sorted(self._index.items(), key=lambda kv: kv[1][0]):
+            if self._total <= self.max_bytes:
+                break
+            try:
+                self._path(key).unlink()
+            except FileNotFoundError:
+                pass
+            self._forget(key)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self._index),
+            "bytes": self._total,
+        }
+
+    def report(self) -> None:
+        mb = self._total / (1024 * 1024)
+        print(
+            f"🗂️  Audio chunk cache: {self.hits} hit(s), {self.misses} miss(es), "
+            f"{len(self._index)} entries / {mb:.1f} MB"
+        )
+
+
+_default_cache: Optional[AudioChunkCache] = None
+
+
+def default_audio_cache() -> AudioChunkCache:
+    """Process-wide cache instance, created on first use."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = AudioChunkCache()
+    return _default_cache
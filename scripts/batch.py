@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import shutil
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, fields
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from scripts.metrics import default_recorder
+from scripts.video_job import JobConfig, SharedModels, build_pipeline
+
+PathLike = Union[str, Path]
+
+# Manifest keys that map straight onto JobConfig fields
+_JOB_FIELDS = {f.name for f in fields(JobConfig)} - {"workdir", "slideshow", "chunking"}
+
+
+# ==================== MANIFEST ====================
+@dataclass
+class BatchJob:
+    job_id: str
+    cfg: JobConfig
+    output: Optional[Path] = None   # where the finished video is copied
+
+
+def _safe_id(text: str) -> str:
+    return re.sub(r"[^A-Za-z0-9._-]+", "-", text).strip("-") or "job"
+
+
+def job_from_entry(entry: Dict[str, Any], root: PathLike, default_id: str) -> BatchJob:
+    """One manifest entry -> BatchJob with its own workdir, <root>/<id>."""
+    entry = dict(entry)
+    job_id = _safe_id(str(entry.pop("id", default_id)))
+    output = entry.pop("output", None)
+    unknown = set(entry) - _JOB_FIELDS
+    if unknown:
+        raise ValueError(f"unknown keys {sorted(unknown)}")
+    cfg = JobConfig(workdir=str(Path(root) / job_id), **entry)
+    return BatchJob(job_id, cfg, Path(output) if output else None)
+
+
+def load_manifest(path: PathLike, root: PathLike = "batch") -> List[BatchJob]:
+    """
+    Read a JSONL manifest, one job per line:
+
+        {"id": "...", "topic": "...", "image_query": "...",
+         "speaker_wav": "...", "output": "out/video.mp4"}
+
+    `id` and `output` are optional; any other key must be a JobConfig field.
+    Each job gets its own workdir, <root>/<id>.
+    """
+    jobs: List[BatchJob] = []
+    seen = set()
+    with open(path, "r", encoding="utf-8") as f:
+        for lineno, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                job = job_from_entry(json.loads(line), root, f"job-{lineno:04d}")
+            except (ValueError, TypeError) as e:
+                raise ValueError(f"{path}:{lineno}: {e}") from e
+            if job.job_id in seen:
+                raise ValueError(f"{path}:{lineno}: duplicate job id {job.job_id!r}")
+            seen.add(job.job_id)
+            jobs.append(job)
+    return jobs
+
+
+# ==================== RUN ====================
+@dataclass
+class JobResult:
+    job_id: str
+    ok: bool
+    attempts: int
+    seconds: float
+    output: Optional[str] = None
+    error: Optional[str] = None
+
+
+def final_video(cfg: JobConfig) -> Path:
+    return cfg.subtitled_mp4
+
+
+def run_job(
+    job: BatchJob,
+    shared: SharedModels,
+    *,
+    retries: int = 2,
+    backoff: float = 5.0,
+    stage_workers: int = 2,
+    on_event: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> JobResult:
+    """
+    Run one job's pipeline, retrying failures. Stages that finished before a
+    failure are memoized, so a retry resumes where the last attempt stopped.
+    """
+    start = time.time()
+    error = None
+    for attempt in range(1, retries + 2):
+        try:
+            pipeline = build_pipeline(job.cfg, shared, label=job.job_id, on_event=on_event)
+            pipeline.run(max_workers=stage_workers)
+            out = final_video(job.cfg)
+            if job.output is not None:
+                job.output.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copyfile(out, job.output)
+                out = job.output
+            return JobResult(job.job_id, True, attempt, time.time() - start, output=str(out))
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            print(f"❌ [{job.job_id}] attempt {attempt} failed: {error}")
+            traceback.print_exc()
+            if on_event is not None:
+                on_event({"event": "attempt_failed", "attempt": attempt, "error": error})
+            if attempt <= retries:
+                time.sleep(backoff * attempt)
+    return JobResult(job.job_id, False, retries + 1, time.time() - start, error=error)
+
+
+def run_batch(
+    jobs: List[BatchJob],
+    *,
+    workers: int = 2,
+    retries: int = 2,
+    stage_workers: int = 2,
+    shared: Optional[SharedModels] = None,
+    report_path: Optional[PathLike] = None,
+) -> List[JobResult]:
+    """
+    Run jobs on a bounded pool of `workers` threads. Models are loaded once
+    and shared; a failed job is reported and never stops the others.
+    """
+    shared = shared or SharedModels()
+    print(f"🗂️  Batch: {len(jobs)} job(s), {workers} worker(s)")
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="job") as pool:
+        futures = [
+            pool.submit(run_job, job, shared, retries=retries, stage_workers=stage_workers)
+            for job in jobs
+        ]
+        results = [f.result() for f in futures]
+
+    ok = sum(r.ok for r in results)
+    print(f"\n✅ Batch finished: {ok}/{len(results)} succeeded")
+    for r in results:
+        if not r.ok:
+            print(f"  ❌ {r.job_id}: {r.error}")
+
+    if report_path is not None:
+        report_path = Path(report_path)
+        report_path.parent.mkdir(parents=True, exist_ok=True)
+        report_path.write_text(json.dumps([asdict(r) for r in results], indent=2), encoding="utf-8")
+    return results
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Render many videos from a JSONL manifest.")
+    ap.add_argument("manifest")
+    ap.add_argument("--root", default="batch", help="parent of the per-job workdirs")
+    ap.add_argument("--workers", type=int, default=2, help="jobs running at once")
+    ap.add_argument("--retries", type=int, default=2)
+    ap.add_argument("--stage-workers", type=int, default=2, help="stages overlapped per job")
+    ap.add_argument("--tts-precision", choices=["int8", "bf16", "auto"], help="CPU perf mode")
+    ap.add_argument("--metrics", help="write metrics.json + trace.json for the batch here")
+    args = ap.parse_args(argv)
+
+    if args.metrics:
+        default_recorder.enable()
+    jobs = load_manifest(args.manifest, root=args.root)
+    results = run_batch(
+        jobs,
+        workers=args.workers,
+        retries=args.retries,
+        stage_workers=args.stage_workers,
+        shared=SharedModels(args.tts_precision),
+        report_path=Path(args.root) / "batch_report.json",
+    )
+    if args.metrics:
+        default_recorder.export(args.metrics)
+    return 0 if all(r.ok for r in results) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -2,48 +2,24 @@
 from __future__ import annotations
 
 import math
-from dataclasses import dataclass
+import tempfile
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
 from pathlib import Path
-from typing import Sequence, Union, List, Optional
+from typing import TYPE_CHECKING, Iterator, Sequence, Union, List, Optional
 
-from moviepy.editor import (
-    ImageClip,
-    AudioFileClip,
-    CompositeVideoClip,
-    concatenate_videoclips,
-    vfx,
-    VideoClip,
-)
-
-PathLike = Union[str, Path]
+from scripts.burner import subtitles_filter
+from scripts.encoding import EncodeProfile, get_profile
+from scripts.ffmpeg_pipe import FrameWriter, iter_video_frames
+from scripts.kenburns import KenBurnsRenderer
+from scripts.metrics import default_recorder
+from scripts.slideshow_params import RenderTarget, SlideshowParams  # re-exported
 
+if TYPE_CHECKING:
+    from moviepy.editor import AudioFileClip, VideoClip
 
-# ==================== CONFIG ====================
-@dataclass
-class SlideshowParams:
-    target_w: int = 1080
-    target_h: int = 1920
-    fps: int = 30                         # looks smoother for shorts
-    min_per_image: float = 3.0
-    whip_max: float = 0.45                # max crossfade duration cap
-
-    # Look / motion
-    contrast: float = 1.08
-    zoom_start: float = 1.00
-    zoom_end_even: float = 1.06
-    zoom_end_odd: float = 1.08
-
-    # Global fades
-    global_fade_in_cap: float = 0.30
-    global_fade_out_cap: float = 0.25
-    global_fade_in_frac: float = 0.15
-    global_fade_out_frac: float = 0.12
-
-    # Robustness against edge artifacts / black bars:
-    # - Slightly overscale the "cover" fit so we're always >= canvas by a hair.
-    # - Use ceil() per-frame when resizing so rounding never under-fills.
-    overscan: float = 1.003               # ~0.3% larger than canvas after "cover"
-    safety_min_body: float = 0.4          # min visible body per image (ex-fade)
+PathLike = Union[str, Path]
 
 
 # ==================== HELPERS ====================
@@ -89,11 +65,28 @@ def _make_clip(
     duration: float,
     idx: int,
     p: SlideshowParams,
+) -> VideoClip:
+    """Create one Ken Burns clip, using the fast renderer unless disabled."""
+    if not p.fast_render:
+        return _make_clip_moviepy(img_path, duration, idx, p)
+    from moviepy.editor import VideoClip
+
+    renderer = KenBurnsRenderer.from_path(img_path, duration, idx, p)
+    return VideoClip(make_frame=renderer.make_frame, duration=duration)
+
+
+def _make_clip_moviepy(
+    img_path: PathLike,
+    duration: float,
+    idx: int,
+    p: SlideshowParams,
 ) -> VideoClip:
     """
     Create a center-anchored Ken Burns zoom clip from one image,
     robust to rounding so no black bars appear.
     """
+    from moviepy.editor import CompositeVideoClip, ImageClip, vfx
+
     base0 = ImageClip(str(img_path)).set_duration(duration)
 
     # "Cover" fit + small overscan so the image is *guaranteed* to exceed canvas
@@ -124,39 +117,35 @@ def _make_clip(
     return comp
 
 
-# ==================== MAIN BUILDER ====================
-def build_video(
-    image_paths: Sequence[PathLike],
-    audio_clip: AudioFileClip,
-    params: Optional[SlideshowParams] = None,
-) -> VideoClip:
-    if not image_paths:
-        raise ValueError("image_paths is empty.")
+# ==================== TIMELINE ====================
+@dataclass
+class SlideSchedule:
+    """Which images are shown, for how long, and how they overlap."""
+    image_paths: List[PathLike]
+    per_img: float                        # duration of each clip (incl. crossfade)
+    xfade: float                          # crossfade overlap between clips
+    total: float                          # frame-quantized video duration
 
-    p = params or SlideshowParams()
-    total_audio = max(0.01, float(audio_clip.duration))
+    def clip_start(self, i: int) -> float:
+        return i * (self.per_img - self.xfade)
 
+
+def plan_slideshow(
+    image_paths: Sequence[PathLike],
+    total_audio: float,
+    p: SlideshowParams,
+) -> SlideSchedule:
     # Decide how many images we can fit at minimum duration each
     max_images = max(1, int(total_audio // p.min_per_image))
     if len(image_paths) > max_images:
         image_paths = sample_evenly(image_paths, max_images)
 
     n = len(image_paths)
+    total_quant = quantize_time_to_frame(total_audio, p.fps)
 
     if n == 1:
         per_img_final = quantize_time_to_frame(total_audio, p.fps)
-        clip = _make_clip(image_paths[0], per_img_final, 0, p)
-        video = concatenate_videoclips([clip], method="compose")
-
-        gi = min(p.global_fade_in_cap, per_img_final * p.global_fade_in_frac)
-        go = min(p.global_fade_out_cap, per_img_final * p.global_fade_out_frac)
-        try:
-            video = video.fadein(gi).fadeout(go)
-        except AttributeError:
-            video = video.fx(vfx.fadein, gi).fx(vfx.fadeout, go)
-
-        total_quant = quantize_time_to_frame(total_audio, p.fps)
-        return video.set_audio(audio_clip).set_duration(total_quant)
+        return SlideSchedule(list(image_paths), per_img_final, 0.0, total_quant)
 
     # Multi-image slideshow
     per_img_naive = total_audio / n
@@ -176,8 +165,26 @@ def build_video(
             xfade_frames -= 1
         xfade = xfade_frames / p.fps
 
+    return SlideSchedule(list(image_paths), per_img_final, xfade, total_quant)
+
+
+# ==================== MAIN BUILDER ====================
+def build_video(
+    image_paths: Sequence[PathLike],
+    audio_clip: AudioFileClip,
+    params: Optional[SlideshowParams] = None,
+) -> VideoClip:
+    if not image_paths:
+        raise ValueError("image_paths is empty.")
+    from moviepy.editor import concatenate_videoclips, vfx
+
+    p = params or SlideshowParams()
+    total_audio = max(0.01, float(audio_clip.duration))
+    sched = plan_slideshow(image_paths, total_audio, p)
+    per_img_final, xfade = sched.per_img, sched.xfade
+
     base_clips: List[VideoClip] = [
-        _make_clip(path, per_img_final, i, p) for i, path in enumerate(image_paths)
+        _make_clip(path, per_img_final, i, p) for i, path in enumerate(sched.image_paths)
     ]
 
     if xfade > 0:
@@ -194,8 +201,89 @@ def build_video(
     except AttributeError:
         video = video.fx(vfx.fadein, gi).fx(vfx.fadeout, go)
 
-    total_quant = quantize_time_to_frame(total_audio, p.fps)
-    return video.set_audio(audio_clip).set_duration(total_quant)
+    return video.set_audio(audio_clip).set_duration(sched.total)
+
+
+def _timed_frames(video: VideoClip) -> VideoClip:
+    """Same clip, recording each frame's render time in the metrics."""
+    def timed(get_frame, t):
+        t0 = time.perf_counter()
+        frame = get_frame(t)
+        default_recorder.observe("render.frame_ms", (time.perf_counter() - t0) * 1e3)
+        return frame
+
+    return video.fl(timed)
+
+
+def target_filter_graph(targets: Sequence[RenderTarget], master_size: Sequence[int]) -> str:
+    """
+    `-filter_complex` that splits the piped master frames into one labelled
+    stream per target ([o0], [o1], ...). The first target is the master
+    itself; the others are scaled to cover their size and center-cropped.
+    """
+    mw, mh = master_size
+    graph = [f"[0:v]split={len(targets)}" + "".join(f"[s{i}]" for i in range(len(targets)))]
+    for i, t in enumerate(targets):
+        w, h = t.width or mw, t.height or mh
+        if (w, h) == (mw, mh):
+            graph.append(f"[s{i}]null[o{i}]")
+        else:
+            graph.append(
+                f"[s{i}]scale={w}:{h}:force_original_aspect_ratio=increase:flags=lanczos,"
+                f"crop={w}:{h},setsar=1[o{i}]"
+            )
+    return ";".join(graph)
+
+
+def _render_targets(
+    video: VideoClip,
+    audio_path: str,
+    targets: Sequence[RenderTarget],
+    p: SlideshowParams,
+    encode_args: Sequence[str],
+) -> List[Path]:
+    """Pipe the master's frames once into one ffmpeg that encodes every target."""
+    paths = [Path(t.path).resolve() for t in targets]
+    for path in paths:
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+    def output(i: int) -> List[str]:
+        return ["-map", f"[o{i}]", "-map", "1:a:0", *encode_args, "-t", f"{video.duration:.6f}"]
+
+    # FrameWriter puts its own path last, so the master is the final output
+    output_args = ["-filter_complex", target_filter_graph(targets, (p.target_w, p.target_h))]
+    for i in range(1, len(targets)):
+        output_args += [*output(i), str(paths[i])]
+    output_args += output(0)
+
+    with default_recorder.span("render.encode", cat="render", fps=p.fps, targets=len(targets)), FrameWriter(
+        paths[0],
+        (p.target_w, p.target_h),
+        p.fps,
+        extra_inputs=["-i", audio_path],
+        output_args=output_args,
+        label="render",
+    ) as writer:
+        for frame in iter_video_frames(video, p.fps):
+            writer.write(frame)
+    return paths
+
+
+@contextmanager
+def _audio_file(audio: Union[PathLike, AudioFileClip], audio_clip: AudioFileClip) -> Iterator[str]:
+    """A file ffmpeg can read the audio from; other clips go to a temp WAV."""
+    if isinstance(audio, (str, Path)):
+        yield str(audio)
+        return
+    filename = getattr(audio_clip, "filename", None)
+    if filename:
+        yield str(filename)
+        return
+    with tempfile.TemporaryDirectory(prefix="render-audio-") as tmp:
+        wav = str(Path(tmp) / "audio.wav")
+        fps = getattr(audio_clip, "fps", None) or 44100
+        audio_clip.write_audiofile(wav, fps=fps, codec="pcm_s16le", logger=None)
+        yield wav
 
 
 # ==================== CONVENIENCE WRAPPERS ====================
@@ -204,25 +292,91 @@ def build_video_from_paths(
     audio_path: PathLike,
     params: Optional[SlideshowParams] = None,
 ) -> VideoClip:
+    from moviepy.editor import AudioFileClip
+
     audio = AudioFileClip(str(audio_path))
     return build_video(image_paths, audio, params)
 
 
 def render_to_file(
+    image_paths: Sequence[PathLike],
+    audio: Union[PathLike, AudioFileClip],
+    out_path: Union[PathLike, Sequence[RenderTarget]],
+    params: Optional[SlideshowParams] = None,
+    *,
+    profile: Union[str, EncodeProfile, None] = None,
+) -> Optional[List[Path]]:
+    """
+    Render the slideshow to `out_path`, or to a list of RenderTargets, with
+    the named encode profile (see scripts.encoding; default "production").
+
+    With targets, the largest (by area) is the master: the timeline is
+    planned and every frame rendered once at its size (overriding the
+    params' target size), then one ffmpeg process splits the frames and
+    encodes all targets, the others scaled down and center-cropped (e.g.
+    720x1280, 1080x1080). Returns the targets' paths, in the given order.
+    """
+    targets = None if isinstance(out_path, (str, Path)) else list(out_path)
+    if targets is not None and not targets:
+        raise ValueError("out_path is an empty list of targets.")
+    must_close = False
+    if isinstance(audio, (str, Path)):
+        from moviepy.editor import AudioFileClip
+
+        audio_clip = AudioFileClip(str(audio))
+        must_close = True
+    else:
+        audio_clip = audio
+
+    try:
+        p = params or SlideshowParams()
+        enc = get_profile(profile)
+        if targets:
+            # Render at the largest target and only ever scale down from it
+            targets = [
+                replace(t, width=t.width or p.target_w, height=t.height or p.target_h) for t in targets
+            ]
+            master = max(range(len(targets)), key=lambda i: targets[i].width * targets[i].height)
+            p = replace(p, target_w=targets[master].width, target_h=targets[master].height)
+            order = [master] + [i for i in range(len(targets)) if i != master]
+
+        video = build_video(image_paths, audio_clip, p)
+        if targets:
+            encode_args = enc.video_args(p.fps) + enc.audio_args()
+            with _audio_file(audio, audio_clip) as audio_path:
+                paths = _render_targets(video, audio_path, [targets[i] for i in order], p, encode_args)
+            by_index = dict(zip(order, paths))
+            return [by_index[i] for i in range(len(targets))]
+
+        # The targets path times frames in iter_video_frames(); moviepy needs this
+        if default_recorder.enabled:
+            video = _timed_frames(video)
+        with default_recorder.span("render.encode", cat="render", fps=p.fps, profile=enc.name):
+            video.write_videofile(str(out_path), fps=p.fps, **enc.moviepy_kwargs(p.fps))
+        return None
+    finally:
+        if must_close:
+            audio_clip.close()
+
+
+def render_burned_to_file(
     image_paths: Sequence[PathLike],
     audio: Union[PathLike, AudioFileClip],
     out_path: PathLike,
+    ass_path: Optional[PathLike] = None,
     params: Optional[SlideshowParams] = None,
     *,
-    codec: str = "libx264",
-    audio_codec: str = "aac",
-    preset: str = "medium",
-    threads: int = 4,
-    bitrate: str = "8000k",
-    pix_fmt: str = "yuv420p",  # safest for phone players
-) -> None:
+    profile: Union[str, EncodeProfile, None] = None,
+) -> Path:
+    """
+    Single-pass render: stream raw frames into one ffmpeg process that burns
+    the subtitles (libass) and muxes the audio, so the final MP4 is encoded
+    exactly once.
+    """
     must_close = False
     if isinstance(audio, (str, Path)):
+        from moviepy.editor import AudioFileClip
+
         audio_clip = AudioFileClip(str(audio))
         must_close = True
     else:
@@ -230,17 +384,33 @@ def render_to_file(
 
     try:
         p = params or SlideshowParams()
+        enc = get_profile(profile)
         video = build_video(image_paths, audio_clip, p)
-        video.write_videofile(
-            str(out_path),
-            fps=p.fps,
-            codec=codec,
-            audio_codec=audio_codec,
-            preset=preset,
-            threads=threads,
-            bitrate=bitrate,
-            ffmpeg_params=["-pix_fmt", pix_fmt],
-        )
+
+        output_args = []
+        if ass_path is not None:
+            output_args += ["-vf", subtitles_filter(ass_path)]
+        output_args += [
+            "-map", "0:v:0",
+            "-map", "1:a:0",
+            *enc.video_args(p.fps),
+            *enc.audio_args(),
+            "-t", f"{video.duration:.6f}",
+        ]
+
+        with default_recorder.span(
+            "render.single_pass", cat="render", fps=p.fps, profile=enc.name
+        ), _audio_file(audio, audio_clip) as audio_path, FrameWriter(
+            out_path,
+            (p.target_w, p.target_h),
+            p.fps,
+            extra_inputs=["-i", audio_path],
+            output_args=output_args,
+            label="render",
+        ) as writer:
+            for frame in iter_video_frames(video, p.fps):
+                writer.write(frame)
+        return writer.out_path
     finally:
         if must_close:
             audio_clip.close()
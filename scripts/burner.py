@@ -1,48 +1,52 @@
 from __future__ import annotations
 
-import subprocess
 from pathlib import Path
 import re
 
+from scripts.encoding import EncodeProfile, get_profile
+from scripts.ffmpeg_pipe import FFMPEG_BIN, run_ffmpeg
+from scripts.metrics import default_recorder
+
+
+def subtitles_filter(ass_path: str | Path) -> str:
+    """libass `subtitles=` filter for ass_path, escaped for ffmpeg."""
+    # Build a filter-safe path: POSIX slashes + escape drive colon (C\:/...)
+    p = Path(ass_path).resolve().as_posix()
+    if re.match(r"^[A-Za-z]:/", p):
+        p = p[0] + r"\:" + p[2:]
+
+    # Use the subtitles filter (libass) and wrap path in single quotes
+    return f"subtitles=filename='{p}'"
+
+
 def burn_subtitles(
     video_in: str | Path,
     ass_path: str | Path,
     out_path: str | Path,
     *,
-    vcodec: str = "libx264",
-    acodec: str = "aac",
-    preset: str = "medium",
-    crf: int = 18,
-    pix_fmt: str = "yuv420p",
+    profile: str | EncodeProfile | None = None,
+    fps: float = 30,
     overwrite: bool = True,
     loglevel: str = "error",  # show only errors
 ) -> Path:
     video_in = Path(video_in).resolve()
-    ass_path = Path(ass_path).resolve()
     out_path = Path(out_path).resolve()
     out_path.parent.mkdir(parents=True, exist_ok=True)
 
-    # Build a filter-safe path: POSIX slashes + escape drive colon (C\:/...)
-    p = ass_path.as_posix()
-    if re.match(r"^[A-Za-z]:/", p):
-        p = p[0] + r"\:" + p[2:]
-
-    # Use the subtitles filter (libass) and wrap path in single quotes
-    vf = f"subtitles=filename='{p}'"
+    vf = subtitles_filter(ass_path)
+    enc = get_profile(profile)
 
     cmd = [
-        "ffmpeg",
+        FFMPEG_BIN,
         "-y" if overwrite else "-n",
         "-loglevel", loglevel,
         "-i", str(video_in),
         "-vf", vf,
-        "-c:v", vcodec,
-        "-preset", preset,
-        "-crf", str(crf),
-        "-pix_fmt", pix_fmt,
-        "-c:a", acodec,   # re-encode audio to avoid muxer quirks
+        *enc.video_args(fps),   # fps only sets the keyframe interval
+        *enc.audio_args(),      # re-encode audio to avoid muxer quirks
         str(out_path),
     ]
 
-    subprocess.run(cmd, check=True)
+    with default_recorder.span("burn", cat="ffmpeg", profile=enc.name):
+        run_ffmpeg(cmd, "burn")
     return out_path
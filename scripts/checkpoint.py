@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+import numpy as np
+
+PathLike = Union[str, Path]
+
+JOURNAL_NAME = "journal.jsonl"
+
+
+class Checkpoint:
+    """
+    Journal of the completed units (TTS sentences, video segments) of one
+    long-running step, so a crashed run resumes where it stopped.
+
+    Each unit's file is written under a temp name and renamed into place
+    before its line is appended (and fsynced) to journal.jsonl, so a unit is
+    either fully recorded or ignored. The first journal line holds the job's
+    fingerprint; a different fingerprint means other inputs, and the old
+    units are discarded.
+    """
+
+    def __init__(self, folder: PathLike, fingerprint: Optional[str] = None):
+        self.folder = Path(folder)
+        self.fingerprint = fingerprint
+        self.journal_path = self.folder / JOURNAL_NAME
+        self.units: Dict[str, Dict[str, Any]] = {}
+        self.resumed = 0
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        lines = []
+        if self.journal_path.exists():
+            good = 0                    # byte offset just past the last good line
+            with open(self.journal_path, "rb") as f:
+                for raw in f:
+                    if not raw.endswith(b"\n"):
+                        break           # torn last line from a crash
+                    try:
+                        lines.append(json.loads(raw))
+                    except ValueError:
+                        break
+                    good += len(raw)
+            if good != self.journal_path.stat().st_size:
+                # Drop the torn tail, or the next append would be glued onto it
+                with open(self.journal_path, "r+b") as f:
+                    f.truncate(good)
+        header = lines[0] if lines else None
+        if not isinstance(header, dict) or header.get("fingerprint") != self.fingerprint:
+            self.clear()
+            self.folder.mkdir(parents=True, exist_ok=True)
+            self._append({"fingerprint": self.fingerprint})
+            return
+        for rec in lines[1:]:
+            if not isinstance(rec, dict) or not {"unit", "file", "size"} <= rec.keys():
+                continue
+            path = self.folder / rec["file"]
+            if path.exists() and path.stat().st_size == rec["size"]:
+                self.units[rec["unit"]] = rec
+
+    def _append(self, rec: Dict[str, Any]) -> None:
+        with open(self.journal_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(rec, sort_keys=True) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    # ---------- units ----------
+    def path(self, unit: str, suffix: str = "") -> Path:
+        return self.folder / f"{unit}{suffix}"
+
+    def tmp_path(self, unit: str, suffix: str = "") -> Path:
+        """Where to write a unit before commit(); keeps the suffix for ffmpeg."""
+        return self.folder / f"{unit}.{os.getpid()}.{threading.get_ident()}.tmp{suffix}"
+
+    def done(self, unit: str) -> Optional[Path]:
+        """The unit's file if it was completed by this or an earlier run."""
+        rec = self.units.get(unit)
+        if rec is None:
+            return None
+        self.resumed += 1
+        return self.folder / rec["file"]
+
+    def commit(self, unit: str, tmp: PathLike, suffix: str = "") -> Path:
+        """Atomically move a finished temp file into place and journal it."""
+        path = self.path(unit, suffix)
+        os.replace(tmp, path)
+        rec = {"unit": unit, "file": path.name, "size": path.stat().st_size}
+        with self._lock:
+            self._append(rec)
+            self.units[unit] = rec
+        return path
+
+    # ---------- arrays (TTS chunks) ----------
+    def load_array(self, unit: str) -> Optional[np.ndarray]:
+        path = self.done(unit)
+        return None if path is None else np.load(path)
+
+    def save_array(self, unit: str, wav: np.ndarray) -> Path:
+        self.folder.mkdir(parents=True, exist_ok=True)
+        tmp = self.tmp_path(unit, ".npy")
+        np.save(tmp, np.asarray(wav, dtype=np.float32))
+        return self.commit(unit, tmp, ".npy")
+
+    def clear(self) -> None:
+        """Drop the journal and every unit (call once the final output exists)."""
+        shutil.rmtree(self.folder, ignore_errors=True)
+        self.units.clear()
+
+    def report(self, what: str = "unit") -> None:
+        if self.resumed:
+            print(f"♻️  Resumed {self.resumed} {what}(s) from checkpoint {self.folder}")
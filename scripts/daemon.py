@@ -0,0 +1,259 @@
+from __future__ import annotations
+
+import argparse
+import json
+import queue
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+from scripts.batch import BatchJob, job_from_entry, run_job
+from scripts.video_job import SharedModels
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+
+# ==================== JOBS ====================
+@dataclass
+class DaemonJob:
+    job: BatchJob
+    status: str = "queued"                # queued -> running -> done | failed
+    created: float = field(default_factory=time.time)
+    started: Optional[float] = None
+    finished: Optional[float] = None
+    output: Optional[str] = None
+    error: Optional[str] = None
+    events: List[Dict[str, Any]] = field(default_factory=list)
+    changed: threading.Condition = field(default_factory=threading.Condition)
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("done", "failed")
+
+    def emit(self, event: Dict[str, Any], status: Optional[str] = None) -> None:
+        with self.changed:
+            if status is not None:
+                self.status = status      # together with its event, for streamers
+            self.events.append({"time": time.time(), **event})
+            self.changed.notify_all()
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "id": self.job.job_id,
+            "status": self.status,
+            "created": self.created,
+            "started": self.started,
+            "finished": self.finished,
+            "output": self.output,
+            "error": self.error,
+            "events": len(self.events),
+        }
+
+
+class JobQueue:
+    """
+    FIFO of submitted jobs drained by `concurrency` worker threads, all
+    sharing one set of warm models.
+    """
+
+    def __init__(
+        self,
+        shared: SharedModels,
+        *,
+        concurrency: int = 1,
+        root: str = "jobs",
+        retries: int = 1,
+        stage_workers: int = 2,
+    ):
+        self.shared = shared
+        self.root = root
+        self.retries = retries
+        self.stage_workers = stage_workers
+        self.jobs: Dict[str, DaemonJob] = {}
+        self._queue: "queue.Queue[Optional[DaemonJob]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._workers = [
+            threading.Thread(target=self._work, name=f"daemon-job-{i}", daemon=True)
+            for i in range(max(1, concurrency))
+        ]
+        for t in self._workers:
+            t.start()
+
+    def submit(self, entry: Dict[str, Any]) -> DaemonJob:
+        job = job_from_entry(entry, self.root, default_id=uuid.uuid4().hex[:12])
+        dj = DaemonJob(job)
+        with self._lock:
+            if job.job_id in self.jobs and not self.jobs[job.job_id].done:
+                raise ValueError(f"job {job.job_id!r} is already queued or running")
+            self.jobs[job.job_id] = dj
+        dj.emit({"event": "queued", "position": self._queue.qsize()})
+        self._queue.put(dj)
+        return dj
+
+    def get(self, job_id: str) -> Optional[DaemonJob]:
+        with self._lock:
+            return self.jobs.get(job_id)
+
+    def list(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [dj.summary() for dj in self.jobs.values()]
+
+    def _work(self) -> None:
+        while True:
+            dj = self._queue.get()
+            if dj is None:
+                return
+            dj.started = time.time()
+            dj.emit({"event": "job_started"}, status="running")
+            result = run_job(
+                dj.job,
+                self.shared,
+                retries=self.retries,
+                stage_workers=self.stage_workers,
+                on_event=dj.emit,
+            )
+            dj.output, dj.error, dj.finished = result.output, result.error, time.time()
+            status = "done" if result.ok else "failed"
+            dj.emit({"event": "job_" + status, "output": dj.output, "error": dj.error}, status=status)
+
+    def close(self) -> None:
+        for _ in self._workers:
+            self._queue.put(None)
+
+
+# ==================== HTTP ====================
+class _Handler(BaseHTTPRequestHandler):
+    """
+    POST /jobs               submit a job (same keys as a batch manifest line)
+    GET  /jobs               list jobs
+    GET  /jobs/<id>          status of one job
+    GET  /jobs/<id>/events   progress events as NDJSON, streamed until it ends
+    GET  /health             liveness
+    """
+
+    server_version = "VideoDaemon/1.0"
+    jobs: JobQueue  # set on the subclass built by serve()
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def _json(self, code: int, body: Any) -> None:
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        if self.path.rstrip("/") != "/jobs":
+            return self._json(404, {"error": "not found"})
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            entry = json.loads(self.rfile.read(length) or b"{}")
+            dj = self.jobs.submit(entry)
+        except (ValueError, TypeError) as e:
+            return self._json(400, {"error": str(e)})
+        self._json(202, dj.summary())
+
+    def do_GET(self):
+        parts = [p for p in self.path.split("?")[0].split("/") if p]
+        if parts == ["health"]:
+            return self._json(200, {"ok": True})
+        if parts == ["jobs"]:
+            return self._json(200, self.jobs.list())
+        if len(parts) in (2, 3) and parts[0] == "jobs":
+            dj = self.jobs.get(parts[1])
+            if dj is None:
+                return self._json(404, {"error": f"no job {parts[1]!r}"})
+            if len(parts) == 2:
+                return self._json(200, dj.summary())
+            if parts[2] == "events":
+                return self._stream_events(dj)
+        self._json(404, {"error": "not found"})
+
+    def _stream_events(self, dj: DaemonJob) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        sent = 0
+        while True:
+            with dj.changed:
+                dj.changed.wait_for(lambda: len(dj.events) > sent or dj.done, timeout=15)
+                batch, finished = dj.events[sent:], dj.done
+            sent += len(batch)
+            try:
+                # An empty line every 15s keeps idle connections alive
+                lines = [json.dumps(e) for e in batch] or [""]
+                self.wfile.write(("\n".join(lines) + "\n").encode("utf-8"))
+                self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                return
+            if finished and sent >= len(dj.events):
+                return
+
+
+def serve(
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    *,
+    concurrency: int = 1,
+    root: str = "jobs",
+    preload: bool = True,
+    shared: Optional[SharedModels] = None,
+) -> ThreadingHTTPServer:
+    """
+    Build the HTTP server (call .serve_forever() on it). With preload, the TTS
+    and alignment models are loaded before the first request arrives.
+    """
+    shared = shared or SharedModels()
+    if preload:
+        print("⏳ Loading models...")
+        shared.tts()
+        shared.aligner("en")
+        print("✅ Models ready.")
+
+    jobs = JobQueue(shared, concurrency=concurrency, root=root)
+    handler = type("Handler", (_Handler,), {"jobs": jobs})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.jobs = jobs
+    return server
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Resident video job server with warm models.")
+    ap.add_argument("--host", default=DEFAULT_HOST)
+    ap.add_argument("--port", type=int, default=DEFAULT_PORT)
+    ap.add_argument("--concurrency", type=int, default=1, help="jobs running at once")
+    ap.add_argument("--root", default="jobs", help="parent of the per-job workdirs")
+    ap.add_argument("--no-preload", action="store_true", help="load models on first use")
+    ap.add_argument("--tts-precision", choices=["int8", "bf16", "auto"], help="CPU perf mode")
+    args = ap.parse_args(argv)
+
+    server = serve(
+        args.host,
+        args.port,
+        concurrency=args.concurrency,
+        root=args.root,
+        preload=not args.no_preload,
+        shared=SharedModels(args.tts_precision),
+    )
+    print(f"▶️  Listening on http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.jobs.close()
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
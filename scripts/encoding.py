@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, replace
+from typing import Any, Dict, List, Optional, Union
+
+
+# ==================== PROFILES ====================
+@dataclass(frozen=True)
+class EncodeProfile:
+    """
+    x264 settings shared by every encode site (render, burn, segments).
+
+    Set `crf` for constant quality, or leave it None and set `bitrate`.
+    `keyint_s` is the keyframe interval in seconds; threads=0 lets ffmpeg
+    pick.
+    """
+    name: str
+    preset: str = "medium"
+    tune: Optional[str] = "stillimage"    # slideshow frames: slow pans over photos
+    crf: Optional[int] = 20
+    bitrate: Optional[str] = None
+    keyint_s: float = 2.0
+    threads: int = 0
+    codec: str = "libx264"
+    pix_fmt: str = "yuv420p"              # safest for phone players
+    audio_codec: str = "aac"
+    audio_bitrate: str = "160k"
+
+    def gop(self, fps: float) -> int:
+        return max(1, int(round(self.keyint_s * fps)))
+
+    def video_args(self, fps: float, fixed_gop: bool = False) -> List[str]:
+        """
+        ffmpeg output args for the video stream. `fixed_gop` also pins the
+        minimum interval and disables scene-cut keyframes, so segments
+        encoded separately can be joined with a stream copy.
+        """
+        args = ["-c:v", self.codec, "-preset", self.preset]
+        if self.tune:
+            args += ["-tune", self.tune]
+        if self.crf is not None:
+            args += ["-crf", str(self.crf)]
+        elif self.bitrate:
+            args += ["-b:v", self.bitrate]
+        args += ["-g", str(self.gop(fps))]
+        if fixed_gop:
+            args += ["-keyint_min", str(self.gop(fps)), "-sc_threshold", "0"]
+        if self.threads:
+            args += ["-threads", str(self.threads)]
+        return args + ["-pix_fmt", self.pix_fmt]
+
+    def audio_args(self) -> List[str]:
+        return ["-c:a", self.audio_codec, "-b:a", self.audio_bitrate]
+
+    def moviepy_kwargs(self, fps: float) -> Dict[str, Any]:
+        """The same settings as VideoClip.write_videofile() keyword arguments."""
+        params = ["-pix_fmt", self.pix_fmt, "-g", str(self.gop(fps))]
+        if self.tune:
+            params += ["-tune", self.tune]
+        if self.crf is not None:
+            params += ["-crf", str(self.crf)]
+        return {
+            "codec": self.codec,
+            "preset": self.preset,
+            "threads": self.threads or None,
+            "bitrate": None if self.crf is not None else self.bitrate,
+            "audio_codec": self.audio_codec,
+            "audio_bitrate": self.audio_bitrate,
+            "ffmpeg_params": params,
+        }
+
+
+PROFILES: Dict[str, EncodeProfile] = {
+    # Fast turnaround while iterating on a video
+    "draft": EncodeProfile("draft", preset="ultrafast", crf=28, keyint_s=10.0),
+    "preview": EncodeProfile("preview", preset="veryfast", crf=24, keyint_s=5.0),
+    # What gets published: visually clean, short GOP for quick seeking
+    "production": EncodeProfile("production", preset="medium", crf=20, keyint_s=2.0),
+    # Master copy kept for re-editing
+    "archive": EncodeProfile("archive", preset="slow", crf=16, keyint_s=10.0),
+    # Two-pass render output that the burn re-encodes: near-lossless but fast,
+    # so the published file is not compressed twice at a lossy setting
+    "intermediate": EncodeProfile("intermediate", preset="veryfast", crf=10, keyint_s=10.0),
+}
+
+DEFAULT_PROFILE = "production"
+# What a published video can be encoded with; the CLI offers these
+OUTPUT_PROFILES = ("draft", "preview", "production", "archive")
+INTERMEDIATE_PROFILE = "intermediate"
+
+
+def get_profile(profile: Union[str, EncodeProfile, None] = None, **overrides: Any) -> EncodeProfile:
+    """Look up a profile by name (None: the default); keyword args override fields."""
+    if profile is None:
+        profile = DEFAULT_PROFILE
+    if isinstance(profile, str):
+        try:
+            profile = PROFILES[profile]
+        except KeyError:
+            raise ValueError(f"Unknown encode profile {profile!r} (known: {', '.join(PROFILES)})")
+    return replace(profile, **overrides) if overrides else profile
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import io
+import os
+import subprocess
+import time
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+
+from scripts.metrics import default_recorder, parse_progress
+
+PathLike = Union[str, Path]
+
+# Same override moviepy honours, so one env var picks the binary everywhere.
+FFMPEG_BIN = os.getenv("FFMPEG_BINARY", "ffmpeg")
+
+
+def frame_count(duration: float, fps: float) -> int:
+    """Number of frames in a frame-quantized duration."""
+    return int(round(duration * fps))
+
+
+def with_progress(cmd: Sequence[str]) -> List[str]:
+    """Same command, with ffmpeg writing -progress key=value blocks to stdout."""
+    return [cmd[0], "-progress", "pipe:1", "-nostats", *cmd[1:]]
+
+
+def run_ffmpeg(cmd: Sequence[str], label: str = "ffmpeg") -> None:
+    """
+    subprocess.run(cmd, check=True); while metrics are enabled, the encode's
+    progress (fps, speed) is fed to the metrics recorder as it runs.
+    """
+    if not default_recorder.enabled:
+        subprocess.run(list(cmd), check=True)
+        return
+    cmd = with_progress(cmd)
+    with subprocess.Popen(cmd, stdout=subprocess.PIPE, text=True) as proc:
+        for block in parse_progress(proc.stdout):
+            default_recorder.ffmpeg_progress(label, block)
+        code = proc.wait()
+    if code != 0:
+        raise subprocess.CalledProcessError(code, cmd)
+
+
+def iter_video_frames(
+    video,
+    fps: float,
+    start_frame: int = 0,
+    end_frame: Optional[int] = None,
+) -> Iterator[np.ndarray]:
+    """Yield uint8 RGB frames of a moviepy clip at t = i / fps."""
+    if end_frame is None:
+        end_frame = frame_count(video.duration, fps)
+    timed = default_recorder.enabled
+    for i in range(start_frame, end_frame):
+        t0 = time.perf_counter() if timed else 0.0
+        frame = video.get_frame(i / fps)
+        if timed:
+            default_recorder.observe("render.frame_ms", (time.perf_counter() - t0) * 1e3)
+        if frame.dtype != np.uint8:
+            frame = frame.astype(np.uint8)
+        yield frame
+
+
+class FrameWriter:
+    """
+    One ffmpeg process fed raw RGB frames on stdin.
+
+    `extra_inputs` are appended after the pipe input (so the pipe is input 0),
+    `output_args` go between the inputs and the output path. While metrics
+    are enabled, encode progress is reported under `label`.
+    """
+
+    def __init__(
+        self,
+        out_path: PathLike,
+        size: Sequence[int],
+        fps: float,
+        *,
+        extra_inputs: Sequence[str] = (),
+        output_args: Sequence[str] = (),
+        overwrite: bool = True,
+        loglevel: str = "error",
+        label: str = "encode",
+    ):
+        w, h = size
+        self.out_path = Path(out_path).resolve()
+        self.out_path.parent.mkdir(parents=True, exist_ok=True)
+        self.cmd: List[str] = [
+            FFMPEG_BIN,
+            "-y" if overwrite else "-n",
+            "-loglevel", loglevel,
+            "-f", "rawvideo",
+            "-pix_fmt", "rgb24",
+            "-s", f"{w}x{h}",
+            "-r", str(fps),
+            "-i", "-",
+            *extra_inputs,
+            *output_args,
+            str(self.out_path),
+        ]
+        self.frames_written = 0
+        self._progress = None
+        if default_recorder.enabled:
+            self.cmd = with_progress(self.cmd)
+            self._proc = subprocess.Popen(self.cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+            self._progress = default_recorder.read_progress(
+                label, io.TextIOWrapper(self._proc.stdout, encoding="utf-8")
+            )
+        else:
+            self._proc = subprocess.Popen(self.cmd, stdin=subprocess.PIPE)
+
+    def write(self, frame: np.ndarray) -> None:
+        self._proc.stdin.write(np.ascontiguousarray(frame, dtype=np.uint8).data)
+        self.frames_written += 1
+
+    def close(self) -> None:
+        if self._proc.stdin and not self._proc.stdin.closed:
+            self._proc.stdin.close()
+        code = self._proc.wait()
+        if self._progress is not None:
+            self._progress.join()
+        if code != 0:
+            raise subprocess.CalledProcessError(code, self.cmd)
+
+    def abort(self) -> None:
+        self._proc.kill()
+        self._proc.wait()
+
+    def __enter__(self) -> "FrameWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
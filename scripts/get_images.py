@@ -1,36 +1,270 @@
-import requests
+import hashlib
+import json
+import math
 import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # Your Pexels API Key
-PEXELS_API_KEY = "H6QIDEaVv717Xbq5MZCfG6xtEbKkNACYPHrsIgUf2MS93FQY7NVFSZbZ"
+PEXELS_API_KEY = os.getenv(
+    "PEXELS_API_KEY", "H6QIDEaVv717Xbq5MZCfG6xtEbKkNACYPHrsIgUf2MS93FQY7NVFSZbZ"
+)
+PEXELS_SEARCH_URL = "https://api.pexels.com/v1/search"
+
+# URL -> file cache shared by every download_images() call
+DOWNLOAD_CACHE_DIR = "cache/downloads"
+
+# Pexels' fixed renditions scale the photo to fit inside these boxes (no crop).
+# "portrait"/"landscape" are cropped, so they are never picked.
+RENDITION_BOXES = [
+    ("medium", None, 350),
+    ("large", 940, 650),
+    ("large2x", 1880, 1300),
+]
+
+CHUNK_SIZE = 256 * 1024
+
+# Serializes index saves from concurrent download_images() calls
+_INDEX_LOCK = threading.Lock()
+
+
+# ---------- Rendition choice ----------
+def required_size(params=None):
+    """Smallest (w, h) an image needs so the slideshow never upscales it."""
+    if params is None:
+        from scripts.slideshow_params import SlideshowParams
+
+        params = SlideshowParams()
+    k = params.overscan * max(params.zoom_start, params.zoom_end_even, params.zoom_end_odd)
+    return math.ceil(params.target_w * k), math.ceil(params.target_h * k)
+
+
+def pick_rendition(photo, min_w, min_h):
+    """URL of the smallest Pexels rendition that still covers (min_w, min_h)."""
+    src = photo["src"]
+    ow, oh = photo.get("width"), photo.get("height")
+    if not ow or not oh:
+        return src["original"]
+
+    for name, box_w, box_h in RENDITION_BOXES:
+        if name not in src:
+            continue
+        scale = min(1.0, (box_w or math.inf) / ow, (box_h or math.inf) / oh)
+        if ow * scale >= min_w and oh * scale >= min_h:
+            return src[name]
+
+    # Custom width from the image CDN, if that is still smaller than the original
+    scale = max(min_w / ow, min_h / oh)
+    if scale < 1.0:
+        sep = "&" if "?" in src["original"] else "?"
+        return f"{src['original']}{sep}auto=compress&cs=tinysrgb&w={math.ceil(ow * scale)}"
+    return src["original"]
+
+
+# ---------- Persistent URL cache ----------
+class DownloadCache:
+    """url -> cached file, with the ETag and size seen when it was fetched."""
+
+    def __init__(self, cache_dir=DOWNLOAD_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.blob_dir = os.path.join(cache_dir, "blobs")
+        self.index_path = os.path.join(cache_dir, "index.json")
+        self._lock = threading.Lock()
+        self.index = {"files": {}, "searches": {}}
+        if os.path.exists(self.index_path):
+            try:
+                with open(self.index_path, "r", encoding="utf-8") as f:
+                    self.index.update(json.load(f))
+            except (OSError, ValueError):
+                pass
+
+    def blob_path(self, url):
+        return os.path.join(self.blob_dir, hashlib.sha256(url.encode("utf-8")).hexdigest())
+
+    def lookup(self, url):
+        """Cache entry for url if its blob is still there with the recorded size."""
+        entry = self.index["files"].get(url)
+        path = self.blob_path(url)
+        if entry and os.path.exists(path) and os.path.getsize(path) == entry.get("size"):
+            return entry
+        return None
+
+    def record(self, url, etag, size):
+        with self._lock:
+            self.index["files"][url] = {"etag": etag, "size": size}
+
+    def save(self):
+        """Merge into the index on disk, keeping entries other jobs added meanwhile."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with _INDEX_LOCK, self._lock:
+            merged = {"files": {}, "searches": {}}
+            if os.path.exists(self.index_path):
+                try:
+                    with open(self.index_path, "r", encoding="utf-8") as f:
+                        merged.update(json.load(f))
+                except (OSError, ValueError):
+                    pass
+            merged["files"].update(self.index["files"])
+            merged["searches"].update(self.index["searches"])
+            tmp = f"{self.index_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(merged, f, indent=2)
+            os.replace(tmp, self.index_path)
+
+
+def make_session(max_workers=8):
+    """Session with a connection pool sized for max_workers and retry/backoff."""
+    session = requests.Session()
+    retry = Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=("GET",),
+    )
+    adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers, max_retries=retry)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def fetch_to_cache(session, cache, url, *, revalidate=False, timeout=(5, 30)):
+    """
+    Make sure url is in the cache, streaming it to disk in chunks if needed.
+    Returns (blob_path, from_cache).
+    """
+    path = cache.blob_path(url)
+    entry = cache.lookup(url)
+    if entry and not revalidate:
+        return path, True
+
+    headers = {}
+    if entry and entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+
+    with session.get(url, headers=headers, stream=True, timeout=timeout) as r:
+        if r.status_code == 304 and entry:
+            return path, True
+        r.raise_for_status()
+
+        os.makedirs(cache.blob_dir, exist_ok=True)
+        tmp = f"{path}.{threading.get_ident()}.part"
+        size = 0
+        with open(tmp, "wb") as f:
+            for block in r.iter_content(chunk_size=CHUNK_SIZE):
+                f.write(block)
+                size += len(block)
+
+        expected = r.headers.get("Content-Length")
+        # Content-Length is the encoded size; only trust it for identity bodies
+        if expected and not r.headers.get("Content-Encoding") and int(expected) != size:
+            os.remove(tmp)
+            raise IOError(f"Truncated download ({size}/{expected} bytes): {url}")
+        os.replace(tmp, path)
+
+    cache.record(url, r.headers.get("ETag"), size)
+    return path, False
+
+
+# ---------- Search ----------
+def search_photos(session, cache, query, per_page, *, api_url, api_key, refresh=False, timeout=(5, 30)):
+    """Pexels search results, cached per (api_url, query, per_page)."""
+    key = json.dumps([api_url, query, per_page])
+    if not refresh and key in cache.index["searches"]:
+        return cache.index["searches"][key]
+
+    headers = {"Authorization": api_key}
+    params = {"query": query, "per_page": per_page}
+    response = session.get(api_url, headers=headers, params=params, timeout=timeout)
+    if response.status_code != 200:
+        print(f"❌ Error: {response.status_code} - {response.text}")
+        return None
+
+    photos = response.json().get("photos", [])
+    with cache._lock:
+        cache.index["searches"][key] = photos
+    return photos
 
 
 # Function to download images from Pexels
-def download_images(query, per_page=5, save_folder="assets/images/"):
+def download_images(
+    query,
+    per_page=5,
+    save_folder="assets/images/",
+    *,
+    params=None,
+    max_workers=8,
+    session=None,
+    api_url=PEXELS_SEARCH_URL,
+    api_key=None,
+    cache_dir=DOWNLOAD_CACHE_DIR,
+    revalidate=False,
+    timeout=(5, 30),
+):
+    """
+    Search Pexels and save up to per_page images as 1.jpg, 2.jpg, ...
+
+    Images are fetched concurrently over one pooled session, streamed to disk,
+    and sized to the smallest rendition covering the slideshow (`params`).
+    Search results and files are cached by URL under cache_dir, so repeating
+    a query needs no network at all (revalidate=True re-checks ETags).
+
+    Raises RuntimeError if the search or any image fails, after saving the
+    others, so a pipeline stage never records a partial set as done.
+    """
     # Ensure the save folder exists
     os.makedirs(save_folder, exist_ok=True)
 
-    url = "https://api.pexels.com/v1/search"
-    headers = {"Authorization": PEXELS_API_KEY}
-    params = {"query": query, "per_page": per_page}
-
-    response = requests.get(url, headers=headers, params=params)
+    own_session = session is None
+    session = session or make_session(max_workers)
+    cache = DownloadCache(cache_dir)
+    min_w, min_h = required_size(params)
 
-    if response.status_code == 200:
-        data = response.json()
-        photos = data.get("photos", [])
+    try:
+        photos = search_photos(
+            session,
+            cache,
+            query,
+            per_page,
+            api_url=api_url,
+            api_key=api_key or PEXELS_API_KEY,
+            refresh=revalidate,
+            timeout=timeout,
+        )
+        if photos is None:
+            raise RuntimeError(f"Image search failed for {query!r}")
         if not photos:
             print("No images found.")
-            return
+            return []
 
-        for idx, photo in enumerate(photos, start=1):
-            img_url = photo["src"]["original"]
-            img_data = requests.get(img_url).content
+        def fetch(job):
+            idx, photo = job
+            url = pick_rendition(photo, min_w, min_h)
+            blob, hit = fetch_to_cache(session, cache, url, revalidate=revalidate, timeout=timeout)
             file_path = os.path.join(save_folder, f"{idx}.jpg")
+            shutil.copyfile(blob, file_path)
+            print(f"✅ Saved{' (cached)' if hit else ''}: {file_path}")
+            return file_path
 
-            with open(file_path, "wb") as f:
-                f.write(img_data)
-
-            print(f"✅ Saved: {file_path}")
-    else:
-        print(f"❌ Error: {response.status_code} - {response.text}")
+        saved, failed = [], []
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = [pool.submit(fetch, job) for job in enumerate(photos, start=1)]
+            for fut in futures:
+                try:
+                    saved.append(fut.result())
+                except (requests.RequestException, OSError) as e:
+                    print(f"❌ Error downloading image: {e}")
+                    failed.append(e)
+        if failed:
+            raise RuntimeError(
+                f"{len(failed)} of {len(photos)} image download(s) failed; first: {failed[0]}"
+            ) from failed[0]
+        return saved
+    finally:
+        cache.save()
+        if own_session:
+            session.close()
@@ -1,13 +1,13 @@
 from dotenv import load_dotenv
-import openai
 import os
 
 load_dotenv()
 
-openai.api_key = os.getenv("OPENAI_API_KEY")
-
 
 def get_speach(prompt):
+    import openai  # imported on first use: the client is slow to load
+
+    openai.api_key = os.getenv("OPENAI_API_KEY")
     try:
         response = openai.completions.create(
             model="gpt-4o-mini",
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import math
+import os
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, Union
+
+import numpy as np
+
+from scripts.hashing import file_sha256, json_sha256
+
+if TYPE_CHECKING:
+    from scripts.build_video import SlideshowParams
+
+PathLike = Union[str, Path]
+
+IMAGE_CACHE_DIR = "cache/images"
+
+# Bump when load_cover_image() changes its output for the same inputs.
+_PREP_VERSION = 1
+
+
+# ==================== DECODE + PREPARE ====================
+def contrast_lut(contrast: float, lum: float = 0.0, thr: float = 128.0) -> np.ndarray:
+    """256-entry table equivalent to moviepy's vfx.lum_contrast."""
+    x = np.arange(256, dtype=np.float64)
+    y = x + lum + contrast * (x - thr)
+    return np.clip(y, 0, 255).astype(np.uint8)
+
+
+def load_cover_image(img_path: PathLike, p: "SlideshowParams") -> np.ndarray:
+    """
+    Decode an image, cover-fit it to the canvas (+ overscan) and apply the
+    contrast curve. Returns an HxWx3 uint8 array.
+
+    JPEGs are decoded with draft() at the smallest DCT scale (1/2, 1/4, 1/8)
+    that still covers the final size, so a 6000px original never has to be
+    fully decoded.
+    """
+    from PIL import Image
+
+    with Image.open(img_path) as im:
+        w0, h0 = im.size
+        scale = max(p.target_w / w0, p.target_h / h0) * p.overscan
+        size = (int(w0 * scale), int(h0 * scale))
+        im.draft("RGB", (math.ceil(w0 * scale), math.ceil(h0 * scale)))
+        im = im.convert("RGB")
+        # Same filters moviepy's cv2 resizer picks: area for shrink, linear for grow.
+        shrink = im.size[0] > size[0]
+        resample = Image.Resampling.BOX if shrink else Image.Resampling.BILINEAR
+        im = im.resize(size, resample)
+        base = np.asarray(im, dtype=np.uint8)
+    return contrast_lut(p.contrast)[base]
+
+
+# ==================== CACHE ====================
+def prepared_key(img_path: PathLike, p: "SlideshowParams") -> str:
+    return json_sha256(
+        [
+            file_sha256(img_path),
+            p.target_w,
+            p.target_h,
+            p.overscan,
+            p.contrast,
+            _PREP_VERSION,
+        ]
+    )
+
+
+def prepare_image(
+    img_path: PathLike,
+    p: "SlideshowParams",
+    cache_dir: PathLike = IMAGE_CACHE_DIR,
+) -> np.ndarray:
+    """
+    Cover-fitted, overscanned, contrast-adjusted image for these params.
+
+    Results are stored as .npy keyed by image hash + params and returned as
+    read-only memory maps, so repeat renders skip decoding and only page in
+    the rows they actually touch.
+    """
+    cache_dir = Path(cache_dir)
+    path = cache_dir / f"{prepared_key(img_path, p)}.npy"
+    if not path.exists():
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.stem}.{os.getpid()}.{threading.get_ident()}.tmp.npy")
+        np.save(tmp_path, load_cover_image(img_path, p))
+        os.replace(tmp_path, path)
+    return np.load(path, mmap_mode="r")
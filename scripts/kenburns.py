@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import math
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Optional, Tuple, Union
+
+import numpy as np
+
+from scripts.image_cache import load_cover_image, prepare_image
+
+if TYPE_CHECKING:
+    from scripts.build_video import SlideshowParams
+
+PathLike = Union[str, Path]
+
+try:
+    import cv2  # optional: same resampler moviepy prefers, and faster than NumPy
+except ImportError:
+    cv2 = None
+
+# Scratch buffers, one set per thread. Within a thread, clips are rendered
+# one after another (even inside a crossfade), but batch runs several jobs'
+# render stages on concurrent threads, which must not share buffers.
+_SCRATCH = threading.local()
+
+
+def _scratch(name: str, shape: Tuple[int, ...], dtype=np.float32) -> np.ndarray:
+    """Contiguous view of this thread's reusable flat buffer, grown on demand."""
+    n = int(np.prod(shape))
+    bufs: Dict[str, np.ndarray] = _SCRATCH.__dict__.setdefault("bufs", {})
+    buf = bufs.get(name)
+    if buf is None or buf.dtype != dtype or buf.size < n:
+        buf = bufs[name] = np.empty(n, dtype=dtype)
+    return buf[:n].reshape(shape)
+
+
+# ==================== HELPERS ====================
+def _axis_taps(n_out: int, n_src: int, n_zoom: int, offset: int):
+    """Source indices and weights for linear resampling along one axis."""
+    pos = (np.arange(n_out, dtype=np.float64) + offset + 0.5) * (n_src / n_zoom) - 0.5
+    pos = np.clip(pos, 0, n_src - 1)
+    i0 = np.floor(pos).astype(np.intp)
+    i1 = np.minimum(i0 + 1, n_src - 1)
+    return i0, i1, (pos - i0).astype(np.float32)
+
+
+# ==================== RENDERER ====================
+class KenBurnsRenderer:
+    """
+    Renders Ken Burns frames straight from a prepared base image.
+
+    Each frame is the centre crop of the base at the eased zoom, resampled
+    bilinearly to the canvas: the same pixels moviepy's resize + composite
+    produces, without resizing the whole image or compositing per frame.
+    Uses cv2.warpAffine when OpenCV is installed, NumPy otherwise; both write
+    into one reusable output buffer.
+    """
+
+    def __init__(
+        self,
+        base: Optional[np.ndarray],
+        duration: float,
+        idx: int,
+        p: "SlideshowParams",
+        img_path: Optional[PathLike] = None,
+    ):
+        self.duration = duration
+        self.idx = idx
+        self.p = p
+        self.img_path = img_path
+        self.base: Optional[np.ndarray] = None
+        self.out = np.empty((p.target_h, p.target_w, 3), dtype=np.uint8)
+        if base is not None:
+            self._set_base(base)
+
+    @classmethod
+    def from_path(cls, img_path: PathLike, duration: float, idx: int, p: "SlideshowParams"):
+        """Renderer that decodes img_path on its first frame (cheap to build)."""
+        return cls(None, duration, idx, p, img_path=img_path)
+
+    def _set_base(self, base: np.ndarray) -> None:
+        self.base = np.ascontiguousarray(base)
+        self.bh, self.bw = self.base.shape[:2]
+
+    def load(self) -> None:
+        if self.base is None:
+            if self.p.cache_images:
+                self._set_base(prepare_image(self.img_path, self.p))
+            else:
+                self._set_base(load_cover_image(self.img_path, self.p))
+
+    def zoom(self, t: float) -> float:
+        from scripts.build_video import ease_in_out_cubic
+
+        p = self.p
+        e = ease_in_out_cubic(t / max(self.duration, 1e-6))
+        z_end = p.zoom_end_even if (self.idx % 2 == 0) else p.zoom_end_odd
+        return p.zoom_start + (z_end - p.zoom_start) * e
+
+    def make_frame(self, t: float) -> np.ndarray:
+        self.load()
+        W, H = self.p.target_w, self.p.target_h
+        z = self.zoom(t)
+        # Same integer zoomed size and centre offset as resize(ceil) + composite
+        wz = int(math.ceil(self.bw * z))
+        hz = int(math.ceil(self.bh * z))
+        ox = int((wz - W) / 2)
+        oy = int((hz - H) / 2)
+        if cv2 is not None:
+            return self._warp_cv2(wz, hz, ox, oy)
+        return self._warp_numpy(wz, hz, ox, oy)
+
+    def _warp_cv2(self, wz: int, hz: int, ox: int, oy: int) -> np.ndarray:
+        sx, sy = wz / self.bw, hz / self.bh
+        # Pixel-centre mapping of resize-to-(wz, hz), then shift by the crop offset
+        m = np.array(
+            [[sx, 0.0, 0.5 * sx - 0.5 - ox], [0.0, sy, 0.5 * sy - 0.5 - oy]],
+            dtype=np.float64,
+        )
+        cv2.warpAffine(
+            self.base,
+            m,
+            (self.p.target_w, self.p.target_h),
+            dst=self.out,
+            flags=cv2.INTER_LINEAR,
+            borderMode=cv2.BORDER_REPLICATE,
+        )
+        return self.out
+
+    def _warp_numpy(self, wz: int, hz: int, ox: int, oy: int) -> np.ndarray:
+        W, H = self.p.target_w, self.p.target_h
+        xi0, xi1, fx = _axis_taps(W, self.bw, wz, ox)
+        yi0, yi1, fy = _axis_taps(H, self.bh, hz, oy)
+
+        # Only the visible columns take part in the vertical pass
+        lo, hi = int(xi0[0]), int(xi1[-1]) + 1
+        src = self.base[:, lo:hi]
+        cw = hi - lo
+
+        # Vertical pass: H x cw x 3
+        r0 = _scratch("r0", (H, cw, 3), np.uint8)
+        r1 = _scratch("r1", (H, cw, 3), np.uint8)
+        rows = _scratch("rows", (H, cw, 3))
+        np.take(src, yi0, axis=0, out=r0)
+        np.take(src, yi1, axis=0, out=r1)
+        np.subtract(r1, r0, out=rows, dtype=np.float32)
+        rows *= fy[:, None, None]
+        rows += r0
+
+        # Horizontal pass: H x W x 3
+        c0 = _scratch("c0", (H, W, 3))
+        c1 = _scratch("c1", (H, W, 3))
+        np.take(rows, xi0 - lo, axis=1, out=c0)
+        np.take(rows, xi1 - lo, axis=1, out=c1)
+        c1 -= c0
+        c1 *= fx[None, :, None]
+        c1 += c0
+        c1 += 0.5
+        np.copyto(self.out, c1, casting="unsafe")
+        return self.out
+
+
+# ==================== QUALITY / SPEED CHECK ====================
+def compare_with_moviepy(
+    img_path: PathLike,
+    p: "SlideshowParams",
+    *,
+    duration: float = 3.0,
+    idx: int = 0,
+    samples: int = 10,
+) -> Dict[str, float]:
+    """
+    Render the same frames with the legacy moviepy clip and the renderer.
+
+    Returns mean/max absolute pixel error and frames per second of each.
+    """
+    from scripts.build_video import _make_clip_moviepy
+
+    times = [duration * i / max(1, samples - 1) for i in range(samples)]
+    times[-1] = min(times[-1], duration - 1e-3)
+
+    legacy = _make_clip_moviepy(img_path, duration, idx, p)
+    t0 = time.perf_counter()
+    ref = [legacy.get_frame(t).astype(np.int16) for t in times]
+    legacy_fps = samples / (time.perf_counter() - t0)
+
+    renderer = KenBurnsRenderer.from_path(img_path, duration, idx, p)
+    renderer.load()
+    t0 = time.perf_counter()
+    errs = [np.abs(renderer.make_frame(t).astype(np.int16) - r) for t, r in zip(times, ref)]
+    fast_fps = samples / (time.perf_counter() - t0)
+
+    return {
+        "mean_abs_err": float(np.mean([e.mean() for e in errs])),
+        "max_abs_err": float(max(e.max() for e in errs)),
+        "moviepy_fps": legacy_fps,
+        "renderer_fps": fast_fps,
+    }
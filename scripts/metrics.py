@@ -0,0 +1,312 @@
+from __future__ import annotations
+
+import contextlib
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, IO, Iterable, Iterator, List, Optional, Sequence, Union
+
+try:
+    import resource
+except ImportError:     # Windows: no getrusage; peak RSS / child CPU report None
+    resource = None
+
+PathLike = Union[str, Path]
+
+# Histogram bucket upper edges; frame times are recorded in ms, latencies in s
+MS_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+S_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 5, 10, 20, 60)
+
+
+# ==================== HELPERS ====================
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process so far (None without `resource`)."""
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (2**20 if sys.platform == "darwin" else 2**10)
+
+
+def current_rss_mb() -> Optional[float]:
+    """Current RSS from /proc (Linux); None elsewhere."""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def descendant_rss_mb() -> Optional[Dict[int, float]]:
+    """Current RSS of each live descendant process (ffmpeg, workers) from /proc; None elsewhere."""
+    try:
+        pids = [int(d) for d in os.listdir("/proc") if d.isdigit()]
+    except OSError:
+        return None
+    children: Dict[int, List[int]] = defaultdict(list)
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/stat", "rb") as f:
+                stat = f.read()
+            # The command name may hold spaces and ")"; the fields after it do not
+            ppid = int(stat[stat.rindex(b")") + 1:].split()[1])
+        except (OSError, ValueError, IndexError):
+            continue                # exited meanwhile
+        children[ppid].append(pid)
+
+    page = os.sysconf("SC_PAGE_SIZE")
+    rss: Dict[int, float] = {}
+    todo = list(children[os.getpid()])
+    while todo:
+        pid = todo.pop()
+        todo += children[pid]
+        try:
+            with open(f"/proc/{pid}/statm", "r") as f:
+                rss[pid] = int(f.read().split()[1]) * page / 2**20
+        except (OSError, ValueError, IndexError):
+            continue
+    return rss
+
+
+def _children_cpu() -> Optional[float]:
+    """User + system CPU seconds of finished child processes (ffmpeg, workers)."""
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _percentile(sorted_values: Sequence[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * q
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def histogram(values: Sequence[float], edges: Sequence[float]) -> Dict[str, Any]:
+    """Summary stats plus counts per bucket (`<=edge`, then `>last`)."""
+    v = sorted(values)
+    counts = [0] * (len(edges) + 1)
+    i = 0
+    for x in v:
+        while i < len(edges) and x > edges[i]:
+            i += 1
+        counts[i] += 1
+    labels = [f"<={e}" for e in edges] + [f">{edges[-1]}"]
+    return {
+        "count": len(v),
+        "mean": sum(v) / len(v) if v else 0.0,
+        "min": v[0] if v else 0.0,
+        "p50": _percentile(v, 0.50),
+        "p90": _percentile(v, 0.90),
+        "p99": _percentile(v, 0.99),
+        "max": v[-1] if v else 0.0,
+        "buckets": dict(zip(labels, counts)),
+    }
+
+
+_SPEED = re.compile(r"([\d.]+)x")
+
+
+def parse_progress(lines: Iterable[str]) -> Iterator[Dict[str, str]]:
+    """
+    Group ffmpeg `-progress` output (key=value lines, each block ending in
+    progress=continue|end) into dicts.
+    """
+    block: Dict[str, str] = {}
+    for line in lines:
+        key, sep, value = line.strip().partition("=")
+        if not sep:
+            continue
+        block[key] = value.strip()
+        if key == "progress":
+            yield block
+            block = {}
+
+
+# ==================== RECORDER ====================
+class MetricsRecorder:
+    """
+    Collects spans (wall + CPU time), samples (latencies, frame times) and
+    ffmpeg progress, and exports them as JSON or a Chrome trace.
+
+    Disabled by default: every call is then a cheap no-op, so the hooks can
+    stay in hot paths. Safe to use from several threads.
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._t0 = time.perf_counter()
+            self._children0 = _children_cpu()
+            self.spans: List[Dict[str, Any]] = []
+            self.samples: Dict[str, List[float]] = defaultdict(list)
+            self.ffmpeg: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+            self.counters: List[Dict[str, Any]] = []
+
+    def enable(self, on: bool = True) -> "MetricsRecorder":
+        self.enabled = on
+        return self
+
+    def _now_us(self) -> float:
+        return (time.perf_counter() - self._t0) * 1e6
+
+    # ---------- recording ----------
+    @contextlib.contextmanager
+    def span(self, name: str, cat: str = "stage", **args: Any):
+        """Time a block: wall, this thread's CPU and the whole process's CPU."""
+        if not self.enabled:
+            yield
+            return
+        ts = self._now_us()
+        wall0, thread0, proc0 = time.perf_counter(), time.thread_time(), time.process_time()
+        try:
+            yield
+        finally:
+            rss = current_rss_mb()
+            span = {
+                "name": name,
+                "cat": cat,
+                "ts": ts,
+                "wall": time.perf_counter() - wall0,
+                "cpu": time.thread_time() - thread0,
+                "process_cpu": time.process_time() - proc0,
+                "tid": threading.get_ident(),
+                "thread": threading.current_thread().name,
+                "rss_mb": rss,
+                "args": args,
+            }
+            with self._lock:
+                self.spans.append(span)
+                if rss is not None:
+                    self.counters.append({"name": "memory", "ts": self._now_us(), "values": {"rss_mb": rss}})
+
+    def observe(self, name: str, value: float) -> None:
+        """Add one sample (e.g. a sentence's synthesis seconds, a frame's ms)."""
+        if self.enabled:
+            with self._lock:
+                self.samples[name].append(float(value))
+
+    def ffmpeg_progress(self, label: str, block: Dict[str, str]) -> None:
+        """Record one parsed `-progress` block (frame, fps, speed, ...)."""
+        if not self.enabled:
+            return
+        m = _SPEED.match(block.get("speed", ""))
+        entry = {
+            "ts": self._now_us(),
+            "frame": int(block["frame"]) if block.get("frame", "").isdigit() else None,
+            "fps": float(block["fps"]) if re.fullmatch(r"[\d.]+", block.get("fps", "")) else None,
+            "speed": float(m.group(1)) if m else None,
+            "out_time_s": int(block["out_time_us"]) / 1e6 if block.get("out_time_us", "").isdigit() else None,
+            "done": block.get("progress") == "end",
+        }
+        with self._lock:
+            self.ffmpeg[label].append(entry)
+            if entry["speed"] is not None:
+                self.counters.append(
+                    {"name": f"ffmpeg:{label}", "ts": entry["ts"], "values": {"speed": entry["speed"]}}
+                )
+
+    def read_progress(self, label: str, stream: IO[str]) -> threading.Thread:
+        """Consume an ffmpeg `-progress pipe:1` stream on a background thread."""
+        def pump():
+            for block in parse_progress(stream):
+                self.ffmpeg_progress(label, block)
+
+        t = threading.Thread(target=pump, name=f"progress-{label}", daemon=True)
+        t.start()
+        return t
+
+    # ---------- export ----------
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            spans = list(self.spans)
+            samples = {k: list(v) for k, v in self.samples.items()}
+            ffmpeg = {k: list(v) for k, v in self.ffmpeg.items()}
+
+        stages: Dict[str, Dict[str, float]] = {}
+        for s in spans:
+            agg = stages.setdefault(s["name"], {"count": 0, "wall": 0.0, "cpu": 0.0, "process_cpu": 0.0})
+            agg["count"] += 1
+            for k in ("wall", "cpu", "process_cpu"):
+                agg[k] += s[k]
+
+        encodes = {}
+        for label, entries in ffmpeg.items():
+            speeds = [e["speed"] for e in entries if e["speed"] is not None]
+            encodes[label] = {
+                "final_speed": speeds[-1] if speeds else None,
+                "mean_speed": sum(speeds) / len(speeds) if speeds else None,
+                "frames": max((e["frame"] or 0 for e in entries), default=0),
+            }
+
+        children = _children_cpu()
+        return {
+            "elapsed": time.perf_counter() - self._t0,
+            "stages": stages,
+            "samples": {
+                name: histogram(values, MS_BUCKETS if name.endswith("_ms") else S_BUCKETS)
+                for name, values in samples.items()
+            },
+            "ffmpeg": encodes,
+            "memory": {"peak_rss_mb": peak_rss_mb()},
+            "children_cpu": None if children is None else children - self._children0,
+        }
+
+    def write_json(self, path: PathLike) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.summary(), indent=2), encoding="utf-8")
+        return path
+
+    def write_chrome_trace(self, path: PathLike) -> Path:
+        """Trace-event JSON for chrome://tracing or ui.perfetto.dev."""
+        pid = os.getpid()
+        with self._lock:
+            events: List[Dict[str, Any]] = [
+                {
+                    "name": s["name"],
+                    "cat": s["cat"],
+                    "ph": "X",
+                    "ts": s["ts"],
+                    "dur": s["wall"] * 1e6,
+                    "pid": pid,
+                    "tid": s["tid"],
+                    "args": {"cpu_s": s["cpu"], "process_cpu_s": s["process_cpu"], **s["args"]},
+                }
+                for s in self.spans
+            ]
+            events += [
+                {"name": c["name"], "ph": "C", "ts": c["ts"], "pid": pid, "args": c["values"]}
+                for c in self.counters
+            ]
+            names = {s["tid"]: s["thread"] for s in self.spans}
+        events += [
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+            for tid, name in names.items()
+        ]
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}), encoding="utf-8")
+        return path
+
+    def export(self, folder: PathLike, trace: bool = True) -> None:
+        folder = Path(folder)
+        print(f"📊 Metrics: {self.write_json(folder / 'metrics.json')}")
+        if trace:
+            print(f"📊 Trace:   {self.write_chrome_trace(folder / 'trace.json')}")
+
+
+# Process-wide recorder used by the pipeline modules' hooks.
+default_recorder = MetricsRecorder()
@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+import contextlib
+import math
+import multiprocessing as mp
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from scripts.build_video import SlideshowParams, plan_slideshow
+from scripts.burner import subtitles_filter
+from scripts.checkpoint import Checkpoint
+from scripts.encoding import EncodeProfile, get_profile
+from scripts.ffmpeg_pipe import FFMPEG_BIN, FrameWriter, frame_count, iter_video_frames, run_ffmpeg
+from scripts.hashing import file_sha256, json_sha256
+from scripts.metrics import default_recorder
+
+PathLike = Union[str, Path]
+
+
+# ==================== SEGMENT PLANNING ====================
+def segment_boundaries(
+    image_paths: Sequence[PathLike],
+    total_audio: float,
+    p: SlideshowParams,
+    segments: int,
+) -> List[int]:
+    """
+    Frame indices [0, b1, ..., total_frames] splitting the timeline into at
+    most `segments` parts. A cut never falls strictly inside a crossfade, so
+    no transition spans two segments.
+    """
+    sched = plan_slideshow(image_paths, total_audio, p)
+    total_frames = frame_count(sched.total, p.fps)
+
+    xfade_frames = frame_count(sched.xfade, p.fps)
+    transitions = [
+        frame_count(sched.clip_start(i), p.fps) for i in range(1, len(sched.image_paths))
+    ]
+    candidates = [
+        f for f in range(1, total_frames)
+        if not any(s < f < s + xfade_frames for s in transitions)
+    ]
+
+    cuts: List[int] = []
+    for k in range(1, max(1, segments)):
+        target = k * total_frames / segments
+        best = min(candidates, key=lambda f: abs(f - target), default=None)
+        if best is not None and best not in cuts:
+            cuts.append(best)
+    return [0] + sorted(cuts) + [total_frames]
+
+
+# ==================== WORKER ====================
+def _render_segment(
+    image_paths: List[str],
+    audio_path: str,
+    p: SlideshowParams,
+    start_frame: int,
+    end_frame: int,
+    seg_path: str,
+    video_args: List[str],
+    ass_path: Optional[str],
+) -> Tuple[str, int]:
+    """Render frames [start_frame, end_frame) of the full timeline to seg_path."""
+    from moviepy.editor import AudioFileClip
+
+    from scripts.build_video import build_video
+
+    audio_clip = AudioFileClip(audio_path)
+    try:
+        video = build_video(image_paths, audio_clip, p)
+        output_args = ["-an"]
+        if ass_path:
+            # Shift to global time for libass, then back to segment-local time
+            offset = start_frame / p.fps
+            output_args += [
+                "-vf",
+                f"setpts=PTS+{offset:.6f}/TB,{subtitles_filter(ass_path)},setpts=PTS-STARTPTS",
+            ]
+        output_args += video_args
+
+        with FrameWriter(
+            seg_path, (p.target_w, p.target_h), p.fps, output_args=output_args
+        ) as writer:
+            for frame in iter_video_frames(video, p.fps, start_frame, end_frame):
+                writer.write(frame)
+        return seg_path, writer.frames_written
+    finally:
+        audio_clip.close()
+
+
+# ==================== MAIN ENTRY ====================
+def render_parallel_to_file(
+    image_paths: Sequence[PathLike],
+    audio_path: PathLike,
+    out_path: PathLike,
+    params: Optional[SlideshowParams] = None,
+    *,
+    workers: Optional[int] = None,
+    ass_path: Optional[PathLike] = None,
+    segment_seconds: Optional[float] = None,
+    checkpoint_dir: Optional[PathLike] = None,
+    profile: Union[str, EncodeProfile, None] = None,
+) -> Path:
+    """
+    Time-sharded render: each segment of the timeline is rendered and encoded
+    in its own process (fixed GOP, no audio), then the segments are joined
+    with ffmpeg's concat demuxer (stream copy) while the audio is muxed in.
+
+    Frames are sampled at the same t = i / fps as the serial path, so the
+    result has the same frame count, duration and A/V sync.
+
+    `segment_seconds` caps each segment's length (more segments than
+    workers). With `checkpoint_dir`, finished segments are journaled there
+    and a rerun with the same inputs renders only the missing ones.
+    """
+    from moviepy.editor import AudioFileClip
+
+    if not image_paths:
+        raise ValueError("image_paths is empty.")
+
+    p = params or SlideshowParams()
+    workers = max(1, workers or (os.cpu_count() or 1))
+    out_path = Path(out_path).resolve()
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+
+    with AudioFileClip(str(audio_path)) as probe:
+        total_audio = max(0.01, float(probe.duration))
+    segments = workers
+    if segment_seconds:
+        segments = max(workers, math.ceil(total_audio / segment_seconds))
+    bounds = segment_boundaries(image_paths, total_audio, p, segments)
+    total_frames = bounds[-1]
+
+    enc = get_profile(profile)
+    if not enc.threads and workers > 1:
+        # One x264 per worker: split the cores instead of oversubscribing them
+        enc = get_profile(enc, threads=max(1, (os.cpu_count() or 1) // workers))
+    video_args = [
+        *enc.video_args(p.fps, fixed_gop=True),
+        "-r", str(p.fps),  # setpts drops the rate; keep segments at exactly fps
+    ]
+
+    with contextlib.ExitStack() as stack:
+        if checkpoint_dir is not None:
+            # Segment names carry their frame range, so only the inputs and
+            # encoder settings go into the fingerprint
+            fingerprint = json_sha256({
+                "images": [file_sha256(x) for x in image_paths],
+                "audio": file_sha256(audio_path),
+                "ass": file_sha256(ass_path) if ass_path else None,
+                "params": asdict(p),
+                "video_args": video_args,
+            })
+            ckpt = Checkpoint(checkpoint_dir, fingerprint)
+        else:
+            tmp = stack.enter_context(tempfile.TemporaryDirectory(prefix="segments_", dir=out_path.parent))
+            ckpt = Checkpoint(tmp)
+
+        units = [f"seg_{bounds[k]:07d}_{bounds[k + 1]:07d}" for k in range(len(bounds) - 1)]
+        seg_paths: Dict[int, Path] = {}
+        for k, unit in enumerate(units):
+            done = ckpt.done(unit)
+            if done is not None:
+                seg_paths[k] = done
+        todo = [k for k in range(len(units)) if k not in seg_paths]
+        ckpt.report("segment")
+        print(f"🎞️  Rendering {total_frames} frames in {len(units)} segment(s), {len(todo)} to do")
+
+        def render_args(k: int) -> tuple:
+            return (
+                [str(x) for x in image_paths],
+                str(audio_path),
+                p,
+                bounds[k],
+                bounds[k + 1],
+                str(ckpt.tmp_path(units[k], ".mp4")),
+                video_args,
+                str(ass_path) if ass_path else None,
+            )
+
+        def finish(k: int, result: Tuple[str, int]) -> None:
+            tmp_seg, written = result
+            expected = bounds[k + 1] - bounds[k]
+            if written != expected:
+                raise RuntimeError(f"Segment {units[k]}: rendered {written} frames, expected {expected}")
+            seg_paths[k] = ckpt.commit(units[k], tmp_seg, ".mp4")
+
+        with default_recorder.span("render.segments", cat="render", segments=len(todo)):
+            if workers == 1:
+                for k in todo:
+                    finish(k, _render_segment(*render_args(k)))
+            elif todo:
+                # spawn: each worker starts clean instead of inheriting moviepy/ffmpeg state
+                ctx = mp.get_context("spawn")
+                with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+                    futures = {pool.submit(_render_segment, *render_args(k)): k for k in todo}
+                    error: Optional[BaseException] = None
+                    for f in as_completed(futures):
+                        # Keep journaling the segments that do finish, so a
+                        # rerun after one failure only redoes what is missing
+                        try:
+                            finish(futures[f], f.result())
+                        except Exception as e:
+                            error = error or e
+                    if error is not None:
+                        raise error
+
+        list_file = ckpt.folder / "segments.txt"
+        list_file.write_text(
+            "".join(f"file '{seg_paths[k].resolve().as_posix()}'\n" for k in range(len(units))),
+            encoding="utf-8",
+        )
+        cmd = [
+            FFMPEG_BIN,
+            "-y",
+            "-loglevel", "error",
+            "-f", "concat",
+            "-safe", "0",
+            "-i", str(list_file),
+            "-i", str(audio_path),
+            "-map", "0:v:0",
+            "-map", "1:a:0",
+            "-c:v", "copy",
+            *enc.audio_args(),
+            "-t", f"{total_frames / p.fps:.6f}",
+            str(out_path),
+        ]
+        with default_recorder.span("render.concat", cat="ffmpeg"):
+            run_ffmpeg(cmd, "concat")
+        if checkpoint_dir is not None:
+            ckpt.clear()
+
+    print(f"✅ Saved: {out_path}")
+    return out_path
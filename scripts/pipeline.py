@@ -0,0 +1,321 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Union
+
+from scripts.hashing import file_sha256, json_sha256
+from scripts.metrics import default_recorder
+
+PathLike = Union[str, Path]
+
+
+# ==================== HELPERS ====================
+def path_digest(path: PathLike) -> Optional[str]:
+    """Content hash of a file or of a whole directory tree; None if missing."""
+    path = Path(path)
+    if path.is_file():
+        return file_sha256(path)
+    if path.is_dir():
+        files = sorted(p for p in path.rglob("*") if p.is_file())
+        return json_sha256([[p.relative_to(path).as_posix(), file_sha256(p)] for p in files])
+    return None
+
+
+def _has_content(path: PathLike) -> bool:
+    path = Path(path)
+    if path.is_dir():
+        return any(p.is_file() for p in path.rglob("*"))
+    return path.exists()
+
+
+# ==================== STAGE ====================
+@dataclass
+class Stage:
+    """
+    One pipeline step.
+
+    `run` receives {dep_name: result} for its deps. A memoized stage is
+    skipped when its params, the content of its `inputs` and its recorded
+    `outputs` are all unchanged since its last successful run.
+
+    A stage with memoize=False and no outputs is a *resource* (e.g. a model
+    load): it only runs when some stage that depends on it has to run.
+
+    `lock`, if given, is held while `run` executes, so stages of different
+    pipelines can share a model that is not safe to call concurrently.
+    """
+    name: str
+    run: Callable[[Dict[str, Any]], Any]
+    deps: Sequence[str] = ()
+    inputs: Sequence[PathLike] = ()
+    outputs: Sequence[PathLike] = ()
+    params: Dict[str, Any] = field(default_factory=dict)
+    memoize: bool = True
+    lock: Optional[Any] = None
+
+    @property
+    def is_resource(self) -> bool:
+        return not self.memoize and not self.outputs
+
+
+# ==================== PIPELINE ====================
+class Pipeline:
+    """
+    DAG of stages with content-hash memoization, persisted in a JSON file.
+
+    `on_event`, if given, is called with a dict for every stage that starts,
+    finishes, fails or is skipped (from the stage's worker thread).
+    """
+
+    def __init__(
+        self,
+        stages: Sequence[Stage],
+        state_path: PathLike = "assets/.pipeline_state.json",
+        label: Optional[str] = None,
+        on_event: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ):
+        self.stages: Dict[str, Stage] = {}
+        for st in stages:
+            if st.name in self.stages:
+                raise ValueError(f"Duplicate stage name: {st.name}")
+            self.stages[st.name] = st
+        for st in stages:
+            for d in st.deps:
+                if d not in self.stages:
+                    raise ValueError(f"Stage {st.name!r} depends on unknown stage {d!r}")
+        self.order = self._toposort()
+        self.label = label
+        self.on_event = on_event
+        self.state_path = Path(state_path)
+        self.state: Dict[str, dict] = self._load_state()
+        self.results: Dict[str, Any] = {}
+        self.timings: Dict[str, float] = {}
+        self.timeline: Dict[str, Dict[str, Any]] = {}
+        self._t0 = time.time()
+        self._lock = threading.Lock()
+
+    # ---------- graph ----------
+    def _toposort(self) -> List[str]:
+        order: List[str] = []
+        mark: Dict[str, int] = {}
+
+        def visit(name: str) -> None:
+            if mark.get(name) == 2:
+                return
+            if mark.get(name) == 1:
+                raise ValueError(f"Cycle in pipeline at stage {name!r}")
+            mark[name] = 1
+            for d in self.stages[name].deps:
+                visit(d)
+            mark[name] = 2
+            order.append(name)
+
+        for name in self.stages:
+            visit(name)
+        return order
+
+    def ancestors(self, targets: Iterable[str]) -> Set[str]:
+        seen: Set[str] = set()
+        stack = list(targets)
+        while stack:
+            name = stack.pop()
+            if name not in self.stages:
+                raise KeyError(f"Unknown stage: {name}")
+            if name in seen:
+                continue
+            seen.add(name)
+            stack.extend(self.stages[name].deps)
+        return seen
+
+    def dependents(self, name: str) -> List[str]:
+        return [n for n in self.order if name in self.stages[n].deps]
+
+    # ---------- state ----------
+    def _load_state(self) -> Dict[str, dict]:
+        if self.state_path.exists():
+            try:
+                return json.loads(self.state_path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                return {}
+        return {}
+
+    def _save_state(self) -> None:
+        with self._lock:
+            self.state_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.state_path.with_name(f"{self.state_path.name}.{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(self.state, indent=2, sort_keys=True), encoding="utf-8")
+            os.replace(tmp, self.state_path)
+
+    def fingerprint(self, st: Stage) -> str:
+        return json_sha256(
+            {
+                "params": st.params,
+                "inputs": {str(p): path_digest(p) for p in st.inputs},
+            }
+        )
+
+    def _outputs_digest(self, st: Stage) -> Dict[str, Optional[str]]:
+        return {str(p): path_digest(p) for p in st.outputs}
+
+    def is_fresh(self, st: Stage) -> bool:
+        """True if the stage's last recorded run still matches what's on disk."""
+        if not st.memoize:
+            return False
+        rec = self.state.get(st.name)
+        if not rec or rec.get("fingerprint") != self.fingerprint(st):
+            return False
+        if not all(_has_content(p) for p in st.outputs):
+            return False
+        return rec.get("outputs") == self._outputs_digest(st)
+
+    # ---------- planning ----------
+    def plan(self, targets: Optional[Iterable[str]] = None, force: Iterable[str] = ()) -> List[str]:
+        """
+        Stages that will run, in order. Conservative: a stage is dirty if its
+        own fingerprint changed or any (non-resource) upstream stage is dirty.
+        """
+        scope = self.ancestors(targets) if targets else set(self.order)
+        force = set(force)
+        dirty: Set[str] = set()
+        for name in self.order:
+            st = self.stages[name]
+            if name not in scope or st.is_resource:
+                continue
+            upstream_dirty = any(d in dirty for d in st.deps)
+            if name in force or upstream_dirty or not self.is_fresh(st):
+                dirty.add(name)
+
+        # Resources are needed only by dirty dependents (walk back-to-front)
+        for name in reversed(self.order):
+            st = self.stages[name]
+            if name in scope and st.is_resource:
+                if any(n in dirty for n in self.dependents(name)):
+                    dirty.add(name)
+        return [n for n in self.order if n in dirty]
+
+    # ---------- execution ----------
+    def _tag(self, name: str) -> str:
+        return f"[{self.label}:{name}]" if self.label else f"[{name}]"
+
+    def _emit(self, kind: str, name: str, **extra: Any) -> None:
+        """Report stage progress to `on_event` as {"event", "stage", "t", ...}."""
+        if self.on_event is not None:
+            self.on_event({"event": kind, "stage": name, "t": time.time() - self._t0, **extra})
+
+    def _deps_results(self, st: Stage) -> Dict[str, Any]:
+        return {d: self.results.get(d) for d in st.deps}
+
+    def run_stage(self, name: str) -> bool:
+        """Run one stage unless it is fresh. Returns True if it ran."""
+        st = self.stages[name]
+        start = time.time()
+        if st.memoize and self.is_fresh(st):
+            print(f"⏭️  {self._tag(name)} unchanged, skipping")
+            self.timeline[name] = {"start": start - self._t0, "end": time.time() - self._t0, "ran": False}
+            self._emit("skipped", name)
+            return False
+
+        print(f"▶️  {self._tag(name)} running")
+        self._emit("started", name)
+        try:
+            with default_recorder.span(name, cat="stage", job=self.label):
+                if st.lock is not None:
+                    with st.lock:
+                        self.results[name] = st.run(self._deps_results(st))
+                else:
+                    self.results[name] = st.run(self._deps_results(st))
+        except Exception as e:
+            self._emit("failed", name, error=f"{type(e).__name__}: {e}")
+            raise
+        end = time.time()
+        self.timings[name] = end - start
+        self.timeline[name] = {"start": start - self._t0, "end": end - self._t0, "ran": True}
+        print(f"✅ {self._tag(name)} done in {self.timings[name]:.2f}s")
+        self._emit("finished", name, seconds=self.timings[name])
+
+        if st.memoize:
+            rec = {
+                "fingerprint": self.fingerprint(st),
+                "outputs": self._outputs_digest(st),
+                "finished_at": time.time(),
+            }
+            with self._lock:
+                self.state[name] = rec
+            self._save_state()
+        return True
+
+    def run(
+        self,
+        targets: Optional[Iterable[str]] = None,
+        force: Iterable[str] = (),
+        max_workers: int = 1,
+    ) -> Dict[str, Any]:
+        """
+        Run every dirty stage needed for `targets` (default: all).
+
+        With max_workers > 1, independent stages run concurrently on a thread
+        pool; each stage starts as soon as the stages it depends on finish.
+        """
+        force = set(force)
+        planned = self.plan(targets, force)
+        for name in planned:
+            if name in force:
+                self.state.pop(name, None)
+
+        self._t0 = time.time()
+        self.timeline.clear()
+        if not planned:
+            print("✅ Everything is up to date.")
+        elif max_workers <= 1:
+            for name in planned:
+                self.run_stage(name)
+        else:
+            self._run_concurrent(planned, max_workers)
+        self.report_timeline()
+        return self.results
+
+    def _run_concurrent(self, planned: List[str], max_workers: int) -> None:
+        pending = list(planned)
+        running: Dict[Any, str] = {}
+        error: Optional[BaseException] = None
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="stage") as pool:
+            while (pending and error is None) or running:
+                if error is None:
+                    busy = set(pending) | set(running.values())
+                    for name in [n for n in pending if not busy & set(self.stages[n].deps)]:
+                        pending.remove(name)
+                        running[pool.submit(self.run_stage, name)] = name
+                if not running:
+                    break
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for fut in finished:
+                    name = running.pop(fut)
+                    exc = fut.exception()
+                    if exc is not None and error is None:
+                        print(f"❌ {self._tag(name)} failed: {exc}")
+                        error = exc
+        if error is not None:
+            raise error
+
+    def report_timeline(self, width: int = 40) -> None:
+        """Print when each stage started/ended, as a small text Gantt chart."""
+        if not self.timeline:
+            return
+        total = max(v["end"] for v in self.timeline.values()) or 1e-9
+        print(f"\n⏱️  Stage timeline{f' ({self.label})' if self.label else ''}")
+        for name, v in sorted(self.timeline.items(), key=lambda kv: kv[1]["start"]):
+            a = int(v["start"] / total * width)
+            b = max(a + 1, int(v["end"] / total * width))
+            bar = " " * a + ("█" if v["ran"] else "·") * (b - a)
+            status = "" if v["ran"] else " (skipped)"
+            print(
+                f"  {name:<14} {v['start']:7.2f}s → {v['end']:7.2f}s  |{bar:<{width}}|{status}"
+            )
+        print(f"  {'total':<14} {total:7.2f}s")
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Union
+
+# Plain config, kept apart from build_video so that building a job (and the
+# CLI's startup) does not import numpy/cv2. build_video re-exports both.
+
+PathLike = Union[str, Path]
+
+
+# ==================== CONFIG ====================
+@dataclass
+class SlideshowParams:
+    target_w: int = 1080
+    target_h: int = 1920
+    fps: int = 30                         # looks smoother for shorts
+    min_per_image: float = 3.0
+    whip_max: float = 0.45                # max crossfade duration cap
+
+    # Look / motion
+    contrast: float = 1.08
+    zoom_start: float = 1.00
+    zoom_end_even: float = 1.06
+    zoom_end_odd: float = 1.08
+
+    # Global fades
+    global_fade_in_cap: float = 0.30
+    global_fade_out_cap: float = 0.25
+    global_fade_in_frac: float = 0.15
+    global_fade_out_frac: float = 0.12
+
+    # Robustness against edge artifacts / black bars:
+    # - Slightly overscale the "cover" fit so we're always >= canvas by a hair.
+    # - Use ceil() per-frame when resizing so rounding never under-fills.
+    overscan: float = 1.003               # ~0.3% larger than canvas after "cover"
+    safety_min_body: float = 0.4          # min visible body per image (ex-fade)
+
+    # Rendering: NumPy Ken Burns renderer (fast) vs. moviepy resize/composite
+    fast_render: bool = True
+    cache_images: bool = True             # reuse prepared images from cache/images
+
+
+@dataclass
+class RenderTarget:
+    """One output of a multi-target render; a size of None means the params' target size."""
+    path: PathLike
+    width: Optional[int] = None
+    height: Optional[int] = None
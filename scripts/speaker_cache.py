@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Any, Dict, Tuple, Union
+
+from scripts.hashing import file_sha256
+
+PathLike = Union[str, Path]
+
+# Latents are stored as <sha256-of-wav>.pt so they survive between runs.
+SPEAKER_CACHE_DIR = "cache/speaker_latents"
+
+Latents = Tuple[Any, Any]  # (gpt_cond_latent, speaker_embedding)
+
+
+class SpeakerLatentCache:
+    """
+    In-memory + on-disk cache of XTTS conditioning latents.
+
+    Keyed by the reference WAV's content hash, so renaming the file is free
+    and editing it invalidates the entry.
+    """
+
+    def __init__(self, cache_dir: PathLike = SPEAKER_CACHE_DIR):
+        self.cache_dir = Path(cache_dir)
+        self._mem: Dict[str, Latents] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, model, speaker_wav: PathLike) -> Latents:
+        """Return (gpt_cond_latent, speaker_embedding) for speaker_wav."""
+        import torch
+
+        key = file_sha256(speaker_wav)
+        if key in self._mem:
+            self.hits += 1
+            return self._mem[key]
+
+        disk_path = self.cache_dir / f"{key}.pt"
+        if disk_path.exists():
+            data = torch.load(disk_path, map_location="cpu", weights_only=True)
+            latents = (data["gpt_cond_latent"], data["speaker_embedding"])
+            self.hits += 1
+        else:
+            cfg = model.config
+            latents = model.get_conditioning_latents(
+                audio_path=[str(speaker_wav)],
+                gpt_cond_len=cfg.gpt_cond_len,
+                gpt_cond_chunk_len=cfg.gpt_cond_chunk_len,
+                max_ref_length=cfg.max_ref_len,
+                sound_norm_refs=cfg.sound_norm_refs,
+            )
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = disk_path.with_name(f"{key}.{os.getpid()}.tmp")
+            torch.save(
+                {"gpt_cond_latent": latents[0], "speaker_embedding": latents[1]},
+                tmp_path,
+            )
+            os.replace(tmp_path, disk_path)
+            self.misses += 1
+
+        self._mem[key] = latents
+        return latents
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses}
+
+    def report(self) -> None:
+        print(f"🗂️  Speaker latent cache: {self.hits} hit(s), {self.misses} miss(es)")
+
+
+# Shared by every generate_audio() call in this process.
+default_speaker_cache = SpeakerLatentCache()
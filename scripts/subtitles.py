@@ -1,12 +1,162 @@
 from __future__ import annotations
+
+import os
+import wave
 from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+from scripts.audio_assembly import read_timings
+from scripts.metrics import default_recorder
+
+MODELS_ROOT = "models"
+ALIGN_CHECKPOINT = "wav2vec2_fairseq_base_ls960_asr_ls960.pth"
+
+
+# ==================== HELPERS ====================
+def wav_duration(audio_path: str | Path) -> float:
+    """Duration in seconds from the file header, without decoding samples."""
+    try:
+        with wave.open(str(audio_path), "rb") as w:
+            return w.getnframes() / float(w.getframerate())
+    except wave.Error:
+        # e.g. float WAVs, which the stdlib reader rejects; still header-only
+        import soundfile as sf
+
+        return float(sf.info(str(audio_path)).duration)
+
+
+# ==================== ALIGNER ====================
+class Aligner:
+    """
+    WhisperX wav2vec2 alignment model, loaded once and reused for any number
+    of align() calls (e.g. every video in a batch).
+    """
+
+    def __init__(
+        self,
+        lang: str = "en",
+        device: str = "cpu",
+        models_root: str | Path = MODELS_ROOT,
+    ):
+        # WhisperX and PyTorch automatically look for checkpoints in TORCH_HOME/hub/checkpoints.
+        # By setting TORCH_HOME to your project's "models" folder, we make WhisperX treat:
+        # models/hub/checkpoints/wav2vec2_fairseq_base_ls960_asr_ls960.pth
+        # as its official local checkpoint. It will *not* search .cache or Hugging Face.
+        # The two environment variables below disable all online model fetching.
+        models_root = Path(models_root).resolve()
+        ckpt = models_root / "hub" / "checkpoints" / ALIGN_CHECKPOINT
+        if not ckpt.exists():
+            raise FileNotFoundError(f"Missing alignment checkpoint: {ckpt}")
+
+        os.environ["TORCH_HOME"] = str(models_root)
+        os.environ["HF_HUB_OFFLINE"] = "1"
+        os.environ["TRANSFORMERS_OFFLINE"] = "1"
+
+        import whisperx  # type: ignore
+
+        self._whisperx = whisperx
+        self.lang = lang
+        self.device = device
+        print(f"⏳ Loading alignment model ({lang}, {device})")
+        self.model, self.metadata = whisperx.load_align_model(
+            language_code=lang,
+            device=device,
+        )
+        print("✅ Alignment model loaded.\n")
+
+    def align(self, segments: List[dict], audio_path: str | Path) -> dict:
+        return self._whisperx.align(
+            segments, self.model, self.metadata, str(audio_path), self.device
+        )
+
+
+_ALIGNERS: Dict[Tuple[str, str], Aligner] = {}
+
+
+def get_aligner(lang: str = "en", device: str = "cpu") -> Aligner:
+    """Process-wide Aligner per (lang, device), created on first use."""
+    key = (lang, device)
+    if key not in _ALIGNERS:
+        _ALIGNERS[key] = Aligner(lang, device)
+    return _ALIGNERS[key]
+
+
+# ==================== SUBTITLES ====================
+def fmt_time(t: float) -> str:
+    # Round once on the whole value so 1.999 becomes 0:00:02.00, not .100
+    total_cs = int(round(max(0.0, t) * 100))
+    s, cs = divmod(total_cs, 100)
+    m, s = divmod(s, 60)
+    h, m = divmod(m, 60)
+    return f"{h}:{m:02}:{s:02}.{cs:02}"
+
+
+def esc(text: str) -> str:
+    return (
+        text.replace("\\", r"\\")
+        .replace("{", r"\{")
+        .replace("}", r"\}")
+        .replace("\n", r"\N")
+    )
+
+
+def has_times(w: dict) -> bool:
+    return w.get("start") is not None and w.get("end") is not None
+
+
+def q2(text: str) -> str:
+    return r"{\q2}" + text
+
+
+def line_chars(playres_w: int, fontsize: int, margin_l: int, margin_r: int) -> int:
+    """Monospace characters that fit on one line (glyphs are ~0.6 em wide)."""
+    return max(1, int((playres_w - margin_l - margin_r) / (fontsize * 0.6)))
+
+
+def group_words(
+    words: List[dict],
+    max_words: Optional[int] = None,
+    max_chars: Optional[int] = None,
+) -> List[List[dict]]:
+    """
+    Split aligned words into on-screen phrases of at most `max_words` words
+    and `max_chars` characters (a longer single word gets a phrase alone).
+    """
+    phrases: List[List[dict]] = []
+    current: List[dict] = []
+    width = 0
+    for w in words:
+        n = len(w["word"])
+        too_many = max_words is not None and len(current) >= max_words
+        too_wide = max_chars is not None and current and width + 1 + n > max_chars
+        if current and (too_many or too_wide):
+            phrases.append(current)
+            current, width = [], 0
+        width += n + (1 if current else 0)
+        current.append(w)
+    if current:
+        phrases.append(current)
+    return phrases
+
+
+def timing_segments(timings: Union[str, Path, List[dict]]) -> List[dict]:
+    """Sentence windows from generate_audio's timing manifest (path or list)."""
+    if isinstance(timings, (str, Path)):
+        timings = read_timings(timings)["sentences"]
+    return [
+        {"start": float(t["start"]), "end": float(t["end"]), "text": t["text"].strip()}
+        for t in timings
+        if t["text"].strip()
+    ]
 
 
 def generate_subtitles(
     audio_path: str | Path,
     ass_out_path: str | Path,
     *,
-    text_to_align: str,
+    text_to_align: Optional[str] = None,
+    timings: Union[str, Path, List[dict], None] = None,
+    word_level: bool = True,
     lang: str = "en",
     device: str = "cpu",
     playres_w: int = 1080,
@@ -21,65 +171,42 @@ def generate_subtitles(
     margin_v: int = 40,
     highlight_bg_color: str = "&H8033CCFF",
     highlight_text_color: str = "&H00000000",
+    max_words: Optional[int] = None,
+    max_chars: Optional[int] = None,
+    aligner: Optional[Aligner] = None,
 ) -> Path:
-    import os
-    from typing import List
-    from pydub import AudioSegment
-    import whisperx  # type: ignore
-
-    # WhisperX and PyTorch automatically look for checkpoints in TORCH_HOME/hub/checkpoints.
-    # By setting TORCH_HOME to your project's "models" folder, we make WhisperX treat:
-    # models/hub/checkpoints/wav2vec2_fairseq_base_ls960_asr_ls960.pth
-    # as its official local checkpoint. It will *not* search .cache or Hugging Face.
-    # The two environment variables below disable all online model fetching.
-    models_root = Path("models").resolve()
-    ckpt = (
-        models_root
-        / "hub"
-        / "checkpoints"
-        / "wav2vec2_fairseq_base_ls960_asr_ls960.pth"
-    )
-    if not ckpt.exists():
-        raise FileNotFoundError(f"Missing alignment checkpoint: {ckpt}")
+    """
+    Write an ASS file with the speech text and (optionally) a per-word
+    highlight.
 
-    os.environ["TORCH_HOME"] = str(models_root)
-    os.environ["HF_HUB_OFFLINE"] = "1"
-    os.environ["TRANSFORMERS_OFFLINE"] = "1"
+    With `timings` (generate_audio's manifest) each sentence is aligned on
+    its own short window instead of the whole file as one segment; with
+    `word_level=False` as well, sentence lines are written straight from the
+    manifest and WhisperX is never loaded.
 
+    Word-level lines are grouped into phrases of at most `max_words` words
+    and `max_chars` characters (default: what fits on one unwrapped line at
+    this font size; 0 for no limit), so each event stays short for libass.
+    """
     ass_out_path = Path(ass_out_path)
     ass_out_path.parent.mkdir(parents=True, exist_ok=True)
 
-    duration_s = AudioSegment.from_file(audio_path).duration_seconds
-    segments = [{"start": 0.0, "end": duration_s, "text": text_to_align}]
-
-    align_model, metadata = whisperx.load_align_model(
-        language_code=lang,
-        device=device,
-    )
-    aligned = whisperx.align(segments, align_model, metadata, str(audio_path), device)
-
-    def fmt_time(t: float) -> str:
-        if t < 0:
-            t = 0.0
-        h = int(t // 3600)
-        m = int((t % 3600) // 60)
-        s = int(t % 60)
-        cs = int(round((t - int(t)) * 100))
-        return f"{h}:{m:02}:{s:02}.{cs:02}"
-
-    def esc(text: str) -> str:
-        return (
-            text.replace("\\", r"\\")
-            .replace("{", r"\{")
-            .replace("}", r"\}")
-            .replace("\n", r"\N")
-        )
-
-    def has_times(w: dict) -> bool:
-        return w.get("start") is not None and w.get("end") is not None
+    if timings is not None:
+        segments = timing_segments(timings)
+    elif text_to_align is not None:
+        duration_s = wav_duration(audio_path)
+        segments = [{"start": 0.0, "end": duration_s, "text": text_to_align}]
+    else:
+        raise ValueError("Pass text_to_align or a timing manifest.")
 
-    def q2(text: str) -> str:
-        return r"{\q2}" + text
+    if word_level:
+        aligner = aligner or get_aligner(lang, device)
+        with default_recorder.span("subtitles.align", cat="subtitles", segments=len(segments)):
+            aligned_segments = aligner.align(segments, audio_path).get("segments", [])
+    elif timings is not None:
+        aligned_segments = segments
+    else:
+        raise ValueError("word_level=False needs a timing manifest.")
 
     header = (
         "[Script Info]\n"
@@ -100,31 +227,38 @@ def generate_subtitles(
 
     lines: List[str] = [header]
 
-    for seg in aligned.get("segments", []):
-        words = [w for w in seg.get("words", []) if has_times(w)]
-        if not words:
+    def dialogue(layer: int, start: float, end: float, style: str, text: str) -> None:
+        lines.append(
+            f"Dialogue:{layer},{fmt_time(start)},{fmt_time(end)},{style},,{margin_l},{margin_r},{margin_v},,{text}\n"
+        )
+
+    if max_chars is None:
+        max_chars = line_chars(playres_w, fontsize, margin_l, margin_r)
+
+    for seg in aligned_segments:
+        if not word_level:
+            # Sentence lines: let libass wrap them (no \q2)
+            dialogue(0, seg["start"], seg["end"], "Base", esc(seg["text"]))
             continue
 
-        display_tokens = [
-            str(w.get("word", "")).strip()
-            for w in words
-            if str(w.get("word", "")).strip()
+        words = [
+            {"word": str(w.get("word", "")).strip(), "start": float(w["start"]), "end": float(w["end"])}
+            for w in seg.get("words", [])
+            if has_times(w) and str(w.get("word", "")).strip()
         ]
-        base_text = " ".join(display_tokens)
-        if base_text:
-            lines.append(
-                f"Dialogue:0,{fmt_time(seg['start'])},{fmt_time(seg['end'])},Base,,{margin_l},{margin_r},{margin_v},,{q2(esc(base_text))}\n"
-            )
-
-        for i, w in enumerate(words):
-            token = str(w.get("word", "")).strip()
-            if not token:
-                continue
-            pad_len = len(" ".join(display_tokens[:i])) + (1 if i > 0 else 0)
-            overlay_text = (" " * pad_len) + token
-            lines.append(
-                f"Dialogue:1,{fmt_time(float(w['start']))},{fmt_time(float(w['end']))},HL,,{margin_l},{margin_r},{margin_v},,{q2(esc(overlay_text))}\n"
+        for phrase in group_words(words, max_words or None, max_chars or None):
+            dialogue(
+                0,
+                phrase[0]["start"],
+                phrase[-1]["end"],
+                "Base",
+                q2(esc(" ".join(w["word"] for w in phrase))),
             )
+            # Monospace overlay: pad each word to its column with a running offset
+            offset = 0
+            for w in phrase:
+                dialogue(1, w["start"], w["end"], "HL", q2(esc(" " * offset + w["word"])))
+                offset += len(w["word"]) + 1
 
     ass_out_path.write_text("".join(lines), encoding="utf-8")
     return ass_out_path
\ No newline at end of file
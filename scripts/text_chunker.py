@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import math
+import re
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+
+# XTTS warns (and may truncate) past ~250 characters for English; its BPE
+# averages roughly 3 characters per token on ordinary prose.
+CHARS_PER_TOKEN = 3.0
+
+# Words that end in "." without ending the sentence (compared lowercased,
+# without the trailing dot).
+ABBREVIATIONS = {
+    "mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st", "mt", "vs", "etc",
+    "e.g", "i.e", "cf", "approx", "no", "vol", "fig", "inc", "ltd", "co",
+    "corp", "dept", "est", "u.s", "u.k", "a.m", "p.m", "jan", "feb", "mar",
+    "apr", "jun", "jul", "aug", "sep", "sept", "oct", "nov", "dec",
+}
+
+# Abbreviations that also commonly end a sentence: split if a capital follows.
+_AMBIGUOUS = {"etc", "inc", "ltd", "co", "corp", "a.m", "p.m"}
+
+# Usually followed by a capitalized noun ("the U.S. Army"): split only if the
+# next word typically opens a sentence.
+_ATTRIBUTIVE = {"u.s", "u.k"}
+_SENTENCE_STARTERS = {
+    "a", "an", "the", "this", "that", "these", "those", "it", "its", "we", "you",
+    "he", "she", "they", "i", "there", "here", "but", "and", "so", "yet", "if",
+    "when", "what", "why", "how", "in", "on", "at", "for", "our", "my", "your",
+}
+
+# Only abbreviations when a number follows ("No. 5"), else ordinary words.
+_BEFORE_NUMBER = {"no"}
+
+_BOUNDARY = re.compile(r"[.!?]+[\"')\]”’]*(?=\s+)")
+
+# Clause split points, best first. Each match position is where the
+# second half starts.
+_CLAUSE_PATTERNS = [
+    re.compile(r"(?<=[;:])\s+"),
+    re.compile(r"(?<=[,—–])\s+|\s+(?=[—–])"),
+    re.compile(
+        r"\s+(?=(?:and|but|or|so|yet|because|although|though|while|which|"
+        r"when|where|unless|until|since|whereas)\b)",
+        re.IGNORECASE,
+    ),
+    re.compile(r"\s+"),
+]
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def xtts_token_counter(tts, language: str = "en") -> Callable[[str], int]:
+    """Exact counts from a loaded model's tokenizer, instead of estimate_tokens."""
+    tokenizer = tts.synthesizer.tts_model.tokenizer
+    return lambda text: len(tokenizer.encode(text, lang=language))
+
+
+# ==================== SENTENCES ====================
+def _ends_sentence(text: str, dot_at: int, next_word: str) -> bool:
+    """Whether the '.' at dot_at ends a sentence (not an abbreviation/initial)."""
+    word = re.search(r"([A-Za-z][A-Za-z.]*)$", text[:dot_at])
+    if not word:
+        return True
+    w = word.group(1).lower().rstrip(".")
+    next_char = next_word[:1]
+    if len(w) == 1 and word.group(1).isupper() and w != "i":
+        return False                      # an initial: "J. R. R. Tolkien"
+    if w in _BEFORE_NUMBER:
+        return not next_char.isdigit()
+    if w in _ATTRIBUTIVE:
+        return re.sub(r"\W", "", next_word).lower() in _SENTENCE_STARTERS
+    if w in ABBREVIATIONS:
+        return w in _AMBIGUOUS and next_char.isupper()
+    return True
+
+
+def split_sentences(text: str) -> List[str]:
+    """
+    Split prose into sentences on . ! ? without breaking at abbreviations
+    ("Dr.", "e.g."), initials or decimals ("3.14", "v2.0").
+    """
+    text = re.sub(r"\s+", " ", text).strip()
+    if not text:
+        return []
+    sentences: List[str] = []
+    start = 0
+    for m in _BOUNDARY.finditer(text):
+        end = m.end()
+        next_word = text[end + 1:].split(" ", 1)[0]
+        next_char = next_word[:1]
+        punct = m.group(0)
+        if punct.startswith(".") and len(punct.rstrip("\"')]”’")) == 1:
+            if not _ends_sentence(text, m.start(), next_word):
+                continue
+        if punct.startswith("...") and next_char.islower():
+            continue                      # trailing-off ellipsis mid-sentence
+        sentences.append(text[start:end].strip())
+        start = end
+    tail = text[start:].strip()
+    if tail:
+        sentences.append(tail)
+    return sentences
+
+
+# ==================== SPLIT / MERGE ====================
+def _split_long(text: str, max_tokens: int, count: Callable[[str], int]) -> List[str]:
+    """Split at the best clause boundary nearest the middle until pieces fit."""
+    if count(text) <= max_tokens:
+        return [text]
+    mid = len(text) / 2
+    for pattern in _CLAUSE_PATTERNS:
+        cuts = [m for m in pattern.finditer(text) if 0 < m.start() and m.end() < len(text)]
+        if cuts:
+            cut = min(cuts, key=lambda m: abs(m.start() - mid))
+            left, right = text[:cut.start()].strip(), text[cut.end():].strip()
+            return _split_long(left, max_tokens, count) + _split_long(right, max_tokens, count)
+    # One enormous "word": hard split by characters
+    step = max(1, int(max_tokens * CHARS_PER_TOKEN))
+    return [text[i:i + step] for i in range(0, len(text), step)]
+
+
+@dataclass
+class ChunkerParams:
+    max_tokens: int = 70      # ~210 chars: inside XTTS's comfortable window
+    min_tokens: int = 15      # shorter pieces are merged with a neighbour
+    target_tokens: int = 45   # merging stops once a chunk reaches this
+
+
+def chunk_text(
+    text: str,
+    params: Optional[ChunkerParams] = None,
+    count: Callable[[str], int] = estimate_tokens,
+) -> List[str]:
+    """
+    Turn a script into XTTS work units of similar length.
+
+    Sentences longer than max_tokens are split at clause boundaries
+    (; : , dashes, conjunctions, then spaces). Consecutive short sentences
+    are merged until a unit reaches target_tokens, and never past
+    max_tokens, so per-call overhead is amortized and synthesis time per
+    unit stays predictable. Units always end on a sentence or clause edge.
+    """
+    p = params or ChunkerParams()
+    pieces: List[str] = []
+    for sentence in split_sentences(text):
+        pieces.extend(_split_long(sentence, p.max_tokens, count))
+
+    chunks: List[str] = []
+    for piece in pieces:
+        if chunks:
+            merged = f"{chunks[-1]} {piece}"
+            last, size = count(chunks[-1]), count(piece)
+            fits = count(merged) <= p.max_tokens
+            if fits and (last < p.target_tokens or size < p.min_tokens):
+                chunks[-1] = merged
+                continue
+        chunks.append(piece)
+
+    # A short leftover at the end joins its predecessor when it can
+    if len(chunks) > 1 and count(chunks[-1]) < p.min_tokens:
+        merged = f"{chunks[-2]} {chunks[-1]}"
+        if count(merged) <= p.max_tokens:
+            chunks[-2:] = [merged]
+    return chunks
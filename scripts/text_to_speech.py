@@ -1,49 +1,279 @@
-from TTS.api import TTS
-from pydub import AudioSegment
+import numpy as np
+import contextlib
 import os, time
+from dataclasses import dataclass
+from typing import Optional
+
+from scripts.audio_assembly import assemble_waveforms, timings_path_for, write_timings, write_wav
+from scripts.audio_cache import chunk_key, default_audio_cache, model_config_hash
+from scripts.hashing import file_sha256, json_sha256
+from scripts.metrics import default_recorder
+from scripts.speaker_cache import default_speaker_cache
 
 # -------------------------------
 # 🔹 XTTS v2 model folder
 # -------------------------------
 MODEL_PATH = r"models/tts_models--multilingual--multi-dataset--xtts_v2"
 
+# Synthesizer.tts() appends this many zero samples after every sentence;
+# we keep doing the same so the merged audio keeps its pacing.
+SENTENCE_PAD_SAMPLES = 10000
+
+# XTTS v2 always outputs 24 kHz audio.
+SAMPLE_RATE = 24000
+
+
+# -------------------------------
+# 🔹 CPU performance mode (opt-in)
+# -------------------------------
+@dataclass
+class CpuPerfMode:
+    """
+    Reduced-precision CPU inference.
+
+    precision: "int8" (dynamic int8 quantization of the GPT's linear
+    layers), "bf16" (bfloat16 autocast; only worth it on CPUs with
+    AVX512-BF16/AMX), or "auto" (bf16 if the CPU has it, else int8).
+    num_threads: intra-op torch threads (default: CPUs available to us).
+    """
+    precision: str = "auto"
+    num_threads: Optional[int] = None
+    interop_threads: int = 1
+
+    def resolved(self):
+        if self.precision == "auto":
+            return "bf16" if cpu_has_bf16() else "int8"
+        if self.precision not in ("int8", "bf16", "fp32"):
+            raise ValueError(f"Unknown precision: {self.precision!r}")
+        return self.precision
+
+
+def cpu_has_bf16():
+    """True if the CPU does bf16 math natively (Linux /proc/cpuinfo flags)."""
+    try:
+        with open("/proc/cpuinfo", "r", encoding="utf-8") as f:
+            flags = f.read()
+    except OSError:
+        return False
+    return "avx512_bf16" in flags or "amx_bf16" in flags
+
+
+def _conv1d_to_linear(module):
+    """
+    Swap transformers' Conv1D (GPT-2 style, weight stored as in x out) for
+    nn.Linear so quantize_dynamic can see the GPT's projection layers.
+    """
+    import torch.nn as nn
+    from transformers.pytorch_utils import Conv1D
+
+    for name, child in module.named_children():
+        if isinstance(child, Conv1D):
+            n_in, n_out = child.weight.shape
+            linear = nn.Linear(n_in, n_out, bias=child.bias is not None)
+            linear.weight.data = child.weight.data.t().contiguous()
+            if child.bias is not None:
+                linear.bias.data = child.bias.data.clone()
+            setattr(module, name, linear)
+        else:
+            _conv1d_to_linear(child)
+
+
+def apply_cpu_perf(tts, perf):
+    """Tune threads and lower the precision of a CPU-loaded XTTS in place."""
+    import torch
+
+    threads = perf.num_threads
+    if not threads:
+        threads = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count()
+    torch.set_num_threads(max(1, threads or 1))
+    try:
+        torch.set_num_interop_threads(perf.interop_threads)
+    except RuntimeError:
+        pass  # can only be set once, before any parallel work
+
+    precision = perf.resolved()
+    model = tts.synthesizer.tts_model
+    model.eval()
+    if precision == "int8":
+        # The autoregressive GPT dominates CPU time; the HiFi-GAN decoder is
+        # convolutional and stays in fp32.
+        _conv1d_to_linear(model.gpt)
+        model.gpt = torch.ao.quantization.quantize_dynamic(
+            model.gpt, {torch.nn.Linear}, dtype=torch.qint8
+        )
+    tts.precision = precision
+    print(f"⚡ CPU perf mode: {precision}, {torch.get_num_threads()} thread(s)")
+    return tts
+
+
+def precision_of(tts):
+    return getattr(tts, "precision", "fp32")
+
+
+def chunk_config_hash(model_path, precision="fp32"):
+    """Model part of the chunk-cache key; reduced precision is cached apart."""
+    config_hash = model_config_hash(model_path)
+    if precision != "fp32":
+        config_hash = json_sha256([config_hash, precision])
+    return config_hash
+
+
+def inference_context(tts):
+    """inference_mode, plus bf16 autocast when the model runs in bf16 mode."""
+    precision = precision_of(tts)
+    if precision == "fp32":
+        return contextlib.nullcontext()
+    import torch
+
+    stack = contextlib.ExitStack()
+    stack.enter_context(torch.inference_mode())
+    if precision == "bf16":
+        stack.enter_context(torch.autocast("cpu", dtype=torch.bfloat16))
+    return stack
+
+
+def load_tts(model_path=MODEL_PATH, gpu=False, perf=None):
+    """Load the XTTS v2 model; pass a CpuPerfMode for faster CPU inference."""
+    from TTS.api import TTS  # pulls in torch + transformers; only load when needed
 
-def load_tts(model_path=MODEL_PATH, gpu=False):
-    """Load the XTTS v2 model."""
     print(f"⏳ Loading XTTS v2 model from: {model_path}")
     tts = TTS(
         model_path=model_path,
         config_path=os.path.join(model_path, "config.json"),
         gpu=gpu,
     )
+    if perf is not None and not gpu:
+        apply_cpu_perf(tts, perf)
     print("✅ Model loaded successfully.\n")
     return tts
 
 
+def synthesize_sentence(tts, sentence, latents, language="en"):
+    """Run XTTS inference for one sentence with precomputed speaker latents."""
+    model = tts.synthesizer.tts_model
+    cfg = model.config
+    gpt_cond_latent, speaker_embedding = latents
+    with inference_context(tts):
+        out = model.inference(
+            sentence,
+            language,
+            gpt_cond_latent,
+            speaker_embedding,
+            temperature=cfg.temperature,
+            length_penalty=cfg.length_penalty,
+            repetition_penalty=cfg.repetition_penalty,
+            top_k=cfg.top_k,
+            top_p=cfg.top_p,
+        )
+    wav = out["wav"]
+    if hasattr(wav, "cpu"):
+        wav = wav.float().cpu().numpy()
+    return np.asarray(wav, dtype=np.float32).squeeze()
+
+
 def generate_audio(
     tts,
     sentences,
     speaker_wav,
     output_dir="assets/audio/generated",
     output_file="assets/audio/generated/output.wav",
+    language="en",
+    latent_cache=None,
+    audio_cache=None,
+    use_cache=True,
+    model_path=MODEL_PATH,
+    pool=None,
+    silence_s=None,
+    crossfade_s=0.0,
+    timings_file=None,
+    checkpoint=None,
 ):
-    """Generate speech from sentences, merge them, and save final audio."""
+    """
+    Generate speech from sentences, merge them, and save final audio.
+
+    Sentences already in the chunk cache (same text, speaker, language and
+    model config) are reused; only the misses are synthesized. Pass a
+    SynthesisPool as `pool` to spread the misses over worker processes
+    (`tts` may then be None).
+
+    Waveforms are assembled in memory and written once; `silence_s` (default:
+    the usual sentence pause) or `crossfade_s` controls the joins.
+
+    Also writes a timing manifest (default: output.timings.json) with each
+    sentence's start/end in the merged audio, and returns it.
+
+    With a Checkpoint, every synthesized sentence is journaled as soon as it
+    is done, so a rerun after a crash only synthesizes what is still missing
+    (even with the cache disabled or evicted). The checkpoint is cleared once
+    the merged file is written.
+    """
     os.makedirs(output_dir, exist_ok=True)
-    all_chunks = []
+    chunk_cache = (audio_cache or default_audio_cache()) if use_cache else None
+    speaker_hash = file_sha256(speaker_wav)
+    precision = pool.precision if pool is not None else precision_of(tts)
+    config_hash = chunk_config_hash(model_path, precision)
+    keys = [chunk_key(s, speaker_hash, language, config_hash) for s in sentences]
 
-    for i, sentence in enumerate(sentences, 1):
-        file_chunk = os.path.join(output_dir, "chunks", f"chunk_{i}.wav")
-        print(f"🔊 [{i}/{len(sentences)}] Generating: {sentence}")
-        start = time.time()
+    wavs = []
+    for key in keys:
+        wav = checkpoint.load_array(key) if checkpoint else None
+        if wav is None and chunk_cache:
+            wav = chunk_cache.get(key)
+        wavs.append(wav)
+    misses = [i for i, w in enumerate(wavs) if w is None]
+    if checkpoint:
+        checkpoint.report("sentence")
 
-        tts.tts_to_file(
-            text=sentence, speaker_wav=speaker_wav, language="en", file_path=file_chunk
-        )
+    def keep(i, wav):
+        wavs[i] = wav
+        if chunk_cache:
+            chunk_cache.put(keys[i], wav)
+        if checkpoint:
+            checkpoint.save_array(keys[i], wav)
+
+    if misses and pool is not None:
+        with default_recorder.span("tts.synthesize", cat="tts", sentences=len(misses), pool=True):
+            pool.synthesize(
+                [sentences[i] for i in misses],
+                on_result=lambda n, wav: keep(misses[n], wav),
+            )
+    elif misses:
+        cache = latent_cache or default_speaker_cache
+        with default_recorder.span("tts.latents", cat="tts"):
+            latents = cache.get(tts.synthesizer.tts_model, speaker_wav)
+        with default_recorder.span("tts.synthesize", cat="tts", sentences=len(misses)):
+            for n, i in enumerate(misses, 1):
+                print(f"🔊 [{n}/{len(misses)}] Generating: {sentences[i]}")
+                start = time.time()
+                keep(i, synthesize_sentence(tts, sentences[i], latents, language))
+                default_recorder.observe("tts.sentence_s", time.time() - start)
+                print(f"   ✅ Done in {time.time() - start:.2f}s")
+        cache.report()
+    if chunk_cache:
+        chunk_cache.report()
 
-        print(f"   ✅ Done in {time.time() - start:.2f}s")
-        all_chunks.append(AudioSegment.from_wav(file_chunk))
+    pause_s = SENTENCE_PAD_SAMPLES / SAMPLE_RATE
+    if silence_s is None:
+        silence_s = 0.0 if crossfade_s > 0 else pause_s
 
-    # Merge chunks into one file
-    final_audio = sum(all_chunks)
-    final_audio.export(output_file, format="wav")
+    # Merge in one preallocated buffer, then write the file once
+    with default_recorder.span("tts.assemble", cat="tts"):
+        final_audio, spans = assemble_waveforms(
+            wavs,
+            sample_rate=SAMPLE_RATE,
+            silence_s=silence_s,
+            crossfade_s=crossfade_s,
+            tail_s=pause_s,
+        )
+        write_wav(output_file, final_audio, SAMPLE_RATE)
 
+    timings = write_timings(
+        timings_file or timings_path_for(output_file),
+        sentences,
+        spans,
+        SAMPLE_RATE,
+        final_audio.size,
+    )
+    if checkpoint:
+        checkpoint.clear()
+    return timings
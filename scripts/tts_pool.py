@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import multiprocessing as mp
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Callable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from scripts.metrics import default_recorder
+
+PathLike = Union[str, Path]
+
+# Per-process state, filled in by _init_worker().
+_worker_tts = None
+_worker_latents = None
+_worker_language = "en"
+
+
+def _init_worker(model_path: str, speaker_wav: str, language: str, num_threads: int, perf=None) -> None:
+    """Load the model once per worker and pin its torch thread count."""
+    global _worker_tts, _worker_latents, _worker_language
+    import torch
+
+    torch.set_num_threads(num_threads)
+    torch.set_num_interop_threads(1)
+
+    from scripts.speaker_cache import SpeakerLatentCache
+    from scripts.text_to_speech import load_tts
+
+    _worker_tts = load_tts(model_path, gpu=False, perf=perf)
+    _worker_latents = SpeakerLatentCache().get(_worker_tts.synthesizer.tts_model, speaker_wav)
+    _worker_language = language
+
+
+def _synthesize_task(task: Tuple[int, str]) -> Tuple[int, np.ndarray, float]:
+    from scripts.text_to_speech import synthesize_sentence
+
+    idx, sentence = task
+    start = time.time()
+    wav = synthesize_sentence(_worker_tts, sentence, _worker_latents, _worker_language)
+    return idx, wav, time.time() - start
+
+
+class SynthesisPool:
+    """
+    Pool of worker processes, each holding its own XTTS instance.
+
+    Sentences are handed out one at a time (longest first) so a slow sentence
+    never blocks a whole shard; results come back in the original order.
+    A worker that fails to load the model raises in synthesize() instead of
+    being respawned forever.
+    """
+
+    def __init__(
+        self,
+        speaker_wav: PathLike,
+        *,
+        workers: Optional[int] = None,
+        threads_per_worker: Optional[int] = None,
+        model_path: Optional[PathLike] = None,
+        language: str = "en",
+        perf=None,
+    ):
+        from dataclasses import replace
+
+        from scripts.text_to_speech import MODEL_PATH
+
+        cpus = os.cpu_count() or 1
+        self.workers = max(1, workers or max(1, cpus // 4))
+        self.threads_per_worker = max(1, threads_per_worker or cpus // self.workers)
+        self.model_path = str(model_path or MODEL_PATH)
+        self.speaker_wav = str(speaker_wav)
+        self.language = language
+        # Workers get the already-pinned thread count and a resolved precision
+        self.perf = (
+            replace(perf, precision=perf.resolved(), num_threads=self.threads_per_worker)
+            if perf is not None
+            else None
+        )
+        self.precision = self.perf.precision if self.perf else "fp32"
+
+        # Fail here, not inside every worker, on the most common setup error
+        config = Path(self.model_path) / "config.json"
+        if not config.is_file():
+            raise FileNotFoundError(f"XTTS model config not found: {config}")
+
+        print(
+            f"⏳ Starting {self.workers} TTS worker(s) x {self.threads_per_worker} thread(s)"
+        )
+        # spawn: torch and forked OpenMP thread pools do not mix.
+        ctx = mp.get_context("spawn")
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=ctx,
+            initializer=_init_worker,
+            initargs=(
+                self.model_path,
+                self.speaker_wav,
+                self.language,
+                self.threads_per_worker,
+                self.perf,
+            ),
+        )
+
+    def synthesize(
+        self,
+        sentences: Sequence[str],
+        on_result: Optional[Callable[[int, np.ndarray], None]] = None,
+    ) -> List[np.ndarray]:
+        """
+        Synthesize every sentence; the returned list matches the input order.
+        `on_result(index, wav)` is called as each one finishes.
+        """
+        order = sorted(range(len(sentences)), key=lambda i: len(sentences[i]), reverse=True)
+        tasks = [(i, sentences[i]) for i in order]
+        results: List[Optional[np.ndarray]] = [None] * len(sentences)
+
+        futures = [self._pool.submit(_synthesize_task, task) for task in tasks]
+        try:
+            for done, future in enumerate(as_completed(futures), 1):
+                idx, wav, secs = future.result()
+                results[idx] = wav
+                if on_result is not None:
+                    on_result(idx, wav)
+                default_recorder.observe("tts.sentence_s", secs)
+                print(f"🔊 [{done}/{len(sentences)}] Generated in {secs:.2f}s: {sentences[idx]}")
+        except BrokenProcessPool as e:
+            raise RuntimeError(
+                "A TTS worker died (model load failed or the process crashed); "
+                "see the worker traceback above."
+            ) from e
+        return results  # type: ignore[return-value]
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self) -> "SynthesisPool":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Dict, List, Sequence, Union
+
+import numpy as np
+
+PathLike = Union[str, Path]
+
+DEFAULT_SENTENCES = [
+    "Every challenge is a chance to grow stronger than you were yesterday.",
+    "Success rarely arrives in a straight line; it is built one stubborn step at a time.",
+    "When the road gets hard, remember why you started.",
+]
+
+
+# ==================== SPECTRAL DISTANCE ====================
+def mel_filterbank(sample_rate: int, n_fft: int, n_mels: int) -> np.ndarray:
+    """Triangular HTK-style mel filters, shape (n_mels, n_fft // 2 + 1)."""
+    def hz_to_mel(f):
+        return 2595.0 * np.log10(1.0 + f / 700.0)
+
+    def mel_to_hz(m):
+        return 700.0 * (10.0 ** (m / 2595.0) - 1.0)
+
+    mels = np.linspace(hz_to_mel(0.0), hz_to_mel(sample_rate / 2), n_mels + 2)
+    bins = np.floor((n_fft + 1) * mel_to_hz(mels) / sample_rate).astype(int)
+    fb = np.zeros((n_mels, n_fft // 2 + 1), dtype=np.float32)
+    for m in range(1, n_mels + 1):
+        lo, mid, hi = bins[m - 1], bins[m], bins[m + 1]
+        if mid > lo:
+            fb[m - 1, lo:mid] = (np.arange(lo, mid) - lo) / (mid - lo)
+        if hi > mid:
+            fb[m - 1, mid:hi] = (hi - np.arange(mid, hi)) / (hi - mid)
+    return fb
+
+
+def log_mel(
+    wav: np.ndarray,
+    sample_rate: int,
+    n_fft: int = 1024,
+    hop: int = 256,
+    n_mels: int = 80,
+) -> np.ndarray:
+    """Log-mel spectrogram in dB, shape (frames, n_mels)."""
+    wav = np.asarray(wav, dtype=np.float32).reshape(-1)
+    if wav.size < n_fft:
+        wav = np.pad(wav, (0, n_fft - wav.size))
+    frames = 1 + (wav.size - n_fft) // hop
+    idx = np.arange(n_fft)[None, :] + hop * np.arange(frames)[:, None]
+    spec = np.abs(np.fft.rfft(wav[idx] * np.hanning(n_fft).astype(np.float32), axis=1)) ** 2
+    mel = spec @ mel_filterbank(sample_rate, n_fft, n_mels).T
+    return 10.0 * np.log10(np.maximum(mel, 1e-10))
+
+
+def dtw_distance(a: np.ndarray, b: np.ndarray) -> float:
+    """
+    Mean per-frame L1 distance (dB per mel band) along the best DTW path, so
+    outputs that differ only in pacing still compare as close.
+    """
+    cost = np.abs(a[:, None, :] - b[None, :, :]).mean(axis=2)
+    n, m = cost.shape
+    acc = np.full((n + 1, m + 1), np.inf)
+    steps = np.zeros((n + 1, m + 1), dtype=np.int64)
+    acc[0, 0] = 0.0
+    # Cells on one anti-diagonal (i + j == d) only depend on the two before
+    # it, so each diagonal is one vectorized step. Ties prefer diagonal, then
+    # up, then left (argmin takes the first).
+    for d in range(2, n + m + 1):
+        i = np.arange(max(1, d - m), min(n, d - 1) + 1)
+        j = d - i
+        prev = np.stack([acc[i - 1, j - 1], acc[i - 1, j], acc[i, j - 1]])
+        prev_steps = np.stack([steps[i - 1, j - 1], steps[i - 1, j], steps[i, j - 1]])
+        k = prev.argmin(axis=0)
+        cols = np.arange(i.size)
+        acc[i, j] = prev[k, cols] + cost[i - 1, j - 1]
+        steps[i, j] = prev_steps[k, cols] + 1
+    return float(acc[n, m] / steps[n, m])
+
+
+def spectral_distance(a: np.ndarray, b: np.ndarray, sample_rate: int) -> float:
+    return dtw_distance(log_mel(a, sample_rate), log_mel(b, sample_rate))
+
+
+# ==================== HARNESS ====================
+def _synthesize_all(tts, sentences, speaker_wav, language, seed) -> Dict[str, object]:
+    import torch
+
+    from scripts.speaker_cache import SpeakerLatentCache
+    from scripts.text_to_speech import synthesize_sentence
+
+    latents = SpeakerLatentCache().get(tts.synthesizer.tts_model, speaker_wav)
+    wavs, secs = [], 0.0
+    for i, sentence in enumerate(sentences):
+        torch.manual_seed(seed + i)     # XTTS samples; fix it per sentence
+        start = time.time()
+        wavs.append(synthesize_sentence(tts, sentence, latents, language))
+        secs += time.time() - start
+    return {"wavs": wavs, "seconds": secs}
+
+
+def compare_precisions(
+    speaker_wav: PathLike,
+    sentences: Sequence[str] = DEFAULT_SENTENCES,
+    precisions: Sequence[str] = ("int8", "bf16"),
+    *,
+    language: str = "en",
+    seed: int = 1234,
+    tolerance: float = 1.5,
+) -> dict:
+    """
+    Synthesize the same sentences in fp32 and each reduced precision and
+    report speedup and log-mel DTW distance to fp32.
+
+    XTTS samples its tokens, so fp32 with a different seed gives the noise
+    floor; a precision passes if its distance is within `tolerance` x that.
+    """
+    from scripts.text_to_speech import SAMPLE_RATE, CpuPerfMode, cpu_has_bf16, load_tts
+
+    base_tts = load_tts()
+    base = _synthesize_all(base_tts, sentences, speaker_wav, language, seed)
+    floor_run = _synthesize_all(base_tts, sentences, speaker_wav, language, seed + 10_000)
+    audio_s = sum(w.size for w in base["wavs"]) / SAMPLE_RATE
+    del base_tts
+
+    def distances(wavs: List[np.ndarray]) -> List[float]:
+        return [spectral_distance(a, b, SAMPLE_RATE) for a, b in zip(base["wavs"], wavs)]
+
+    floor = float(np.mean(distances(floor_run["wavs"])))
+    report = {
+        "sentences": list(sentences),
+        "fp32": {"seconds": base["seconds"], "rtf": base["seconds"] / audio_s},
+        "noise_floor_db": floor,
+        "modes": {},
+    }
+    for precision in precisions:
+        if precision == "bf16" and not cpu_has_bf16():
+            report["modes"][precision] = {"skipped": "CPU has no native bf16"}
+            continue
+        tts = load_tts(perf=CpuPerfMode(precision=precision))
+        run = _synthesize_all(tts, sentences, speaker_wav, language, seed)
+        d = distances(run["wavs"])
+        report["modes"][precision] = {
+            "seconds": run["seconds"],
+            "speedup": base["seconds"] / run["seconds"],
+            "distance_db": d,
+            "mean_distance_db": float(np.mean(d)),
+            "pass": float(np.mean(d)) <= floor * tolerance,
+        }
+        del tts
+    return report
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Check reduced-precision XTTS against fp32.")
+    ap.add_argument("--speaker", default="assets/audio/reference/Brain.wav")
+    ap.add_argument("--precision", action="append", choices=["int8", "bf16"])
+    ap.add_argument("--tolerance", type=float, default=1.5)
+    ap.add_argument("--out", default=None, help="write the JSON report here")
+    args = ap.parse_args(argv)
+
+    report = compare_precisions(
+        args.speaker,
+        precisions=args.precision or ("int8", "bf16"),
+        tolerance=args.tolerance,
+    )
+    print(f"fp32: RTF {report['fp32']['rtf']:.2f} | noise floor {report['noise_floor_db']:.2f} dB")
+    for name, r in report["modes"].items():
+        if "skipped" in r:
+            print(f"{name}: skipped ({r['skipped']})")
+        else:
+            verdict = "✅ pass" if r["pass"] else "❌ fail"
+            print(f"{name}: {r['speedup']:.2f}x faster | {r['mean_distance_db']:.2f} dB | {verdict}")
+    if args.out:
+        Path(args.out).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    return 0 if all(r.get("pass", True) for r in report["modes"].values()) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
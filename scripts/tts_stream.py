@@ -0,0 +1,270 @@
+from __future__ import annotations
+
+import argparse
+import contextlib
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import BinaryIO, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+
+from scripts.audio_assembly import StreamingWavWriter, peak_gain
+from scripts.audio_cache import chunk_key, default_audio_cache
+from scripts.hashing import file_sha256
+from scripts.speaker_cache import default_speaker_cache
+from scripts.text_chunker import chunk_text
+from scripts.text_to_speech import (
+    MODEL_PATH,
+    SAMPLE_RATE,
+    SENTENCE_PAD_SAMPLES,
+    chunk_config_hash,
+    inference_context,
+    load_tts,
+    precision_of,
+    synthesize_sentence,
+)
+
+PathLike = Union[str, Path]
+
+
+# ==================== METRICS ====================
+@dataclass
+class StreamStats:
+    """Latency of a streamed synthesis; time_to_first_audio is the headline."""
+    sample_rate: int = SAMPLE_RATE
+    started: float = field(default_factory=time.time)
+    first_audio_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    chunks: int = 0
+    samples: int = 0
+    sentence_latency: List[float] = field(default_factory=list)
+
+    def add(self, wav: np.ndarray) -> None:
+        if self.first_audio_at is None:
+            self.first_audio_at = time.time()
+        self.chunks += 1
+        self.samples += int(wav.size)
+
+    @property
+    def time_to_first_audio(self) -> Optional[float]:
+        return None if self.first_audio_at is None else self.first_audio_at - self.started
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished_at or time.time()) - self.started
+
+    @property
+    def audio_seconds(self) -> float:
+        return self.samples / self.sample_rate
+
+    @property
+    def real_time_factor(self) -> float:
+        """Wall time per second of audio (< 1 means faster than playback)."""
+        return self.elapsed / self.audio_seconds if self.samples else float("inf")
+
+    def as_dict(self) -> dict:
+        return {
+            "time_to_first_audio": self.time_to_first_audio,
+            "elapsed": self.elapsed,
+            "audio_seconds": self.audio_seconds,
+            "real_time_factor": self.real_time_factor,
+            "chunks": self.chunks,
+            "sentence_latency": self.sentence_latency,
+        }
+
+    def report(self) -> None:
+        ttfa = self.time_to_first_audio
+        print(
+            f"⏱️  Time to first audio: {ttfa:.2f}s | "
+            f"{self.audio_seconds:.1f}s of audio in {self.elapsed:.1f}s "
+            f"(RTF {self.real_time_factor:.2f}, {self.chunks} chunks)"
+            if ttfa is not None
+            else "⏱️  No audio produced."
+        )
+
+
+# ==================== STREAMING ====================
+def _stream_sentence(tts, sentence, latents, language, stream_chunk_size) -> Iterator[np.ndarray]:
+    """Sub-sentence PCM chunks from XTTS inference_stream()."""
+    model = tts.synthesizer.tts_model
+    cfg = model.config
+    gpt_cond_latent, speaker_embedding = latents
+    chunks = model.inference_stream(
+        sentence,
+        language,
+        gpt_cond_latent,
+        speaker_embedding,
+        stream_chunk_size=stream_chunk_size,
+        temperature=cfg.temperature,
+        length_penalty=cfg.length_penalty,
+        repetition_penalty=cfg.repetition_penalty,
+        top_k=cfg.top_k,
+        top_p=cfg.top_p,
+        enable_text_splitting=False,
+    )
+    while True:
+        # Enter the (bf16/inference-mode) context per step, never across a yield
+        with inference_context(tts):
+            chunk = next(chunks, None)
+        if chunk is None:
+            return
+        if hasattr(chunk, "cpu"):
+            chunk = chunk.float().cpu().numpy()
+        yield np.asarray(chunk, dtype=np.float32).reshape(-1)
+
+
+class _StreamLevel:
+    """
+    Per-sentence gain for stream_speech(). Whole sentences are
+    peak-normalized like generate_audio() does. A sentence streamed in
+    chunks cannot be: it gets the gain of the last complete sentence (1.0
+    before any) for all of its chunks, lowered only if a chunk would clip.
+    """
+
+    def __init__(self):
+        self.gain: Optional[float] = None
+
+    def whole(self, wav: np.ndarray) -> np.ndarray:
+        self.gain = peak_gain(wav)
+        return wav * self.gain
+
+    def stream(self, chunks: Iterator[np.ndarray]) -> Iterator[np.ndarray]:
+        gain = self.gain or 1.0
+        peak = 0.0
+        for chunk in chunks:
+            if chunk.size:
+                peak = max(peak, float(np.max(np.abs(chunk))))
+            gain = min(gain, 1.0 / max(peak, 1e-9))
+            yield chunk * gain
+        self.gain = 1.0 / max(0.01, peak)
+
+
+def stream_speech(
+    tts,
+    sentences: Sequence[str],
+    speaker_wav: PathLike,
+    language: str = "en",
+    *,
+    latent_cache=None,
+    audio_cache=None,
+    use_cache: bool = True,
+    model_path: PathLike = MODEL_PATH,
+    sub_sentence: bool = True,
+    stream_chunk_size: int = 20,
+    normalize: bool = True,
+    stats: Optional[StreamStats] = None,
+) -> Iterator[np.ndarray]:
+    """
+    Yield float32 PCM chunks (24 kHz mono) as soon as they are synthesized.
+
+    Cached sentences come out whole and immediately. Misses are streamed
+    with XTTS inference_stream() when `sub_sentence` is set (first audio
+    after ~`stream_chunk_size` GPT tokens), otherwise one chunk per sentence.
+    Every sentence is followed by the same pause generate_audio() inserts,
+    and with `normalize` is peak-normalized like generate_audio() does
+    (streamed sentences use one gain each; see _StreamLevel).
+
+    Pass a StreamStats to collect time-to-first-audio and per-sentence latency.
+    """
+    stats = stats if stats is not None else StreamStats()
+    chunk_cache = (audio_cache or default_audio_cache()) if use_cache else None
+    speaker_hash = file_sha256(speaker_wav)
+    config_hash = chunk_config_hash(model_path, precision_of(tts))
+    latents = None
+    can_stream = sub_sentence and hasattr(tts.synthesizer.tts_model, "inference_stream")
+    pause = np.zeros(SENTENCE_PAD_SAMPLES, dtype=np.float32)
+    level = _StreamLevel()
+
+    for sentence in sentences:
+        start = time.time()
+        key = chunk_key(sentence, speaker_hash, language, config_hash)
+        wav = chunk_cache.get(key) if chunk_cache else None
+        if wav is not None:
+            if normalize:
+                wav = level.whole(wav)
+            stats.add(wav)
+            yield wav
+        else:
+            if latents is None:
+                cache = latent_cache or default_speaker_cache
+                latents = cache.get(tts.synthesizer.tts_model, speaker_wav)
+            if can_stream:
+                # Streamed audio is overlap-added differently from inference(),
+                # so it is not written to the chunk cache.
+                chunks = _stream_sentence(tts, sentence, latents, language, stream_chunk_size)
+                for chunk in level.stream(chunks) if normalize else chunks:
+                    stats.add(chunk)
+                    yield chunk
+            else:
+                wav = synthesize_sentence(tts, sentence, latents, language)
+                if chunk_cache:
+                    chunk_cache.put(key, wav)
+                if normalize:
+                    wav = level.whole(wav)
+                stats.add(wav)
+                yield wav
+        stats.sentence_latency.append(time.time() - start)
+        stats.add(pause)
+        yield pause
+    stats.finished_at = time.time()
+
+
+def speak_to(
+    target: Union[PathLike, BinaryIO],
+    tts,
+    sentences: Sequence[str],
+    speaker_wav: PathLike,
+    language: str = "en",
+    *,
+    raw: bool = False,
+    **stream_kwargs,
+) -> StreamStats:
+    """
+    Stream speech into a growing WAV file, or WAV/raw s16le into a pipe.
+    Returns the stream's StreamStats.
+    """
+    stats = StreamStats()
+    with StreamingWavWriter(target, SAMPLE_RATE, raw=raw) as out:
+        for chunk in stream_speech(tts, sentences, speaker_wav, language, stats=stats, **stream_kwargs):
+            out.write(chunk)
+    stats.report()
+    return stats
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(
+        description="Stream XTTS speech as it is synthesized, e.g. "
+        "`... --out - --raw | ffplay -f s16le -ar 24000 -ac 1 -`."
+    )
+    ap.add_argument("text_file", help="text to speak ('-' for stdin)")
+    ap.add_argument("--speaker", default="assets/audio/reference/Brain.wav")
+    ap.add_argument("--language", default="en")
+    ap.add_argument("--out", default="-", help="output WAV path, or '-' for stdout")
+    ap.add_argument("--raw", action="store_true", help="headerless s16le instead of WAV")
+    ap.add_argument("--whole-sentences", action="store_true", help="no sub-sentence streaming")
+    args = ap.parse_args(argv)
+
+    text = sys.stdin.read() if args.text_file == "-" else Path(args.text_file).read_text(encoding="utf-8")
+    sentences = chunk_text(text)
+
+    # Keep progress output off stdout when the audio itself goes there
+    target = sys.stdout.buffer if args.out == "-" else args.out
+    log = contextlib.redirect_stdout(sys.stderr) if args.out == "-" else contextlib.nullcontext()
+    with log:
+        tts = load_tts()
+        speak_to(
+            target,
+            tts,
+            sentences,
+            args.speaker,
+            args.language,
+            raw=args.raw,
+            sub_sentence=not args.whole_sentences,
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,427 @@
+from __future__ import annotations
+
+import os
+import stat
+import threading
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+from scripts.slideshow_params import SlideshowParams
+from scripts.encoding import INTERMEDIATE_PROFILE
+from scripts.pipeline import Pipeline, Stage
+from scripts.text_chunker import ChunkerParams
+
+PathLike = Union[str, Path]
+
+
+# HELPER FOR DELETING FILES
+def delete_files_only(folder_path: Union[str, os.PathLike]) -> int:
+    folder_path = os.fspath(folder_path)
+    if not os.path.exists(folder_path):
+        raise FileNotFoundError(f"{folder_path!r} does not exist")
+    if not os.path.isdir(folder_path):
+        raise NotADirectoryError(f"{folder_path!r} is not a directory")
+    deleted = 0
+    for root, dirs, files in os.walk(folder_path):
+        for name in files:
+            fp = os.path.join(root, name)
+            try:
+                try:
+                    st_mode = os.stat(fp).st_mode
+                    os.chmod(fp, st_mode | stat.S_IWUSR)
+                except Exception:
+                    pass
+
+                os.remove(fp)
+                deleted += 1
+            except FileNotFoundError:
+                continue
+    return deleted
+
+
+# HELPER FOR COLLECTING IMAGES
+def get_images_from_folder(folder: str | Path):
+    folder = Path(folder)
+    if not folder.exists():
+        raise FileNotFoundError(f"Image folder not found: {folder}")
+    image_paths = sorted(
+        [p for p in folder.iterdir() if p.suffix.lower() in {".jpg", ".jpeg", ".png"}],
+        key=lambda p: (
+            p.stem.isdigit(),
+            int(p.stem) if p.stem.isdigit() else p.stem.lower(),
+            p.name.lower(),
+        ),
+    )
+    if not image_paths:
+        raise FileNotFoundError(f"No images found in {folder}")
+    return image_paths
+
+
+# ==================== CONFIG ====================
+@dataclass
+class JobConfig:
+    topic: str = "Overcoming challenges and achieving success"
+    image_query: str = "tech"
+    images_per_page: int = 10
+    speaker_wav: str = "assets/audio/reference/Brain.wav"
+    language: str = "en"
+    workdir: str = "."                    # all outputs live under <workdir>/assets
+
+    slideshow: SlideshowParams = field(
+        default_factory=lambda: SlideshowParams(fps=10, target_w=1080, target_h=1920)
+    )
+    chunking: ChunkerParams = field(default_factory=ChunkerParams)  # TTS work-unit sizes
+    subtitle_style: Dict[str, Any] = field(default_factory=dict)  # extra generate_subtitles kwargs
+    word_level: bool = True
+
+    # Two-pass keeps the plain render cached, so subtitle-only changes just
+    # re-burn; single-pass is one encode but re-renders on any subtitle change.
+    single_pass: bool = False
+    tts_workers: int = 1
+    tts_precision: Optional[str] = None   # CPU perf mode: "int8", "bf16" or "auto"
+    render_workers: int = 1
+    encode_profile: str = "production"    # draft / preview / production / archive
+    # Two-pass only: the plain render that the burn stage re-encodes
+    intermediate_profile: str = INTERMEDIATE_PROFILE
+
+    # Journal finished TTS sentences and video segments under
+    # assets/.checkpoints, so a crashed stage resumes instead of starting over.
+    # Resumable renders go through the segmented renderer, cut every
+    # `segment_seconds` even with a single worker.
+    resumable: bool = True
+    segment_seconds: float = 20.0
+
+    def cpu_perf(self):
+        if not self.tts_precision:
+            return None
+        from scripts.text_to_speech import CpuPerfMode
+
+        return CpuPerfMode(precision=self.tts_precision)
+
+    @property
+    def assets(self) -> Path:
+        return Path(self.workdir) / "assets"
+
+    @property
+    def images_dir(self) -> Path:
+        return self.assets / "images"
+
+    @property
+    def speech_txt(self) -> Path:
+        return self.assets / "text" / "speech.txt"
+
+    @property
+    def audio_dir(self) -> Path:
+        return self.assets / "audio" / "generated"
+
+    @property
+    def audio_wav(self) -> Path:
+        return self.audio_dir / "output.wav"
+
+    @property
+    def timings_json(self) -> Path:
+        return self.audio_dir / "output.timings.json"
+
+    @property
+    def ass_path(self) -> Path:
+        return self.assets / "subtitles" / "output.ass"
+
+    @property
+    def video_mp4(self) -> Path:
+        return self.assets / "video" / "output.mp4"
+
+    @property
+    def subtitled_mp4(self) -> Path:
+        return self.assets / "video" / "output_subtitled.mp4"
+
+    @property
+    def state_path(self) -> Path:
+        return self.assets / ".pipeline_state.json"
+
+    @property
+    def checkpoints_dir(self) -> Path:
+        return self.assets / ".checkpoints"
+
+
+def _clean_dir(folder: Path) -> None:
+    folder.mkdir(parents=True, exist_ok=True)
+    delete_files_only(folder)
+
+
+# ==================== SHARED MODELS ====================
+class SharedModels:
+    """
+    Warm models shared by several pipelines in one process (batch, daemon).
+
+    Each model is loaded lazily on first use and only once; XTTS once per
+    precision, so jobs asking for different CPU perf modes each get theirs
+    (`tts_precision` is the default for jobs that set none). XTTS and
+    WhisperX are not safe to call from two threads at once, so the stages
+    that use them hold `tts_lock` / `aligner_lock` while they run.
+    """
+
+    def __init__(self, tts_precision: Optional[str] = None):
+        self.tts_precision = tts_precision
+        self._tts: Dict[Optional[str], Any] = {}
+        self._load_lock = threading.Lock()
+        self.tts_lock = threading.Lock()
+        self.aligner_lock = threading.Lock()
+
+    def tts(self, precision: Optional[str] = None):
+        precision = precision or self.tts_precision
+        with self._load_lock:
+            if precision not in self._tts:
+                from scripts.text_to_speech import CpuPerfMode, load_tts
+
+                perf = CpuPerfMode(precision) if precision else None
+                self._tts[precision] = load_tts(perf=perf)
+            return self._tts[precision]
+
+    def aligner(self, lang: str):
+        from scripts.subtitles import get_aligner
+
+        # get_aligner() already keeps one aligner per (lang, device)
+        with self.aligner_lock:
+            return get_aligner(lang)
+
+
+# ==================== STAGES ====================
+def _stage_images(cfg: JobConfig):
+    from scripts.get_images import download_images
+
+    _clean_dir(cfg.images_dir)
+    download_images(
+        cfg.image_query,
+        per_page=cfg.images_per_page,
+        save_folder=str(cfg.images_dir),
+        params=cfg.slideshow,
+    )
+
+
+def _stage_speech(cfg: JobConfig):
+    from scripts.get_speach import get_speach
+
+    speech_text = get_speach(cfg.topic)
+    if not speech_text:
+        raise RuntimeError("Speech generation failed.")
+    cfg.speech_txt.parent.mkdir(parents=True, exist_ok=True)
+    cfg.speech_txt.write_text(speech_text, encoding="utf-8")
+
+
+def _load_tts(cfg: JobConfig):
+    from scripts.text_to_speech import load_tts
+
+    return load_tts(perf=cfg.cpu_perf())
+
+
+def _load_aligner(cfg: JobConfig):
+    from scripts.subtitles import get_aligner
+
+    return get_aligner(cfg.language)
+
+
+def _stage_tts(cfg: JobConfig, tts=None):
+    from scripts.checkpoint import Checkpoint
+    from scripts.text_chunker import chunk_text
+    from scripts.text_to_speech import generate_audio
+
+    speech = cfg.speech_txt.read_text(encoding="utf-8")
+    sentences = chunk_text(speech, cfg.chunking)
+
+    _clean_dir(cfg.audio_dir)
+    kwargs = dict(
+        output_dir=str(cfg.audio_dir),
+        output_file=str(cfg.audio_wav),
+        language=cfg.language,
+        checkpoint=Checkpoint(cfg.checkpoints_dir / "tts") if cfg.resumable else None,
+    )
+    if cfg.tts_workers > 1:
+        from scripts.tts_pool import SynthesisPool
+
+        with SynthesisPool(
+            cfg.speaker_wav,
+            workers=cfg.tts_workers,
+            language=cfg.language,
+            perf=cfg.cpu_perf(),
+        ) as pool:
+            return generate_audio(None, sentences, cfg.speaker_wav, pool=pool, **kwargs)
+    return generate_audio(tts, sentences, cfg.speaker_wav, **kwargs)
+
+
+def _stage_subtitles(cfg: JobConfig, aligner=None):
+    from scripts.subtitles import generate_subtitles
+
+    return generate_subtitles(
+        audio_path=cfg.audio_wav,
+        ass_out_path=cfg.ass_path,
+        timings=cfg.timings_json,
+        word_level=cfg.word_level,
+        lang=cfg.language,
+        aligner=aligner,
+        **cfg.subtitle_style,
+    )
+
+
+def _stage_render(cfg: JobConfig, out_path: Path, ass_path=None, profile=None):
+    from scripts.build_video import render_burned_to_file, render_to_file
+
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    images = get_images_from_folder(cfg.images_dir)
+    if cfg.render_workers > 1 or cfg.resumable:
+        from scripts.parallel_render import render_parallel_to_file
+
+        # Time-sharded: segments render in parallel, then a stream-copy concat
+        return render_parallel_to_file(
+            image_paths=images,
+            audio_path=cfg.audio_wav,
+            out_path=out_path,
+            params=cfg.slideshow,
+            workers=cfg.render_workers,
+            ass_path=ass_path,
+            segment_seconds=cfg.segment_seconds if cfg.resumable else None,
+            checkpoint_dir=cfg.checkpoints_dir / "render" if cfg.resumable else None,
+            profile=profile or cfg.encode_profile,
+        )
+    if ass_path is not None:
+        # Frames, subtitles and audio go through one ffmpeg encode
+        return render_burned_to_file(
+            image_paths=images,
+            audio=cfg.audio_wav,
+            out_path=out_path,
+            ass_path=ass_path,
+            params=cfg.slideshow,
+            profile=profile or cfg.encode_profile,
+        )
+    render_to_file(
+        image_paths=images,
+        audio=str(cfg.audio_wav),
+        out_path=out_path,
+        params=cfg.slideshow,
+        profile=profile or cfg.encode_profile,
+    )
+    return out_path
+
+
+def _stage_burn(cfg: JobConfig):
+    from scripts.burner import burn_subtitles
+
+    return burn_subtitles(
+        video_in=cfg.video_mp4,
+        ass_path=cfg.ass_path,
+        out_path=cfg.subtitled_mp4,
+        profile=cfg.encode_profile,
+        fps=cfg.slideshow.fps,
+    )
+
+
+# ==================== PIPELINE ====================
+def build_stages(cfg: JobConfig, shared: Optional[SharedModels] = None) -> list:
+    """
+    The download -> speech -> TTS -> subtitles/render -> burn DAG for one video.
+
+    Model loads are resource stages with no data deps, so with a concurrent
+    run they warm up while images download and the speech is generated.
+    With `shared`, they hand out the shared warm models instead of loading.
+    """
+    subtitle_params = {
+        "style": cfg.subtitle_style,
+        "word_level": cfg.word_level,
+        "lang": cfg.language,
+    }
+    use_tts_model = cfg.tts_workers <= 1   # the pool loads its own models
+    # A job without its own precision runs on the shared models' default
+    tts_precision = cfg.tts_precision or (shared.tts_precision if shared else None)
+    stages = []
+    if use_tts_model:
+        load = (lambda r: shared.tts(tts_precision)) if shared else (lambda r: _load_tts(cfg))
+        stages.append(Stage("load_tts", load, memoize=False))
+    if cfg.word_level:
+        load = (lambda r: shared.aligner(cfg.language)) if shared else (lambda r: _load_aligner(cfg))
+        stages.append(Stage("load_aligner", load, memoize=False))
+    stages += [
+        Stage(
+            "images",
+            lambda r: _stage_images(cfg),
+            outputs=[cfg.images_dir],
+            params={
+                "query": cfg.image_query,
+                "per_page": cfg.images_per_page,
+                "size": [cfg.slideshow.target_w, cfg.slideshow.target_h],
+            },
+        ),
+        Stage(
+            "speech",
+            lambda r: _stage_speech(cfg),
+            outputs=[cfg.speech_txt],
+            params={"topic": cfg.topic},
+        ),
+        Stage(
+            "tts",
+            lambda r: _stage_tts(cfg, r.get("load_tts")),
+            deps=["speech"] + (["load_tts"] if use_tts_model else []),
+            inputs=[cfg.speech_txt, cfg.speaker_wav],
+            outputs=[cfg.audio_wav, cfg.timings_json],
+            params={
+                "language": cfg.language,
+                "chunking": asdict(cfg.chunking),
+                "precision": tts_precision,
+            },
+            lock=shared.tts_lock if shared else None,
+        ),
+        Stage(
+            "subtitles",
+            lambda r: _stage_subtitles(cfg, r.get("load_aligner")),
+            deps=["tts"] + (["load_aligner"] if cfg.word_level else []),
+            inputs=[cfg.audio_wav, cfg.timings_json],
+            outputs=[cfg.ass_path],
+            params=subtitle_params,
+            lock=shared.aligner_lock if shared and cfg.word_level else None,
+        ),
+    ]
+
+    if cfg.single_pass:
+        stages.append(
+            Stage(
+                "render",
+                lambda r: _stage_render(cfg, cfg.subtitled_mp4, cfg.ass_path),
+                deps=["images", "tts", "subtitles"],
+                inputs=[cfg.images_dir, cfg.audio_wav, cfg.ass_path],
+                outputs=[cfg.subtitled_mp4],
+                params={"slideshow": asdict(cfg.slideshow), "profile": cfg.encode_profile},
+            )
+        )
+    else:
+        stages += [
+            Stage(
+                "render",
+                lambda r: _stage_render(cfg, cfg.video_mp4, profile=cfg.intermediate_profile),
+                deps=["images", "tts"],
+                inputs=[cfg.images_dir, cfg.audio_wav],
+                outputs=[cfg.video_mp4],
+                params={"slideshow": asdict(cfg.slideshow), "profile": cfg.intermediate_profile},
+            ),
+            Stage(
+                "burn",
+                lambda r: _stage_burn(cfg),
+                deps=["render", "subtitles"],
+                inputs=[cfg.video_mp4, cfg.ass_path],
+                outputs=[cfg.subtitled_mp4],
+                params={"profile": cfg.encode_profile},
+            ),
+        ]
+    return stages
+
+
+def build_pipeline(
+    cfg: JobConfig,
+    shared: Optional[SharedModels] = None,
+    label: Optional[str] = None,
+    on_event=None,
+) -> Pipeline:
+    return Pipeline(
+        build_stages(cfg, shared),
+        state_path=cfg.state_path,
+        label=label,
+        on_event=on_event,
+    )
@@ -0,0 +1,22 @@
+from scripts.audio_assembly import read_timings, timings_path_for, write_timings
+from scripts.subtitles import timing_segments
+
+
+def test_timings_path_for():
+    assert timings_path_for("assets/audio/output.wav").as_posix() == "assets/audio/output.timings.json"
+
+
+def test_timings_round_trip(tmp_path):
+    path = tmp_path / "output.timings.json"
+    manifest = write_timings(
+        path, ["First one.", "  ", "Second one. "], [(0, 24000), (24000, 24000), (36000, 60000)], 24000, 72000
+    )
+    assert manifest["duration"] == 3.0
+    assert manifest["sentences"][2] == {"index": 2, "text": "Second one. ", "start": 1.5, "end": 2.5}
+    assert read_timings(path) == manifest
+    # Blank sentences are dropped, text is stripped
+    assert timing_segments(path) == [
+        {"start": 0.0, "end": 1.0, "text": "First one."},
+        {"start": 1.5, "end": 2.5, "text": "Second one."},
+    ]
+    assert timing_segments(manifest["sentences"]) == timing_segments(path)
@@ -0,0 +1,37 @@
+import json
+
+import numpy as np
+
+from scripts.checkpoint import Checkpoint
+
+
+def test_units_survive_reload(tmp_path):
+    ck = Checkpoint(tmp_path / "ck", "fp")
+    ck.save_array("a", np.ones(4))
+    again = Checkpoint(tmp_path / "ck", "fp")
+    assert np.array_equal(again.load_array("a"), np.ones(4, dtype=np.float32))
+    assert again.resumed == 1
+
+
+def test_torn_line_is_truncated_before_next_commit(tmp_path):
+    ck = Checkpoint(tmp_path / "ck", "fp")
+    ck.save_array("a", np.ones(4))
+    with open(ck.journal_path, "a", encoding="utf-8") as f:
+        f.write('{"unit": "b", "fi')            # crash mid-append
+    ck = Checkpoint(tmp_path / "ck", "fp")
+    ck.save_array("c", np.zeros(4))
+    assert sorted(Checkpoint(tmp_path / "ck", "fp").units) == ["a", "c"]
+
+
+def test_records_with_missing_keys_are_skipped(tmp_path):
+    ck = Checkpoint(tmp_path / "ck", "fp")
+    ck.save_array("a", np.ones(4))
+    with open(ck.journal_path, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"unit": "b"}) + "\n")
+    assert sorted(Checkpoint(tmp_path / "ck", "fp").units) == ["a"]
+
+
+def test_other_fingerprint_discards_units(tmp_path):
+    Checkpoint(tmp_path / "ck", "old").save_array("a", np.ones(4))
+    ck = Checkpoint(tmp_path / "ck", "new")
+    assert ck.units == {} and ck.load_array("a") is None
@@ -0,0 +1,159 @@
+import json
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from scripts.build_video import SlideshowParams
+from scripts.get_images import download_images, pick_rendition, required_size
+
+PHOTO = {
+    "width": 4000,
+    "height": 6000,
+    "src": {
+        "original": "/img/original",
+        "medium": "/img/medium",
+        "large": "/img/large",
+        "large2x": "/img/large2x",
+    },
+}
+
+
+class StubPexels(ThreadingHTTPServer):
+    """Search endpoint + image files with ETags; `flaky` paths 503 once first."""
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.hits = Counter()           # path -> requests
+        self.not_modified = Counter()   # path -> 304 replies
+        self.photos = []
+        self.flaky = set()
+        self.broken = set()
+
+    @property
+    def base(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def photo(self, name):
+        src = {k: f"{self.base}/img/{name}-{k}" for k in PHOTO["src"]}
+        return {**PHOTO, "src": src}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        srv = self.server
+        path = self.path.split("?")[0]
+        srv.hits[path] += 1
+        if path == "/v1/search":
+            return self._send(200, json.dumps({"photos": srv.photos}).encode())
+        if path in srv.broken:
+            return self._send(404, b"gone")
+        if path in srv.flaky and srv.hits[path] == 1:
+            return self._send(503, b"busy")
+        etag = f'"{path}"'
+        if self.headers.get("If-None-Match") == etag:
+            srv.not_modified[path] += 1
+            return self._send(304, b"")
+        self._send(200, path.encode() * 100, etag=etag)
+
+    def _send(self, status, body, etag=None):
+        self.send_response(status)
+        if etag:
+            self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if status != 304:
+            self.wfile.write(body)
+
+
+@pytest.fixture
+def stub():
+    srv = StubPexels()
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+@pytest.fixture
+def fetch(stub, tmp_path):
+    params = SlideshowParams(target_w=540, target_h=960)
+
+    def run(**kw):
+        return download_images(
+            "tech",
+            per_page=len(stub.photos),
+            save_folder=str(tmp_path / "images"),
+            params=params,
+            api_url=f"{stub.base}/v1/search",
+            api_key="test",
+            cache_dir=str(tmp_path / "cache"),
+            **kw,
+        )
+
+    return run
+
+
+def test_pick_rendition_smallest_covering():
+    assert pick_rendition(PHOTO, 200, 300) == "/img/medium"
+    assert pick_rendition(PHOTO, 400, 600) == "/img/large"
+    assert pick_rendition(PHOTO, 585, 1040) == "/img/large2x"
+    # Bigger than every fixed rendition: CDN resize of the original
+    assert pick_rendition(PHOTO, 1170, 2080) == "/img/original?auto=compress&cs=tinysrgb&w=1387"
+    # Larger than the original itself
+    assert pick_rendition(PHOTO, 5000, 7000) == "/img/original"
+    assert pick_rendition({"src": {"original": "/o"}}, 10, 10) == "/o"
+
+
+def test_required_size_covers_overscan_and_zoom():
+    w, h = required_size(SlideshowParams(target_w=540, target_h=960))
+    assert (w, h) == (585, 1040)
+
+
+def test_download_picks_rendition_and_caches(stub, fetch, tmp_path):
+    stub.photos = [stub.photo("a"), stub.photo("b")]
+    saved = fetch()
+    assert [p.rsplit("/", 1)[-1] for p in saved] == ["1.jpg", "2.jpg"]
+    assert (tmp_path / "images" / "1.jpg").read_bytes() == b"/img/a-large2x" * 100
+    assert stub.hits == Counter({"/v1/search": 1, "/img/a-large2x": 1, "/img/b-large2x": 1})
+
+    # Second run: search and files both come from the cache
+    stub.hits.clear()
+    assert fetch() == saved
+    assert stub.hits == Counter()
+
+
+def test_revalidate_uses_etags(stub, fetch):
+    stub.photos = [stub.photo("a")]
+    fetch()
+    fetch(revalidate=True)
+    assert stub.hits["/v1/search"] == 2
+    assert stub.hits["/img/a-large2x"] == 2
+    assert stub.not_modified == Counter({"/img/a-large2x": 1})
+
+
+def test_transient_errors_are_retried(stub, fetch, tmp_path):
+    stub.photos = [stub.photo("a")]
+    stub.flaky.add("/img/a-large2x")
+    fetch()
+    assert stub.hits["/img/a-large2x"] == 2
+    assert (tmp_path / "images" / "1.jpg").exists()
+
+
+def test_failed_image_raises_after_saving_the_rest(stub, fetch, tmp_path):
+    stub.photos = [stub.photo("a"), stub.photo("b")]
+    stub.broken.add("/img/b-large2x")
+    with pytest.raises(RuntimeError, match="1 of 2"):
+        fetch()
+    assert (tmp_path / "images" / "1.jpg").exists()
+
+    # The good image was cached; a retry only fetches the one that failed
+    stub.broken.clear()
+    stub.hits.clear()
+    fetch()
+    assert stub.hits == Counter({"/img/b-large2x": 1})
@@ -0,0 +1,27 @@
+import numpy as np
+import pytest
+
+from scripts.build_video import SlideshowParams
+from scripts.kenburns import compare_with_moviepy
+
+
+@pytest.fixture(scope="module")
+def smooth_jpg(tmp_path_factory):
+    """Gradients plus a soft pattern: resampling differences show, noise does not."""
+    from PIL import Image
+
+    h, w = 600, 800
+    yy, xx = np.mgrid[0:h, 0:w].astype(np.float32)
+    img = np.stack([xx / w * 255, yy / h * 255, 128 + 100 * np.sin(xx / 40) * np.cos(yy / 50)], axis=-1)
+    path = tmp_path_factory.mktemp("kenburns") / "smooth.jpg"
+    Image.fromarray(img.astype(np.uint8)).save(path, quality=95)
+    return path
+
+
+@pytest.mark.parametrize("idx", [0, 1])                   # even/odd zoom and pan
+@pytest.mark.parametrize("size", [(180, 320), (320, 180)])  # crop on either axis
+def test_matches_moviepy_within_tolerance(smooth_jpg, idx, size):
+    p = SlideshowParams(target_w=size[0], target_h=size[1], cache_images=False)
+    r = compare_with_moviepy(smooth_jpg, p, duration=2.0, idx=idx, samples=6)
+    assert r["mean_abs_err"] < 1.0
+    assert r["max_abs_err"] <= 16
@@ -0,0 +1,30 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import main
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_startup_does_not_import_render_libraries():
+    code = "import sys, main; print(' '.join(m for m in ('numpy', 'cv2', 'moviepy', 'torch') if m in sys.modules))"
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == ""
+
+
+def test_unknown_force_stage_is_an_error(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    with pytest.raises(SystemExit) as exc:
+        main.main(["speak", "--force", "ttts"])
+    assert exc.value.code == 2
+    assert "unknown stage ttts" in capsys.readouterr().err
+
+
+def test_encode_profile_choices_exclude_the_intermediate():
+    args = main.build_parser().parse_args(["all", "--encode-profile", "draft"])
+    assert args.encode_profile == "draft"
+    with pytest.raises(SystemExit):
+        main.build_parser().parse_args(["all", "--encode-profile", "intermediate"])
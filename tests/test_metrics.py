@@ -0,0 +1,141 @@
+import json
+import os
+import signal
+import subprocess
+import sys
+
+import pytest
+
+from scripts.metrics import MetricsRecorder, descendant_rss_mb, histogram, parse_progress
+
+# Touches 150 MB so it is resident, then waits to be killed
+HOG = "b = bytearray(150 * 2**20); b[::4096] = bytes(len(b[::4096])); print('ok', flush=True); input()"
+# A parent in between: the grandchild must still be found
+WRAPPER = f"import subprocess, sys; subprocess.run([sys.executable, '-c', {HOG!r}])"
+
+
+@pytest.mark.skipif(descendant_rss_mb() is None, reason="needs /proc")
+def test_descendant_rss_includes_grandchildren():
+    proc = subprocess.Popen(
+        [sys.executable, "-c", WRAPPER],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        text=True,
+        start_new_session=True,
+    )
+    try:
+        assert proc.stdout.readline().strip() == "ok"
+        rss = descendant_rss_mb()
+        assert proc.pid in rss and len(rss) >= 2
+        assert max(rss.values()) > 140
+    finally:
+        os.killpg(proc.pid, signal.SIGKILL)
+        proc.wait()
+
+
+# Two blocks as ffmpeg writes them with `-progress pipe:1`
+PROGRESS = """\
+frame=0
+fps=0.00
+stream_0_0_q=0.0
+bitrate=N/A
+total_size=N/A
+out_time_us=N/A
+out_time_ms=N/A
+out_time=N/A
+dup_frames=0
+drop_frames=0
+speed=N/A
+progress=continue
+frame=30
+fps=29.85
+stream_0_0_q=28.0
+bitrate=  12.3kbits/s
+total_size=48
+out_time_us=1000000
+out_time_ms=1000000
+out_time=00:00:01.000000
+dup_frames=0
+drop_frames=0
+speed=0.995x
+progress=end
+"""
+
+
+def test_histogram_buckets_and_percentiles():
+    h = histogram([5, 1, 3, 2, 4, 100], edges=(2, 5))
+    assert h["buckets"] == {"<=2": 2, "<=5": 3, ">5": 1}
+    assert (h["count"], h["min"], h["max"]) == (6, 1, 100)
+    assert h["mean"] == pytest.approx(115 / 6)
+    # Linear interpolation between the closest ranks
+    assert h["p50"] == pytest.approx(3.5)
+    assert h["p90"] == pytest.approx(52.5)
+    assert h["p99"] == pytest.approx(95.25)
+
+
+def test_histogram_edge_values_and_empty():
+    assert histogram([2.0, 2.0001], edges=(2,))["buckets"] == {"<=2": 1, ">2": 1}
+    empty = histogram([], edges=(1, 2))
+    assert empty["count"] == 0 and empty["p99"] == 0.0
+    assert empty["buckets"] == {"<=1": 0, "<=2": 0, ">2": 0}
+
+
+def test_parse_progress_blocks():
+    blocks = list(parse_progress(PROGRESS.splitlines(keepends=True)))
+    assert [b["progress"] for b in blocks] == ["continue", "end"]
+    assert blocks[0]["speed"] == "N/A"
+    assert blocks[1]["bitrate"] == "12.3kbits/s"
+    assert blocks[1]["out_time"] == "00:00:01.000000"
+
+
+def test_progress_entries_handle_na():
+    rec = MetricsRecorder(enabled=True)
+    for block in parse_progress(PROGRESS.splitlines()):
+        rec.ffmpeg_progress("render", block)
+    first, last = rec.ffmpeg["render"]
+    assert (first["frame"], first["fps"], first["speed"], first["out_time_s"]) == (0, 0.0, None, None)
+    assert not first["done"]
+    assert (last["frame"], last["fps"], last["speed"], last["out_time_s"]) == (30, 29.85, 0.995, 1.0)
+    assert last["done"]
+    # Only blocks with a speed become counters
+    assert [c["values"] for c in rec.counters] == [{"speed": 0.995}]
+    assert rec.summary()["ffmpeg"]["render"] == {"final_speed": 0.995, "mean_speed": 0.995, "frames": 30}
+
+
+def test_disabled_recorder_records_nothing():
+    rec = MetricsRecorder()
+    with rec.span("stage"):
+        pass
+    rec.observe("render.frame_ms", 1.0)
+    rec.ffmpeg_progress("render", next(parse_progress(PROGRESS.splitlines())))
+    assert (rec.spans, dict(rec.samples), dict(rec.ffmpeg), rec.counters) == ([], {}, {}, [])
+    summary = rec.summary()
+    assert summary["stages"] == {} and summary["samples"] == {} and summary["ffmpeg"] == {}
+
+
+def test_chrome_trace_shape(tmp_path):
+    rec = MetricsRecorder(enabled=True)
+    with rec.span("tts", cat="stage", sentences=3):
+        rec.observe("tts.sentence_s", 0.5)
+    rec.ffmpeg_progress("render", {"frame": "10", "speed": "1.5x", "progress": "continue"})
+    trace = json.loads(rec.write_chrome_trace(tmp_path / "trace.json").read_text(encoding="utf-8"))
+
+    assert trace["displayTimeUnit"] == "ms"
+    by_ph = {}
+    for e in trace["traceEvents"]:
+        by_ph.setdefault(e["ph"], []).append(e)
+        assert e["pid"] == os.getpid()
+
+    (span,) = by_ph["X"]
+    assert span["name"] == "tts" and span["cat"] == "stage"
+    assert span["dur"] >= 0 and span["ts"] >= 0
+    assert span["args"]["sentences"] == 3 and {"cpu_s", "process_cpu_s"} <= span["args"].keys()
+
+    counters = {e["name"]: e["args"] for e in by_ph["C"]}
+    assert counters["ffmpeg:render"] == {"speed": 1.5}
+    if "memory" in counters:                # only where /proc gives the RSS
+        assert set(counters["memory"]) == {"rss_mb"}
+
+    (meta,) = by_ph["M"]
+    assert meta["name"] == "thread_name" and meta["tid"] == span["tid"]
+    assert meta["args"]["name"]
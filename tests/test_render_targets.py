@@ -0,0 +1,103 @@
+import subprocess
+
+import numpy as np
+import pytest
+
+from benchmarks.fixtures import make_images, make_wav
+from scripts.build_video import RenderTarget, SlideshowParams, render_to_file
+from scripts.ffmpeg_pipe import FFMPEG_BIN, frame_count
+
+SECONDS = 2.0
+
+
+def _has_ffmpeg():
+    try:
+        subprocess.run([FFMPEG_BIN, "-version"], capture_output=True, check=True)
+        return True
+    except (OSError, subprocess.CalledProcessError):
+        return False
+
+
+pytestmark = pytest.mark.skipif(not _has_ffmpeg(), reason="ffmpeg not available (set FFMPEG_BINARY)")
+
+
+def _probe(path):
+    from moviepy.editor import VideoFileClip
+
+    with VideoFileClip(str(path)) as clip:
+        return tuple(clip.size), clip.duration, clip.audio is not None
+
+
+@pytest.fixture
+def media(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)     # prepared-image cache goes to ./cache/images
+    images = make_images(tmp_path / "images", 2, size=(400, 300))
+    wav = make_wav(tmp_path / "audio.wav", SECONDS)
+    return images, wav
+
+
+def test_each_target_has_its_size_and_duration(media, tmp_path):
+    images, wav = media
+    targets = [
+        RenderTarget(tmp_path / "small.mp4", 90, 160),
+        RenderTarget(tmp_path / "big.mp4", 180, 320),
+        RenderTarget(tmp_path / "square.mp4", 160, 160),
+        RenderTarget(tmp_path / "default.mp4"),
+    ]
+    params = SlideshowParams(target_w=72, target_h=128, fps=10)
+    paths = render_to_file(images, wav, targets, params, profile="draft")
+
+    assert paths == [t.path.resolve() for t in targets]
+    expected = [(90, 160), (180, 320), (160, 160), (72, 128)]
+    for path, size in zip(paths, expected):
+        got, duration, has_audio = _probe(path)
+        assert got == size, path.name
+        assert duration == pytest.approx(SECONDS, abs=0.15), path.name
+        assert has_audio, path.name
+
+
+def test_each_frame_is_timed_once(media, tmp_path):
+    from scripts.metrics import default_recorder
+
+    images, wav = media
+    default_recorder.reset()
+    default_recorder.enable()
+    try:
+        render_to_file(
+            images, wav, [RenderTarget(tmp_path / "out.mp4", 72, 128)], SlideshowParams(fps=10), profile="draft"
+        )
+        samples = list(default_recorder.samples["render.frame_ms"])
+    finally:
+        default_recorder.enable(False)
+        default_recorder.reset()
+    assert len(samples) == frame_count(SECONDS, 10)
+
+
+def test_largest_target_is_rendered_not_upscaled(monkeypatch, media, tmp_path):
+    import scripts.build_video as bv
+
+    seen = []
+    real = bv._render_targets
+
+    def spy(video, audio_path, targets, p, encode_args):
+        seen.append(((p.target_w, p.target_h), [t.path.name for t in targets]))
+        return real(video, audio_path, targets, p, encode_args)
+
+    monkeypatch.setattr(bv, "_render_targets", spy)
+    images, wav = media
+    targets = [RenderTarget(tmp_path / "720.mp4", 72, 128), RenderTarget(tmp_path / "1080.mp4", 108, 192)]
+    render_to_file(images, wav, targets, SlideshowParams(fps=10), profile="draft")
+    assert seen == [((108, 192), ["1080.mp4", "720.mp4"])]
+
+
+def test_audio_clip_without_a_file(media, tmp_path):
+    from moviepy.audio.AudioClip import AudioArrayClip
+
+    images, _ = media
+    audio = AudioArrayClip(np.zeros((int(SECONDS * 22050), 2), dtype=np.float32), fps=22050)
+    (path,) = render_to_file(
+        images, audio, [RenderTarget(tmp_path / "out.mp4", 72, 128)], SlideshowParams(fps=10), profile="draft"
+    )
+    size, duration, has_audio = _probe(path)
+    assert size == (72, 128) and has_audio
+    assert duration == pytest.approx(SECONDS, abs=0.15)
@@ -0,0 +1,105 @@
+import pytest
+
+from benchmarks.fixtures import StubAligner
+from scripts.subtitles import fmt_time, generate_subtitles, group_words, line_chars
+
+
+@pytest.mark.parametrize(
+    "t, expected",
+    [
+        (0.0, "0:00:00.00"),
+        (1.234, "0:00:01.23"),
+        (1.999, "0:00:02.00"),
+        (59.996, "0:01:00.00"),
+        (3723.45, "1:02:03.45"),
+        (-0.5, "0:00:00.00"),
+    ],
+)
+def test_fmt_time(t, expected):
+    assert fmt_time(t) == expected
+
+
+def test_line_chars():
+    # 1080 - 2 * 60 = 960 px at 0.6 * 80 = 48 px per glyph
+    assert line_chars(1080, 80, 60, 60) == 20
+    assert line_chars(100, 200, 60, 60) == 1
+
+
+def _words(text):
+    return [{"word": w} for w in text.split()]
+
+
+def _texts(phrases):
+    return [" ".join(w["word"] for w in phrase) for phrase in phrases]
+
+
+def test_group_words_by_count():
+    words = _words("one two three four five")
+    assert _texts(group_words(words, max_words=2)) == ["one two", "three four", "five"]
+    assert _texts(group_words(words)) == ["one two three four five"]
+
+
+def test_group_words_by_width():
+    words = _words("aa bb cc dddd e")
+    # "aa bb" is 5 characters; adding " cc" would make 8
+    assert _texts(group_words(words, max_chars=5)) == ["aa bb", "cc", "dddd", "e"]
+    assert _texts(group_words(words, max_words=3, max_chars=8)) == ["aa bb cc", "dddd e"]
+
+
+def test_group_words_long_word_alone():
+    words = _words("a extraordinarily b")
+    assert _texts(group_words(words, max_chars=6)) == ["a", "extraordinarily", "b"]
+    assert group_words([], max_words=2) == []
+
+
+def test_group_words_keeps_word_dicts():
+    words = [{"word": "hi", "start": 0.0, "end": 0.2}, {"word": "there", "start": 0.2, "end": 0.5}]
+    assert group_words(words, max_words=1) == [[words[0]], [words[1]]]
+
+
+def _dialogues(path):
+    """(layer, start, end, style, text) of each Dialogue line in an ASS file."""
+    out = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        if line.startswith("Dialogue:"):
+            layer, start, end, style, _name, _ml, _mr, _mv, _effect, text = line[9:].split(",", 9)
+            out.append((int(layer), start, end, style, text))
+    return out
+
+
+TIMINGS = [
+    {"index": 0, "text": "Keep going now", "start": 0.0, "end": 1.5},
+    {"index": 1, "text": "  ", "start": 1.5, "end": 1.6},
+    {"index": 2, "text": "You got this", "start": 2.0, "end": 3.5},
+]
+
+
+def test_sentence_lines_from_timings(tmp_path):
+    ass = generate_subtitles("unused.wav", tmp_path / "s.ass", timings=TIMINGS, word_level=False)
+    assert _dialogues(ass) == [
+        (0, "0:00:00.00", "0:00:01.50", "Base", "Keep going now"),
+        (0, "0:00:02.00", "0:00:03.50", "Base", "You got this"),
+    ]
+
+
+def test_word_level_phrases_and_highlight_padding(tmp_path):
+    ass = generate_subtitles(
+        "unused.wav", tmp_path / "w.ass", timings=TIMINGS, aligner=StubAligner(), max_words=2
+    )
+    events = _dialogues(ass)
+    base = [(layer, start, end, text) for layer, start, end, style, text in events if style == "Base"]
+    hl = [(layer, start, end, text) for layer, start, end, style, text in events if style == "HL"]
+    # One Base line per phrase, spanning its words
+    assert base == [
+        (0, "0:00:00.00", "0:00:01.00", r"{\q2}Keep going"),
+        (0, "0:00:01.00", "0:00:01.50", r"{\q2}now"),
+        (0, "0:00:02.00", "0:00:03.00", r"{\q2}You got"),
+        (0, "0:00:03.00", "0:00:03.50", r"{\q2}this"),
+    ]
+    # Each word highlighted at its column within the phrase
+    assert [text for *_, text in hl] == [
+        r"{\q2}Keep", r"{\q2}     going", r"{\q2}now",
+        r"{\q2}You", r"{\q2}    got", r"{\q2}this",
+    ]
+    assert {layer for layer, *_ in hl} == {1}
+    assert hl[1][1:3] == ("0:00:00.50", "0:00:01.00")
@@ -0,0 +1,34 @@
+import pytest
+
+from scripts.text_chunker import ChunkerParams, chunk_text, estimate_tokens, split_sentences
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("Never take no. Keep going.", ["Never take no.", "Keep going."]),
+        ("Room No. 5 is open. Come in.", ["Room No. 5 is open.", "Come in."]),
+        ("It is you and I. We win.", ["It is you and I.", "We win."]),
+        ("J. R. R. Tolkien wrote it. Read it.", ["J. R. R. Tolkien wrote it.", "Read it."]),
+        ("The U.S. Army marched on. Then it rested.", ["The U.S. Army marched on.", "Then it rested."]),
+        ("I moved to the U.S. It was home.", ["I moved to the U.S.", "It was home."]),
+        ("Ask Dr. Smith. She knows.", ["Ask Dr. Smith.", "She knows."]),
+        ("Pi is 3.14 or so. Fine.", ["Pi is 3.14 or so.", "Fine."]),
+        ("Wait... then go! Why? Because.", ["Wait... then go!", "Why?", "Because."]),
+    ],
+)
+def test_split_sentences(text, expected):
+    assert split_sentences(text) == expected
+
+
+def test_chunks_fit_max_tokens_and_keep_all_words():
+    text = " ".join(["Keep going, because every small step counts and adds up over time."] * 12)
+    params = ChunkerParams(max_tokens=40, min_tokens=10, target_tokens=30)
+    chunks = chunk_text(text, params)
+    assert all(estimate_tokens(c) <= params.max_tokens for c in chunks)
+    assert " ".join(chunks).split() == text.split()
+
+
+def test_short_sentences_are_merged():
+    chunks = chunk_text("Go. Now. Win. Rest.", ChunkerParams(max_tokens=70, min_tokens=15, target_tokens=45))
+    assert chunks == ["Go. Now. Win. Rest."]
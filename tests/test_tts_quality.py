@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from scripts.tts_quality import dtw_distance
+
+
+def _dtw_reference(a, b):
+    """The straightforward O(n*m) loop dtw_distance must match."""
+    cost = np.abs(a[:, None, :] - b[None, :, :]).mean(axis=2)
+    n, m = cost.shape
+    acc = np.full((n + 1, m + 1), np.inf)
+    steps = np.zeros((n + 1, m + 1), dtype=np.int64)
+    acc[0, 0] = 0.0
+    for i in range(1, n + 1):
+        for j in range(1, m + 1):
+            prev = ((acc[i - 1, j - 1], steps[i - 1, j - 1]),
+                    (acc[i - 1, j], steps[i - 1, j]),
+                    (acc[i, j - 1], steps[i, j - 1]))
+            best, k = min(prev, key=lambda t: t[0])
+            acc[i, j] = best + cost[i - 1, j - 1]
+            steps[i, j] = k + 1
+    return float(acc[n, m] / steps[n, m])
+
+
+@pytest.mark.parametrize("n, m", [(1, 1), (1, 7), (9, 1), (23, 31), (40, 12)])
+def test_matches_reference(n, m):
+    rng = np.random.default_rng(n * 100 + m)
+    a, b = rng.normal(size=(n, 4)), rng.normal(size=(m, 4))
+    assert dtw_distance(a, b) == pytest.approx(_dtw_reference(a, b), rel=1e-12)
+
+
+def test_ties_follow_the_reference():
+    # Integer-valued frames give many equal costs
+    rng = np.random.default_rng(1)
+    a, b = rng.integers(0, 2, size=(15, 3)).astype(float), rng.integers(0, 2, size=(19, 3)).astype(float)
+    assert dtw_distance(a, b) == _dtw_reference(a, b)
+
+
+def test_time_stretch_is_close():
+    a = np.sin(np.linspace(0, 6, 50))[:, None] * np.ones((1, 8))
+    stretched = np.repeat(a, 2, axis=0)
+    assert dtw_distance(a, stretched) == pytest.approx(0.0, abs=1e-12)
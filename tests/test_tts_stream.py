@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+
+from benchmarks.fixtures import StubLatentCache, StubXtts, make_model_dir, make_wav, stub_tts
+from scripts.audio_assembly import assemble_waveforms, peak_gain
+from scripts.text_to_speech import SAMPLE_RATE, SENTENCE_PAD_SAMPLES
+from scripts.tts_stream import stream_speech
+
+SENTENCES = ["Every challenge is a chance.", "Success is built one step at a time."]
+
+
+class QuietXtts(StubXtts):
+    """
+    Sentences peaking well below 1.0 (4x louder if the text says LOUD),
+    streamed in chunks of rising level.
+    """
+
+    def inference(self, text, language, gpt_cond_latent, speaker_embedding, **kwargs):
+        level = 0.8 if "LOUD" in text else 0.2
+        return {"wav": super().inference(text, language, gpt_cond_latent, speaker_embedding)["wav"] * level}
+
+    def inference_stream(self, text, language, gpt_cond_latent, speaker_embedding, **kwargs):
+        wav = self.inference(text, language, gpt_cond_latent, speaker_embedding)["wav"]
+        for k, part in enumerate(np.array_split(wav, 4)):
+            yield part * (k + 1) / 4
+
+
+@pytest.fixture
+def quiet_tts():
+    tts = stub_tts()
+    tts.synthesizer.tts_model = QuietXtts()
+    return tts
+
+
+def _stream(tts, tmp_path, sentences=SENTENCES, **kw):
+    return list(
+        stream_speech(
+            tts,
+            sentences,
+            make_wav(tmp_path / "speaker.wav", 1.0),
+            latent_cache=StubLatentCache(),
+            use_cache=False,
+            model_path=make_model_dir(tmp_path / "model"),
+            **kw,
+        )
+    )
+
+
+def test_whole_sentences_match_generate_audio(quiet_tts, tmp_path):
+    chunks = _stream(quiet_tts, tmp_path, sub_sentence=False)
+    model = quiet_tts.synthesizer.tts_model
+    raw = [model.inference(s, "en", None, None)["wav"] for s in SENTENCES]
+    pause = SENTENCE_PAD_SAMPLES / SAMPLE_RATE
+    expected, _ = assemble_waveforms(raw, sample_rate=SAMPLE_RATE, silence_s=pause, tail_s=pause)
+    assert np.allclose(np.concatenate(chunks), expected, atol=1e-6)
+
+
+def _chunk_gains(tts, sentences, chunks):
+    """Gain applied to each streamed chunk, grouped by sentence."""
+    speech = iter(c for c in chunks if c.size != SENTENCE_PAD_SAMPLES)
+    model = tts.synthesizer.tts_model
+    return [
+        [float(np.max(np.abs(next(speech))) / np.max(np.abs(raw))) for raw in model.inference_stream(s, "en", None, None)]
+        for s in sentences
+    ]
+
+
+def test_streamed_gain_is_constant_within_a_sentence(quiet_tts, tmp_path):
+    sentences = ["Same words every time."] * 3
+    gains = _chunk_gains(quiet_tts, sentences, _stream(quiet_tts, tmp_path, sentences))
+    streamed = quiet_tts.synthesizer.tts_model.inference_stream(sentences[0], "en", None, None)
+    full = peak_gain(np.concatenate(list(streamed)))
+    # Nothing to go by for the first sentence; then the last sentence's gain
+    assert gains[0] == pytest.approx([1.0] * 4)
+    assert gains[1] == pytest.approx([full] * 4)
+    assert gains[2] == pytest.approx([full] * 4)
+
+
+def test_louder_sentence_only_lowers_the_gain(quiet_tts, tmp_path):
+    sentences = ["Quiet words come first.", "Then LOUD words follow here."]
+    chunks = _stream(quiet_tts, tmp_path, sentences)
+    assert max(float(np.max(np.abs(c))) for c in chunks) <= 1.0 + 1e-6
+    loud = _chunk_gains(quiet_tts, sentences, chunks)[1]
+    assert all(b <= a + 1e-9 for a, b in zip(loud, loud[1:]))
+    assert loud[0] > loud[-1]
+
+
+def test_normalize_off_passes_audio_through(quiet_tts, tmp_path):
+    chunks = _stream(quiet_tts, tmp_path, sub_sentence=False, normalize=False)
+    assert max(float(np.max(np.abs(c))) for c in chunks) < 0.5
@@ -0,0 +1,38 @@
+from scripts.video_job import JobConfig, build_stages
+
+
+def _params(cfg):
+    return {s.name: s.params for s in build_stages(cfg)}
+
+
+def test_two_pass_intermediate_is_near_lossless():
+    params = _params(JobConfig(encode_profile="preview"))
+    assert params["render"]["profile"] == "intermediate"
+    assert params["burn"]["profile"] == "preview"
+
+
+def test_single_pass_uses_the_chosen_profile():
+    params = _params(JobConfig(encode_profile="preview", single_pass=True))
+    assert params["render"]["profile"] == "preview"
+    assert "burn" not in params
+
+
+def test_shared_tts_is_loaded_once_per_precision(monkeypatch):
+    import scripts.text_to_speech as tts_mod
+    from scripts.video_job import SharedModels
+
+    loads = []
+    monkeypatch.setattr(tts_mod, "load_tts", lambda perf=None: loads.append(perf and perf.precision) or object())
+    shared = SharedModels("int8")
+    assert shared.tts() is shared.tts("int8")
+    assert shared.tts("bf16") is not shared.tts()
+    assert loads == ["int8", "bf16"]
+
+
+def test_stage_params_use_the_shared_default_precision():
+    from scripts.video_job import SharedModels
+
+    stages = {s.name: s for s in build_stages(JobConfig(), SharedModels("int8"))}
+    assert stages["tts"].params["precision"] == "int8"
+    stages = {s.name: s for s in build_stages(JobConfig(tts_precision="bf16"), SharedModels("int8"))}
+    assert stages["tts"].params["precision"] == "bf16"